@@ -1,17 +1,27 @@
 import argparse
 from datetime import date, datetime
+from functools import partial
 import logging
+import os
 from typing import Optional
 
 from offre_realisee.config.aggregation_config import AggregationLevel
 from offre_realisee.config.file_extensions import FileExtensions
-from offre_realisee.config.offre_realisee_config import MesureType
-from offre_realisee.domain.usecases.aggregate_mesure_qs import aggregate_mesure_qs
+from offre_realisee.config.offre_realisee_config import MesureType, AssignmentSolver, OutputFormat
+from offre_realisee.domain.entities.run_manifest import build_aggregation_manifest_entry
+from offre_realisee.domain.usecases.aggregate_mesure_qs import aggregate_mesure_qs_by_levels
 from offre_realisee.domain.usecases.create_mesure_qs_ponctualite import create_mesure_qs_ponctualite_date_range
+from offre_realisee.domain.usecases.create_mesure_qs_ponctualite_regularite import (
+    create_mesure_qs_ponctualite_regularite_date_range)
 from offre_realisee.domain.usecases.create_mesure_qs_regularite import create_mesure_qs_regularite_date_range
 from offre_realisee.domain.usecases.download_calendrier_scolaire import download_calendrier_scolaire
+from offre_realisee.domain.usecases.run_incremental_date_range import run_incremental_aggregation
+from offre_realisee.domain.usecases.worker_pool import WorkerPool
 from offre_realisee.infrastructure.calendrier_scolaire_api_handler import CalendrierScolaireApiHandler
 from offre_realisee.infrastructure.local_file_system_handler import LocalFileSystemHandler
+from offre_realisee.infrastructure.local_process_memory_handler import LocalProcessMemoryHandler
+from offre_realisee.infrastructure.offre_realisee_day_cache import DAY_CACHE_MAX_SIZE
+from offre_realisee.infrastructure.profiling import PROFILE_FOLDER, profile_block, write_profile_report
 from offre_realisee.config.logger import logger
 
 
@@ -42,6 +52,14 @@ def compute_qs(
     periode_ete_end_date: date,
     list_journees_exceptionnelles: Optional[list[date]],
     n_thread: 1,
+    assignment_solver: AssignmentSolver = AssignmentSolver.dense,
+    output_format: OutputFormat = OutputFormat.csv,
+    incremental: bool = False,
+    day_cache_path: Optional[str] = None,
+    day_cache_max_size: int = DAY_CACHE_MAX_SIZE // 1024 ** 2,
+    metrics: bool = False,
+    profile: bool = False,
+    memory_budget: Optional[int] = None,
 ) -> None:
 
     file_system_handler = LocalFileSystemHandler(
@@ -49,7 +67,10 @@ def compute_qs(
         input_path=input_path,
         output_path=output_path,
         input_file_name=input_file_name,
-        calendrier_scolaire_file_name=calendrier_scolaire_file_name
+        calendrier_scolaire_file_name=calendrier_scolaire_file_name,
+        output_format=output_format,
+        day_cache_path=day_cache_path,
+        day_cache_max_size=day_cache_max_size * 1024 ** 2
     )
 
     if telecharge_calendrier_scolaire:
@@ -58,20 +79,56 @@ def compute_qs(
 
     date_range = (start_date, end_date)
 
-    if mesure:
-        if ponctualite:
-            create_mesure_qs_ponctualite_date_range(file_system_handler, date_range, n_thread)
-        if regularite:
-            create_mesure_qs_regularite_date_range(file_system_handler, date_range, n_thread)
+    # En mode incrémental, seules les agrégations des dates recalculées sont mises à jour
+    updated_dates = None
+
+    # Les profils sont écrits par date dans output/_profile, voir write_profile_report
+    profile_path = os.path.join(data_path, output_path, PROFILE_FOLDER) if profile else None
+
+    # Les processus de calcul sont partagés par tous les types de mesure et toutes les dates de l'exécution
+    with WorkerPool(file_system_handler=file_system_handler, n_thread=n_thread,
+                    task_profiler=partial(profile_block, profile_path) if profile else None,
+                    memory_budget=None if memory_budget is None else memory_budget * 1024 ** 2,
+                    process_memory_handler=LocalProcessMemoryHandler()) as worker_pool:
+        if mesure:
+            if ponctualite and regularite:
+                updated_dates = create_mesure_qs_ponctualite_regularite_date_range(
+                    file_system_handler, date_range, n_thread=n_thread, solver=assignment_solver,
+                    incremental=incremental, worker_pool=worker_pool, metrics=metrics)
+            elif ponctualite:
+                updated_dates = create_mesure_qs_ponctualite_date_range(
+                    file_system_handler, date_range, n_thread=n_thread, solver=assignment_solver,
+                    incremental=incremental, worker_pool=worker_pool, metrics=metrics)
+            elif regularite:
+                updated_dates = create_mesure_qs_regularite_date_range(
+                    file_system_handler, date_range, n_thread=n_thread, incremental=incremental,
+                    worker_pool=worker_pool, metrics=metrics)
+
+    if not incremental:
+        updated_dates = None
 
     if aggregation:
-        for aggregation_level in [AggregationLevel.by_period, AggregationLevel.by_period_weekdays]:
-            if ponctualite:
-                aggregate_mesure_qs(file_system_handler, date_range, aggregation_level, MesureType.ponctualite,
-                                    (periode_ete_start_date, periode_ete_end_date), list_journees_exceptionnelles)
-            if regularite:
-                aggregate_mesure_qs(file_system_handler, date_range, aggregation_level, MesureType.regularite,
-                                    (periode_ete_start_date, periode_ete_end_date), list_journees_exceptionnelles)
+        aggregation_levels = [AggregationLevel.by_period, AggregationLevel.by_period_weekdays]
+        mesure_types = [mesure_type for mesure_type, is_computed in [
+            (MesureType.ponctualite, ponctualite), (MesureType.regularite, regularite)] if is_computed]
+        periode_ete = (periode_ete_start_date, periode_ete_end_date)
+        aggregation_entry = build_aggregation_manifest_entry(aggregation_levels)
+        with profile_block(profile_path, label='aggregation'):
+            for mesure_type in mesure_types:
+                aggregate_mesure_qs_by_levels_partial = partial(
+                    aggregate_mesure_qs_by_levels,
+                    file_system_handler, date_range, dsp="", aggregation_levels=aggregation_levels,
+                    mesure_type=mesure_type, periode_ete=periode_ete,
+                    list_journees_exceptionnelles=list_journees_exceptionnelles
+                )
+                run_incremental_aggregation(
+                    file_system_handler, dsp="", mesure_type=mesure_type, entry=aggregation_entry,
+                    aggregate=lambda dates: aggregate_mesure_qs_by_levels_partial(updated_dates=dates),
+                    updated_dates=updated_dates
+                )
+
+    if profile:
+        write_profile_report(profile_path)
 
 
 def main():  # noqa
@@ -151,6 +208,66 @@ def main():  # noqa
                              "(Valeur par défaut: %(default)s)\n"
                         "Number of parallel threads. (default: %(default)s)")
 
+    parser.add_argument('--assignment-solver', default=AssignmentSolver.dense,
+                        choices=[AssignmentSolver.dense, AssignmentSolver.sparse, AssignmentSolver.time_window],
+                        help="Méthode d'association des heures réelles et théoriques en ponctualité. 'sparse' résout "
+                             "indépendamment chaque bloc de passages assignables. 'time_window' découpe chaque arrêt "
+                             "en fenêtres de temps indépendantes. (Valeur par défaut: %(default)s)\n"
+                        "Ponctualite assignment solver. 'sparse' solves each block of assignable passages "
+                        "independently. 'time_window' splits each stop into independent time windows. "
+                        "(default: %(default)s)")
+
+    parser.add_argument('--output-format', default=OutputFormat.csv,
+                        choices=[OutputFormat.csv, OutputFormat.parquet],
+                        help="Format des fichiers de mesure en sortie. Au format 'parquet', les mesures journalières "
+                             "de chaque type de mesure forment un dataset partitionné par jour (JOUR=AAAA-MM-JJ). "
+                             "(Valeur par défaut: %(default)s)\n"
+                        "Output format of mesure files. With 'parquet', the daily mesures of each mesure type form a "
+                        "dataset partitioned by day (JOUR=YYYY-MM-DD). (default: %(default)s)")
+
+    parser.add_argument('--incremental', default=False, action=argparse.BooleanOptionalAction,
+                        help="Ne recalcule que les jours dont les données d'entrée, la version du code ou les "
+                             "paramètres ont changé depuis la dernière exécution, puis n'agrège que les "
+                             "périodes contenant ces jours. (Valeur par défaut: %(default)s)\n"
+                        "Only recompute days whose input data, code version or parameters changed since the last run, "
+                        "then only re-aggregate the periods containing these days. (default: %(default)s)")
+
+    parser.add_argument('--day-cache-path', default=None, type=str,
+                        help="Dossier d'un cache local des données d'offre réalisée journalières au format Arrow IPC, "
+                             "réutilisé par les exécutions suivantes tant que les fichiers d'entrée du jour n'ont pas "
+                             "changé. (Valeur par défaut: pas de cache)\n"
+                        "Folder of a local Arrow IPC cache of daily input data, reused by later runs as long as the "
+                        "day's input files are unchanged. (default: no cache)")
+
+    parser.add_argument('--day-cache-max-size', default=DAY_CACHE_MAX_SIZE // 1024 ** 2, type=int,
+                        help="Taille maximale du cache journalier en Mo, les entrées les moins récemment lues sont "
+                             "supprimées au-delà. (Valeur par défaut: %(default)s)\n"
+                        "Maximum size of the daily cache in MB, least recently read entries are removed beyond it. "
+                        "(default: %(default)s)")
+
+    parser.add_argument('--metrics', default=False, action=argparse.BooleanOptionalAction,
+                        help="Sauvegarde les durées et compteurs des étapes du calcul des mesures de chaque jour "
+                             "sur une ligne JSON, dans output/<dsp>/_metrics. (Valeur par défaut: %(default)s)\n"
+                        "Save, for each day, the duration and counters of each step of the mesure computation as a "
+                        "JSON line in output/<dsp>/_metrics. (default: %(default)s)")
+
+    parser.add_argument('--profile', default=False, action=argparse.BooleanOptionalAction,
+                        help="Exécute chaque tâche des processus de calcul sous cProfile : un profil fusionné par jour "
+                             "(AAAA_MM_JJ.pstats) et un rapport des fonctions les plus coûteuses de tous les processus "
+                             "(profile_report.txt) sont écrits dans output/_profile. (Valeur par défaut: %(default)s)\n"
+                        "Run each task of the worker processes under cProfile: a merged profile per day "
+                        "(YYYY_MM_DD.pstats) and a report of the hottest functions across all workers "
+                        "(profile_report.txt) are written in output/_profile. (default: %(default)s)")
+
+    parser.add_argument('--memory-budget', default=None, type=int,
+                        help="Mémoire totale en Mo des calculs en parallèle : au plus n-thread jours ou lignes sont "
+                             "calculés en même temps, tant que leur mémoire estimée (nombre de passages multiplié par "
+                             "la mémoire mesurée par passage) tient dans ce budget. "
+                             "(Valeur par défaut: pas de budget)\n"
+                        "Total memory in MB of parallel computations: at most n-thread days or lines are computed at "
+                        "the same time, as long as their estimated memory (number of rows times the measured memory "
+                        "per row) fits in this budget. (default: no budget)")
+
     args = parser.parse_args()
 
     logger.setLevel(logging.INFO)
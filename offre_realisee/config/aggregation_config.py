@@ -8,6 +8,24 @@ class AggregationLevel:
     by_window = "by_window"
 
 
+class DayType:
+    week = 'week'
+    saturday = 'saturday'
+    sunday_or_holiday = 'sunday_or_holiday'
+
+
+class PartialSums:
+    jours = 'jours'
+    sums = 'sums'
+    nombre_jours = 'NOMBRE_JOURS'
+    jours_index = 'index'
+
+
+# Les scores de conformité sont des multiples de 1e-7 (ComplianceType.compliant_advance vaut 0.9999999), les sommes
+# partielles les conservent en entiers pour que l'ajout et le retrait d'une journée soient exacts
+PARTIAL_SUMS_SCORE_SCALE = 10 ** 7
+
+
 class PeriodeName:
     plein_trafic = 'plein_trafic'
     vacances_scolaires = 'vacances_scolaires'
@@ -1,3 +1,8 @@
 class FileExtensions(str):
     parquet = ".parquet"
     csv = ".csv"
+    json = ".json"
+    jsonl = ".jsonl"
+    arrow = ".arrow"
+    pstats = ".pstats"
+    txt = ".txt"
@@ -17,3 +17,7 @@ class InputColumns:
     #     heure_theorique: 'datetime64',
     #     heure_reelle: 'datetime64'
     # }
+
+
+# Identifiants lus sous forme de catégories : chaque valeur distincte n'est stockée qu'une fois par journée
+CATEGORICAL_INPUT_COLUMNS = [InputColumns.ligne, InputColumns.sens, InputColumns.arret]
@@ -0,0 +1,25 @@
+class MetricName(str):
+    # Durées des étapes du calcul des mesures
+    read = "read"
+    drop_stop_without_real_time = "drop_stop_without_real_time"
+    drop_duplicates_heure_theorique = "drop_duplicates_heure_theorique"
+    add_frequency = "add_frequency"
+    group_by_stop = "group_by_stop"
+    cost_matrix = "cost_matrix"
+    assignment = "assignment"
+    time_window_blocks = "time_window_blocks"
+    stat_ponctualite = "stat_ponctualite"
+    process_day_regularite = "process_day_regularite"
+    stat_regularite = "stat_regularite"
+    write = "write"
+
+    # Compteurs
+    rows_read = "rows_read"
+    stops_processed = "stops_processed"
+    matrix_cells_scored = "matrix_cells_scored"
+    assignments = "assignments"
+    assigned_pairs = "assigned_pairs"
+    passages_regularite_scored = "passages_regularite_scored"
+
+    # Maxima
+    assignment_max_size = "assignment_max_size"
@@ -197,6 +197,17 @@ MESURE_TYPE: dict[MesureType, Mesure] = {
 }
 
 
+class AssignmentSolver:
+    dense = 'dense'
+    sparse = 'sparse'
+    time_window = 'time_window'
+
+
+class OutputFormat:
+    csv = 'csv'
+    parquet = 'parquet'
+
+
 class FrequenceType:
     basse_frequence = 'BF'
     haute_frequence = 'HF'
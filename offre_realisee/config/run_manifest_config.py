@@ -0,0 +1,8 @@
+PACKAGE_NAME = "idfm-qualite-de-service-calculateur"
+
+
+class RunManifestEntry:
+    input_fingerprint = 'input_fingerprint'
+    code_version = 'code_version'
+    parameters = 'parameters'
+    has_output = 'has_output'
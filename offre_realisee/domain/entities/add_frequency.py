@@ -1,10 +1,13 @@
 from datetime import timedelta
 
+import numpy as np
 import pandas as pd
 
+from offre_realisee.config.input_config import InputColumns
 from offre_realisee.config.offre_realisee_config import MesurePonctualite, FrequenceType
 
 FREQUENCY_THRESHOLD = timedelta(hours=1)
+FREQUENCY_WINDOW = 5
 
 
 def add_frequency(df_by_stop: pd.DataFrame) -> pd.DataFrame:
@@ -42,3 +45,53 @@ def add_frequency(df_by_stop: pd.DataFrame) -> pd.DataFrame:
         df_by_stop[MesurePonctualite.tag_frequence] = FrequenceType.basse_frequence
 
     return df_by_stop
+
+
+def add_frequency_by_stop(df_offre_realisee: pd.DataFrame) -> pd.DataFrame:
+    """Ajout des colonnes de fréquence aux données d'offre réalisée d'une journée, pour tous les arrêts à la fois.
+
+    Le résultat est identique à l'application de add_frequency sur chaque groupe (ligne, sens, arrêt), mais les
+    données ne sont triées qu'une seule fois par (ligne, sens, arrêt, heure théorique). L'écart avec le cinquième
+    passage suivant n'est retenu que si ce passage appartient au même arrêt.
+
+    Parameters
+    ----------
+    df_offre_realisee : pd.DataFrame
+        DataFrame contenant les données d'offre réalisée.
+
+    Returns
+    -------
+    df_offre_realisee : DataFrame
+        DataFrame trié par ligne, sens, arrêt et heure théorique, avec les colonnes de fréquence ajoutées.
+    """
+    stop_columns = [InputColumns.ligne, InputColumns.sens, InputColumns.arret]
+
+    df_offre_realisee = df_offre_realisee.sort_values(
+        by=stop_columns + [MesurePonctualite.heure_theorique], kind="stable")
+    stop_codes = df_offre_realisee.groupby(by=stop_columns, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+
+    # Les heures théoriques manquantes sont en fin de chaque arrêt, les arrêts restent donc contigus sans elles
+    heure_theorique_col = df_offre_realisee[MesurePonctualite.heure_theorique]
+    positions_with_heure_theorique = np.flatnonzero(heure_theorique_col.notna().to_numpy())
+    heure_theorique = (heure_theorique_col - heure_theorique_col.min()).to_numpy()[positions_with_heure_theorique]
+    stop_codes_with_heure_theorique = stop_codes[positions_with_heure_theorique]
+
+    is_haute_frequence = np.zeros(len(positions_with_heure_theorique), dtype=bool)
+    is_haute_frequence[:-FREQUENCY_WINDOW] = (
+        (stop_codes_with_heure_theorique[FREQUENCY_WINDOW:] == stop_codes_with_heure_theorique[:-FREQUENCY_WINDOW]) &
+        (heure_theorique[FREQUENCY_WINDOW:] - heure_theorique[:-FREQUENCY_WINDOW] < np.timedelta64(FREQUENCY_THRESHOLD))
+    )
+
+    frequence = np.full(len(df_offre_realisee), np.nan, dtype=object)
+    frequence[positions_with_heure_theorique] = FrequenceType.basse_frequence
+    frequence[positions_with_heure_theorique[is_haute_frequence]] = FrequenceType.haute_frequence
+
+    stop_is_haute_frequence = np.bincount(
+        stop_codes_with_heure_theorique[is_haute_frequence], minlength=stop_codes.max(initial=-1) + 1) > 0
+
+    df_offre_realisee[MesurePonctualite.frequence] = frequence
+    df_offre_realisee[MesurePonctualite.tag_frequence] = np.where(
+        stop_is_haute_frequence[stop_codes], FrequenceType.haute_frequence, FrequenceType.basse_frequence
+    ).astype(object)
+
+    return df_offre_realisee
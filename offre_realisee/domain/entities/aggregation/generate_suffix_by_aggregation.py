@@ -2,10 +2,11 @@ from datetime import date, datetime
 from typing import Callable
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 from workalendar.europe import France
 
-from offre_realisee.config.aggregation_config import AggregationLevel, PeriodeName, CalendrierScolaireColumns
+from offre_realisee.config.aggregation_config import AggregationLevel, DayType, PeriodeName, CalendrierScolaireColumns
 
 
 IDF_TIMEZONE = ZoneInfo("Europe/Paris")
@@ -43,8 +44,97 @@ def get_period_name(date: date, df_calendrier_scolaire: pd.DataFrame, periode_et
         return PeriodeName.vacances_scolaires
 
 
+def get_day_type(date: date, calendrier: France) -> str:
+    """
+    Récupère le type de jour de la date donnée : 'sunday_or_holiday' pour un dimanche ou un jour férié, 'week' pour un
+    jour de semaine et 'saturday' pour un samedi.
+
+    Parameters
+    ----------
+    date : date
+        La date pour laquelle nous voulons récupérer le type de jour.
+    calendrier : France
+        Calendrier des jours fériés.
+    """
+    if date.weekday() == 6 or calendrier.is_holiday(date):
+        return DayType.sunday_or_holiday
+    return DayType.week if date.weekday() < 5 else DayType.saturday
+
+
+class CalendarIndex:
+    """Index calendaire d'une plage de dates, construit une seule fois.
+
+    Pour chaque jour de la plage, l'index contient la période (plein trafic, vacances scolaires ou été), le type de
+    jour (semaine, samedi, dimanche ou férié) et l'indicateur de jour férié. La période et le type de jour d'une date
+    sont ensuite obtenus par un simple accès à un tableau. Pour une date hors de la plage, ils sont calculés à la
+    demande, voir get_period_name et get_day_type.
+
+    Parameters
+    ----------
+    date_range : tuple[date, date]
+        Dates de début et de fin de l'index, incluses.
+    df_calendrier_scolaire : DataFrame
+        DataFrame contenant le calendrier scolaire.
+    periode_ete : tuple[date, date]
+        Période d'été sous forme de tuple (début, fin).
+    """
+
+    def __init__(self, date_range: tuple[date, date], df_calendrier_scolaire: pd.DataFrame,
+                 periode_ete: tuple[date, date]):
+        self.df_calendrier_scolaire = df_calendrier_scolaire
+        self.periode_ete = periode_ete
+        self.calendrier = France()
+
+        self.start_ordinal = date_range[0].toordinal()
+        days = pd.date_range(start=date.fromordinal(self.start_ordinal),
+                             end=date.fromordinal(date_range[1].toordinal()))
+
+        # Comme dans get_period_name, un jour est en vacances si minuit, heure de Paris, est dans les vacances
+        df_vacances = df_calendrier_scolaire[
+            df_calendrier_scolaire[CalendrierScolaireColumns.description].str.startswith('Vacances')]
+        localized_days = days.tz_localize(IDF_TIMEZONE)
+        is_vacances = np.zeros(len(days), dtype=bool)
+        for start_date, end_date in zip(pd.to_datetime(df_vacances[CalendrierScolaireColumns.start_date]),
+                                        pd.to_datetime(df_vacances[CalendrierScolaireColumns.end_date])):
+            is_vacances |= (start_date <= localized_days) & (end_date > localized_days)
+
+        is_ete = (days >= pd.Timestamp(periode_ete[0])) & (days <= pd.Timestamp(periode_ete[1]))
+        self.period_names = np.where(
+            is_ete, PeriodeName.ete, np.where(is_vacances, PeriodeName.vacances_scolaires, PeriodeName.plein_trafic))
+
+        holidays = [
+            holiday
+            for year in range(date_range[0].year, date_range[1].year + 1)
+            for holiday, _ in self.calendrier.holidays(year)
+        ]
+        self.is_holiday = days.isin(pd.to_datetime(holidays))
+        self.day_types = np.where(
+            (days.weekday == 6) | self.is_holiday, DayType.sunday_or_holiday,
+            np.where(days.weekday < 5, DayType.week, DayType.saturday))
+
+    def _position(self, day: date) -> int:
+        """Position de la date dans l'index, -1 si la date est hors de la plage de l'index."""
+        position = day.toordinal() - self.start_ordinal
+        return position if 0 <= position < len(self.period_names) else -1
+
+    def period_name(self, day: date) -> str:
+        """Nom de la période de la date, voir get_period_name."""
+        position = self._position(day)
+        if position < 0:
+            return get_period_name(day, self.df_calendrier_scolaire, self.periode_ete)
+        return self.period_names[position]
+
+    def day_type(self, day: date) -> str:
+        """Type de jour de la date, voir get_day_type."""
+        position = self._position(day)
+        if position < 0:
+            return get_day_type(day, self.calendrier)
+        return self.day_types[position]
+
+
 def generate_suffix_by_aggregation(
-    df_calendrier_scolaire: pd.DataFrame, periode_ete: tuple[date, date] | None = None, window_name: str = ""
+    df_calendrier_scolaire: pd.DataFrame, periode_ete: tuple[date, date] | None = None, window_name: str = "",
+    date_range: tuple[date, date] | None = None
 ) -> dict:
     """
     Génère un dictionnaire de suffixes basés sur la date et le calendrier scolaire.
@@ -59,38 +149,33 @@ def generate_suffix_by_aggregation(
         Nom de la fenêtre, par défaut "".
         Si une fenêtre est spécifiée, elle sera ajoutée au suffixe pour les niveaux d'agrégation
         'by_period_weekdays_window'.
+    date_range : tuple[date, date], optional
+        Plage des dates à agréger. Si elle est spécifiée avec la période d'été, la période et le type de jour de chaque
+        date sont précalculés une seule fois, voir CalendarIndex.
 
     Returns
     -------
     dict
         Dictionnaire contenant les suffixes pour chaque niveau d'agrégation.
     """
-    calendrier = France()
+    if date_range is not None and periode_ete is not None:
+        calendar_index = CalendarIndex(date_range, df_calendrier_scolaire, periode_ete)
+        period_name, day_type = calendar_index.period_name, calendar_index.day_type
+    else:
+        calendrier = France()
+
+        def period_name(x: date) -> str:
+            return get_period_name(x, df_calendrier_scolaire, periode_ete)
+
+        def day_type(x: date) -> str:
+            return get_day_type(x, calendrier)
 
     suffix_by_agg: dict[str, Callable[[date], str]] = {
         AggregationLevel.by_month: lambda x: x.strftime('%Y_%m'),
         AggregationLevel.by_year: lambda x: x.strftime('%Y'),
-        AggregationLevel.by_period: lambda x: x.strftime('%Y_') + get_period_name(
-            x, df_calendrier_scolaire, periode_ete),
-        AggregationLevel.by_period_weekdays: lambda x: (
-            x.strftime('%Y_sunday_or_holiday_') + get_period_name(x, df_calendrier_scolaire, periode_ete)
-            if (x.weekday() == 6) or calendrier.is_holiday(x)
-            else (
-                x.strftime('%Y_week_') + get_period_name(x, df_calendrier_scolaire, periode_ete) if x.weekday() < 5 else
-                x.strftime('%Y_saturday_') + get_period_name(x, df_calendrier_scolaire, periode_ete)
-            )
-        ),
-        AggregationLevel.by_period_weekdays_window: lambda x: (
-            window_name + x.strftime('sunday_or_holiday_') + get_period_name(x, df_calendrier_scolaire, periode_ete)
-            if (x.weekday() == 6) or calendrier.is_holiday(x)
-            else (
-                window_name + x.strftime('week_') + get_period_name(x, df_calendrier_scolaire, periode_ete)
-                if x.weekday() < 5
-                else (
-                    window_name + x.strftime('saturday_') + get_period_name(x, df_calendrier_scolaire, periode_ete)
-                )
-            )
-        ),
+        AggregationLevel.by_period: lambda x: x.strftime('%Y_') + period_name(x),
+        AggregationLevel.by_period_weekdays: lambda x: x.strftime('%Y_') + f"{day_type(x)}_{period_name(x)}",
+        AggregationLevel.by_period_weekdays_window: lambda x: window_name + f"{day_type(x)}_{period_name(x)}",
         AggregationLevel.by_year_weekdays: lambda x: (
             x.strftime('%Y_week') if x.weekday() < 5 else x.strftime('%Y_weekend')
         ),
@@ -0,0 +1,174 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from offre_realisee.config.aggregation_config import PartialSums, PARTIAL_SUMS_SCORE_SCALE
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.config.offre_realisee_config import Mesure
+
+
+def get_columns_to_sum(mesure: Mesure) -> list[str]:
+    """Colonnes sommées lors de l'agrégation, les taux étant calculés à partir de ces sommes.
+
+    Parameters
+    ----------
+    mesure : Mesure
+        Objet Mesure spécifiant les colonnes à agréger.
+
+    Returns
+    -------
+    columns_to_sum : list[str]
+        Nombre théorique, nombre réel, score de conformité et types de situations inacceptables.
+    """
+    return [
+        mesure.nombre_theorique,
+        mesure.nombre_reel,
+        mesure.score_de_conformite,
+        *mesure.situation_inacceptable_types,
+    ]
+
+
+def add_taux(df_aggregated: pd.DataFrame, mesure: Mesure) -> pd.DataFrame:
+    """Calcule le taux de conformité et le taux d'absence de données à partir des sommes agrégées.
+
+    Parameters
+    ----------
+    df_aggregated : pd.DataFrame
+        DataFrame contenant les sommes agrégées, voir get_columns_to_sum.
+    mesure : Mesure
+        Objet Mesure spécifiant les colonnes agrégées.
+
+    Returns
+    -------
+    pd.DataFrame: DataFrame agrégé avec les colonnes de taux.
+    """
+    df_aggregated[mesure.taux_de_conformite] = round(
+            df_aggregated[mesure.score_de_conformite] / df_aggregated[mesure.nombre_theorique] * 100, 2
+    )
+
+    df_aggregated[mesure.taux_absence_de_donnees] = round(
+            (df_aggregated[mesure.nombre_theorique] - df_aggregated[mesure.nombre_reel]) /
+            df_aggregated[mesure.nombre_theorique] * 100, 2
+    )
+
+    return df_aggregated
+
+
+def empty_partial_sums(mesure: Mesure) -> pd.DataFrame:
+    """Sommes partielles sans aucune journée, voir compute_daily_partial_sums."""
+    return partial_sums_from_records([], mesure)
+
+
+def compute_daily_partial_sums(df_all_mesure: pd.DataFrame, mesure: Mesure) -> dict[str, pd.DataFrame]:
+    """Calcule la contribution de chaque jour aux sommes partielles d'une agrégation.
+
+    La contribution d'un jour contient, par ligne, les colonnes sommées lors de l'agrégation et le nombre de jours
+    (toujours 1). Le score de conformité est converti en entier (voir PARTIAL_SUMS_SCORE_SCALE) afin que les
+    contributions puissent être ajoutées et retirées sans erreur d'arrondi.
+
+    Parameters
+    ----------
+    df_all_mesure : pd.DataFrame
+        DataFrame contenant les mesures quotidiennes de qualité de service, avec la colonne JOUR.
+    mesure : Mesure
+        Objet Mesure spécifiant les colonnes à agréger.
+
+    Returns
+    -------
+    daily_partial_sums : dict[str, pd.DataFrame]
+        Contribution de chaque jour (AAAA-MM-JJ), indexée par ligne.
+    """
+    columns_to_sum = get_columns_to_sum(mesure)
+
+    df_all_mesure = df_all_mesure[[InputColumns.jour, mesure.ligne, *columns_to_sum]].copy()
+    df_all_mesure[mesure.score_de_conformite] = np.rint(
+        df_all_mesure[mesure.score_de_conformite] * PARTIAL_SUMS_SCORE_SCALE)
+
+    df_daily_sums = df_all_mesure.groupby(
+        [InputColumns.jour, mesure.ligne], observed=True)[columns_to_sum].sum().astype('int64')
+    df_daily_sums[PartialSums.nombre_jours] = 1
+
+    return {jour: df_jour.droplevel(0) for jour, df_jour in df_daily_sums.groupby(level=0)}
+
+
+def add_partial_sums(
+    df_partial_sums: pd.DataFrame, daily_partial_sums: list[pd.DataFrame], sign: int = 1
+) -> pd.DataFrame:
+    """Ajoute (sign=1) ou retire (sign=-1) la contribution de plusieurs jours aux sommes partielles.
+
+    Les lignes qui ne sont plus présentes dans aucun jour sont supprimées.
+
+    Parameters
+    ----------
+    df_partial_sums : pd.DataFrame
+        Sommes partielles, indexées par ligne.
+    daily_partial_sums : list[pd.DataFrame]
+        Contributions des jours à ajouter ou retirer, voir compute_daily_partial_sums.
+    sign : int
+        1 pour ajouter les contributions, -1 pour les retirer, par défaut à 1.
+
+    Returns
+    -------
+    df_partial_sums : pd.DataFrame
+        Sommes partielles mises à jour, triées par ligne.
+    """
+    partial_sums_to_concat = [
+        df for df in [df_partial_sums, *(sign * df_daily for df_daily in daily_partial_sums)] if not df.empty]
+    if not partial_sums_to_concat:
+        return df_partial_sums
+
+    df_partial_sums = pd.concat(partial_sums_to_concat).groupby(level=0).sum().astype('int64')
+
+    return df_partial_sums[df_partial_sums[PartialSums.nombre_jours] > 0]
+
+
+def partial_sums_to_mesure(df_partial_sums: pd.DataFrame, mesure: Mesure) -> pd.DataFrame:
+    """Calcule les mesures agrégées à partir des sommes partielles.
+
+    Parameters
+    ----------
+    df_partial_sums : pd.DataFrame
+        Sommes partielles, indexées par ligne.
+    mesure : Mesure
+        Objet Mesure spécifiant les colonnes agrégées.
+
+    Returns
+    -------
+    pd.DataFrame: DataFrame agrégé des mesures de qualité de service, identique à celui de aggregate_df.
+    """
+    df_aggregated = df_partial_sums.drop(columns=[PartialSums.nombre_jours])
+    df_aggregated[mesure.score_de_conformite] = df_aggregated[mesure.score_de_conformite] / PARTIAL_SUMS_SCORE_SCALE
+
+    return add_taux(df_aggregated, mesure).reset_index()
+
+
+def partial_sums_to_records(df_partial_sums: pd.DataFrame) -> list[dict]:
+    """Convertit des sommes partielles en liste d'enregistrements sérialisables en JSON."""
+    return df_partial_sums.reset_index().to_dict(orient='records')
+
+
+def partial_sums_from_records(records: list[dict], mesure: Mesure) -> pd.DataFrame:
+    """Reconstruit des sommes partielles, indexées par ligne, depuis une liste d'enregistrements.
+
+    Parameters
+    ----------
+    records : list[dict]
+        Enregistrements, voir partial_sums_to_records.
+    mesure : Mesure
+        Objet Mesure spécifiant les colonnes agrégées.
+
+    Returns
+    -------
+    df_partial_sums : pd.DataFrame
+        Sommes partielles, indexées par ligne.
+    """
+    columns = [*get_columns_to_sum(mesure), PartialSums.nombre_jours]
+    return pd.DataFrame.from_records(
+        records, columns=[mesure.ligne, *columns]).set_index(mesure.ligne).astype('int64')
+
+
+def partial_sums_digest(records: list[dict]) -> str:
+    """Empreinte d'une contribution journalière, qui identifie une version des mesures d'un jour."""
+    return hashlib.sha256(json.dumps(records, sort_keys=True).encode()).hexdigest()[:16]
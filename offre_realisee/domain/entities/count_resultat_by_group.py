@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+
+def encode_groups(df: pd.DataFrame, by: list[str]) -> tuple[pd.Index, np.ndarray]:
+    """Associe à chaque ligne du DataFrame le code de son groupe.
+
+    Parameters
+    ----------
+    df : DataFrame
+        DataFrame à regrouper.
+    by : list[str]
+        Colonnes définissant les groupes.
+
+    Returns
+    -------
+    group_index, group_codes : tuple[Index, ndarray]
+        Clés triées des groupes et code du groupe de chaque ligne, position de sa clé dans group_index. Les lignes dont
+        une des colonnes est manquante n'appartiennent à aucun groupe et ont le code -1.
+    """
+    grouped = df.groupby(by, observed=True)
+    return grouped.size().index, grouped.ngroup().fillna(-1).to_numpy(dtype=int)
+
+
+def encode_resultat(resultat: pd.Series, categories: tuple[float, ...]) -> np.ndarray:
+    """Associe à chaque score de conformité le code de sa catégorie.
+
+    Le code d'un score est sa position dans categories. Un score hors des catégories a le code len(categories), un
+    score manquant le code len(categories) + 1.
+
+    Parameters
+    ----------
+    resultat : Series
+        Scores de conformité.
+    categories : tuple[float, ...]
+        Valeurs distinctes des scores de conformité à distinguer.
+
+    Returns
+    -------
+    resultat_codes : ndarray
+        Code de la catégorie de chaque score de conformité.
+    """
+    values = resultat.to_numpy(dtype=float, na_value=np.nan)
+    sorted_positions = np.argsort(categories)
+    sorted_categories = np.asarray(categories, dtype=float)[sorted_positions]
+
+    positions = np.minimum(np.searchsorted(sorted_categories, values), len(categories) - 1)
+    resultat_codes = np.where(sorted_categories[positions] == values, sorted_positions[positions], len(categories))
+    resultat_codes[np.isnan(values)] = len(categories) + 1
+    return resultat_codes
+
+
+def count_resultat_by_group(
+    group_codes: np.ndarray, resultat_codes: np.ndarray, n_groups: int, n_categories: int
+) -> np.ndarray:
+    """Compte, en un seul passage, le nombre de scores de conformité de chaque catégorie pour chaque groupe.
+
+    Parameters
+    ----------
+    group_codes : ndarray
+        Code du groupe de chaque score de conformité, voir encode_groups.
+    resultat_codes : ndarray
+        Code de la catégorie de chaque score de conformité, voir encode_resultat.
+    n_groups : int
+        Nombre de groupes.
+    n_categories : int
+        Nombre de catégories utilisées par encode_resultat.
+
+    Returns
+    -------
+    counts : ndarray
+        Matrice (groupe, code) du nombre de scores de conformité. La matrice a n_categories + 2 colonnes : les
+        catégories, puis les scores hors catégories, puis les scores manquants.
+    """
+    n_codes = n_categories + 2
+    in_group = group_codes >= 0
+    keys = group_codes[in_group] * n_codes + resultat_codes[in_group]
+    return np.bincount(keys, minlength=n_groups * n_codes).reshape(n_groups, n_codes)
+
+
+def sum_resultat_by_group(group_codes: np.ndarray, resultat: np.ndarray, n_groups: int) -> np.ndarray:
+    """Somme les scores de conformité de chaque groupe, les scores manquants étant ignorés.
+
+    Les scores de chaque groupe sont sommés dans leur ordre d'origine, de sorte que la somme est identique, au bit
+    près, à celle de pandas.Series.sum sur le groupe.
+
+    Parameters
+    ----------
+    group_codes : ndarray
+        Code du groupe de chaque score de conformité, voir encode_groups.
+    resultat : ndarray
+        Scores de conformité.
+    n_groups : int
+        Nombre de groupes.
+
+    Returns
+    -------
+    sums : ndarray
+        Somme des scores de conformité de chaque groupe.
+    """
+    order = np.argsort(group_codes, kind="stable")
+    sorted_resultat = np.nan_to_num(resultat[order], nan=0.)
+    bounds = np.searchsorted(group_codes[order], np.arange(n_groups + 1))
+    return np.array([sorted_resultat[start:end].sum() for start, end in zip(bounds[:-1], bounds[1:])], dtype=float)
@@ -1,6 +1,8 @@
 import pandas as pd
 
 from offre_realisee.config.input_config import InputColumns
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.domain.entities.metrics import get_metrics
 
 
 def drop_stop_without_real_time(df: pd.DataFrame) -> pd.DataFrame:
@@ -17,8 +19,9 @@ def drop_stop_without_real_time(df: pd.DataFrame) -> pd.DataFrame:
     df : DataFrame
         DataFrame filtré excluant les arrêts sans heure réelle.
     """
-    if df[InputColumns.heure_reelle].isna().all():
-        return df
-    return df.groupby(InputColumns.arret).filter(
-        lambda x: x[InputColumns.heure_reelle].notna().any()
-    )
+    with get_metrics().timer(MetricName.drop_stop_without_real_time):
+        if df[InputColumns.heure_reelle].isna().all():
+            return df
+        return df.groupby(InputColumns.arret, observed=True).filter(
+            lambda x: x[InputColumns.heure_reelle].notna().any()
+        )
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.domain.entities.add_frequency import add_frequency_by_stop
+from offre_realisee.domain.entities.drop_duplicates_heure_theorique import drop_duplicates_heure_theorique
+from offre_realisee.domain.entities.metrics import get_metrics
+
+StopKey = tuple[str, str, str]
+
+
+def prepare_offre_realisee_by_stop(df_offre_realisee: pd.DataFrame) -> pd.DataFrame:
+    """Prépare les données d'offre réalisée d'une journée pour les calculs par arrêt.
+
+    Les heures théoriques dupliquées sont supprimées, puis la fréquence de passage est ajoutée en une seule passe sur
+    toute la journée.
+
+    Parameters
+    ----------
+    df_offre_realisee : DataFrame
+        DataFrame contenant les données d'offre réalisée.
+
+    Returns
+    -------
+    df_offre_realisee : DataFrame
+        DataFrame trié par ligne, sens, arrêt et heure théorique, avec la fréquence de passage.
+    """
+    metrics = get_metrics()
+    with metrics.timer(MetricName.drop_duplicates_heure_theorique):
+        df_offre_realisee = drop_duplicates_heure_theorique(df_offre_realisee)
+    with metrics.timer(MetricName.add_frequency):
+        return add_frequency_by_stop(df_offre_realisee)
+
+
+def group_offre_realisee_by_stop(df_offre_realisee: pd.DataFrame) -> list[tuple[StopKey, pd.DataFrame]]:
+    """Prépare les données d'offre réalisée d'une journée et les regroupe par arrêt.
+
+    Les données sont préparées avec prepare_offre_realisee_by_stop, puis regroupées par ligne, sens et arrêt. Le
+    résultat peut être partagé entre les calculs de ponctualité et de régularité.
+
+    Parameters
+    ----------
+    df_offre_realisee : DataFrame
+        DataFrame contenant les données d'offre réalisée.
+
+    Returns
+    -------
+    stops : list[tuple[StopKey, DataFrame]]
+        Liste des groupes (ligne, sens, arrêt) et de leurs données avec la fréquence de passage.
+    """
+    return group_prepared_offre_realisee_by_stop(prepare_offre_realisee_by_stop(df_offre_realisee))
+
+
+def group_prepared_offre_realisee_by_stop(df_offre_realisee: pd.DataFrame) -> list[tuple[StopKey, pd.DataFrame]]:
+    """Regroupe par ligne, sens et arrêt des données déjà préparées avec prepare_offre_realisee_by_stop.
+
+    Parameters
+    ----------
+    df_offre_realisee : DataFrame
+        DataFrame préparé contenant les données d'offre réalisée.
+
+    Returns
+    -------
+    stops : list[tuple[StopKey, DataFrame]]
+        Liste des groupes (ligne, sens, arrêt) et de leurs données avec la fréquence de passage.
+    """
+    with get_metrics().timer(MetricName.group_by_stop):
+        df_grouped = df_offre_realisee.groupby(by=[
+            InputColumns.ligne, InputColumns.sens, InputColumns.arret
+        ], observed=True)
+
+        return list(df_grouped)
@@ -0,0 +1,151 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator
+
+
+class MetricsRegistry:
+    """Registre des mesures de performance d'un calcul : durées cumulées par étape, compteurs et maxima.
+
+    Les étapes instrumentées récupèrent le registre actif avec get_metrics. Le registre n'est actif que dans un bloc
+    collect_metrics, propre à chaque processus ; en dehors, get_metrics renvoie DISABLED_METRICS, dont les méthodes ne
+    font rien.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.timings: dict[str, list] = {}
+        self.counters: dict[str, int] = {}
+        self.maxima: dict[str, int] = {}
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Ajoute la durée du bloc à la durée cumulée de l'étape name.
+
+        Parameters
+        ----------
+        name : str
+            Nom de l'étape, voir MetricName.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing = self.timings.setdefault(name, [0.0, 0])
+            timing[0] += time.perf_counter() - start
+            timing[1] += 1
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Ajoute value au compteur name.
+
+        Parameters
+        ----------
+        name : str
+            Nom du compteur, voir MetricName.
+        value : int
+            Valeur à ajouter, par défaut 1.
+        """
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def maximum(self, name: str, value: int) -> None:
+        """Conserve la plus grande valeur observée pour name.
+
+        Parameters
+        ----------
+        name : str
+            Nom du maximum, voir MetricName.
+        value : int
+            Valeur observée.
+        """
+        self.maxima[name] = max(self.maxima.get(name, 0), int(value))
+
+    def merge(self, metrics: dict) -> None:
+        """Ajoute les mesures d'un autre registre, par exemple celles d'une ligne calculée dans un autre processus.
+
+        Parameters
+        ----------
+        metrics : dict
+            Mesures d'un registre, voir to_dict.
+        """
+        for name, timing in metrics['timings'].items():
+            merged_timing = self.timings.setdefault(name, [0.0, 0])
+            merged_timing[0] += timing['seconds']
+            merged_timing[1] += timing['calls']
+        for name, value in metrics['counters'].items():
+            self.count(name, value)
+        for name, value in metrics['maxima'].items():
+            self.maximum(name, value)
+
+    def to_dict(self) -> dict:
+        """Mesures du registre, sérialisables en JSON.
+
+        Returns
+        -------
+        metrics : dict
+            - timings : durée cumulée en secondes et nombre d'appels de chaque étape
+            - counters : valeur de chaque compteur
+            - maxima : plus grande valeur observée de chaque maximum
+        """
+        return {
+            'timings': {
+                name: {'seconds': seconds, 'calls': calls} for name, (seconds, calls) in sorted(self.timings.items())
+            },
+            'counters': dict(sorted(self.counters.items())),
+            'maxima': dict(sorted(self.maxima.items())),
+        }
+
+
+class DisabledMetricsRegistry(MetricsRegistry):
+    """Registre inactif : aucune mesure n'est prise, le coût se limite à un appel de méthode."""
+    enabled = False
+
+    # nullcontext est réutilisable, aucun objet n'est créé à chaque bloc chronométré
+    _null_timer = nullcontext()
+
+    def timer(self, name: str) -> ContextManager[None]:
+        return self._null_timer
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def maximum(self, name: str, value: int) -> None:
+        pass
+
+
+DISABLED_METRICS = DisabledMetricsRegistry()
+
+_active_metrics: MetricsRegistry = DISABLED_METRICS
+
+
+def get_metrics() -> MetricsRegistry:
+    """Renvoie le registre actif du processus, DISABLED_METRICS en dehors d'un bloc collect_metrics.
+
+    Returns
+    -------
+    metrics : MetricsRegistry
+        Registre actif.
+    """
+    return _active_metrics
+
+
+@contextmanager
+def collect_metrics(enabled: bool = True) -> Iterator[MetricsRegistry]:
+    """Active un nouveau registre pour la durée du bloc, puis restaure le registre précédent.
+
+    Parameters
+    ----------
+    enabled : bool
+        Si False, le bloc s'exécute avec DISABLED_METRICS et aucune mesure n'est prise. Par défaut à True.
+
+    Returns
+    -------
+    metrics : MetricsRegistry
+        Registre actif dans le bloc.
+    """
+    global _active_metrics
+
+    previous_metrics = _active_metrics
+    _active_metrics = MetricsRegistry() if enabled else DISABLED_METRICS
+    try:
+        yield _active_metrics
+    finally:
+        _active_metrics = previous_metrics
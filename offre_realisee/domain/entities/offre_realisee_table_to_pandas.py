@@ -0,0 +1,43 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from offre_realisee.config.input_config import InputColumns, CATEGORICAL_INPUT_COLUMNS
+
+
+def offre_realisee_table_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Convertit une table Arrow d'offre réalisée en DataFrame aux types compacts.
+
+    - Les identifiants (ligne, sens, arrêt) sont encodés en dictionnaire avant la conversion, puis convertis en
+      catégories triées : aucune chaîne Python n'est créée par passage, et l'ordre des catégories est celui des
+      chaînes, les tris et regroupements donnent donc le même ordre qu'avec des chaînes.
+    - IS_TERMINUS est converti en booléen numpy s'il ne contient pas de valeur manquante.
+    Les heures restent des datetime64 en UTC, déjà stockées sur 8 octets par passage.
+
+    Parameters
+    ----------
+    table : Table
+        Table Arrow d'offre réalisée.
+
+    Returns
+    -------
+    df_offre_realisee : DataFrame
+        DataFrame d'offre réalisée.
+    """
+    for column in CATEGORICAL_INPUT_COLUMNS:
+        if column in table.column_names and not pa.types.is_dictionary(table.schema.field(column).type):
+            table = table.set_column(
+                table.schema.get_field_index(column), column, pc.dictionary_encode(table[column]))
+
+    df_offre_realisee = table.to_pandas()
+
+    for column in CATEGORICAL_INPUT_COLUMNS:
+        if column in df_offre_realisee.columns:
+            categories = df_offre_realisee[column].cat.categories
+            df_offre_realisee[column] = df_offre_realisee[column].cat.set_categories(categories.sort_values())
+
+    if (InputColumns.is_terminus in df_offre_realisee.columns and
+            not df_offre_realisee[InputColumns.is_terminus].hasnans):
+        df_offre_realisee[InputColumns.is_terminus] = df_offre_realisee[InputColumns.is_terminus].astype(bool)
+
+    return df_offre_realisee
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from typing import Optional
 
 import numpy as np
 from offre_realisee.config.offre_realisee_config import FrequenceType, ComplianceType, MesureType
@@ -38,7 +39,8 @@ class FrequencyThreshold:
 
 
 def score(freq: FrequenceType, matrix: np.ndarray, is_terminus: np.ndarray,
-          next_theorique_interval: np.ndarray) -> np.ndarray:
+          next_theorique_interval: np.ndarray, previous_theorique_interval: Optional[np.ndarray] = None
+          ) -> np.ndarray:
     """Calcul des scores de conformité pour la ponctualité.
 
     Parameters
@@ -51,6 +53,9 @@ def score(freq: FrequenceType, matrix: np.ndarray, is_terminus: np.ndarray,
         Tableau de booléen indiquant si un arrêt est un terminus d'arrivée ou non.
     next_theorique_interval : ndarray
         Tableau contenant les intervalles de temps avec le prochain passage théorique.
+    previous_theorique_interval : ndarray, optional
+        Tableau contenant les intervalles de temps avec le passage théorique précédent. Par défaut, il est déduit de
+        next_theorique_interval en décalant les intervalles d'une ligne.
 
     Returns
     -------
@@ -96,7 +101,9 @@ def score(freq: FrequenceType, matrix: np.ndarray, is_terminus: np.ndarray,
     matrix_score[where_next_theorique_lower_than_reelle] = ComplianceType.situation_inacceptable_absence
 
     # Exception - Le bus passe avant l'arrêt précédent : il n'est pas assigné
-    where_prev_theorique_greater_than_reelle = np.where(matrix < -np.roll(next_theorique_interval, 1))
+    if previous_theorique_interval is None:
+        previous_theorique_interval = np.roll(next_theorique_interval, 1)
+    where_prev_theorique_greater_than_reelle = np.where(matrix < -previous_theorique_interval)
     matrix_score[where_prev_theorique_greater_than_reelle] = ComplianceType.situation_inacceptable_absence
 
     # Exception - bus en avance au terminus : il est compliant
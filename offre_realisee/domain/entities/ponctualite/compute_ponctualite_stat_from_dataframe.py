@@ -1,8 +1,13 @@
-from offre_realisee.config.input_config import InputColumns
+import logging
+from collections import Counter
+
 from offre_realisee.config.logger import logger
-from offre_realisee.domain.entities.add_frequency import add_frequency
-from offre_realisee.domain.entities.drop_duplicates_heure_theorique import drop_duplicates_heure_theorique
-from offre_realisee.domain.entities.ponctualite.process_stop_ponctualite import process_stop_ponctualite
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.config.offre_realisee_config import AssignmentSolver
+from offre_realisee.domain.entities.group_offre_realisee_by_stop import StopKey, group_offre_realisee_by_stop
+from offre_realisee.domain.entities.metrics import get_metrics
+from offre_realisee.domain.entities.ponctualite.process_stop_ponctualite import (
+    process_stop_ponctualite, block_size_histogram)
 from offre_realisee.domain.entities.ponctualite.stat_compliance_score_ponctualite import (
     stat_compliance_score_ponctualite)
 
@@ -11,7 +16,7 @@ import pandas as pd
 
 
 def compute_ponctualite_stat_from_dataframe(
-    df_offre_realisee: pd.DataFrame, metadata_cols: list[str] = []
+    df_offre_realisee: pd.DataFrame, metadata_cols: list[str] = [], solver: AssignmentSolver = AssignmentSolver.dense
 ) -> pd.DataFrame:
     """Calcule les statistiques de ponctualité à partir d'un DataFrame d'offre réalisée.
 
@@ -21,27 +26,60 @@ def compute_ponctualite_stat_from_dataframe(
         DataFrame contenant les données d'offre réalisée.
     metadata_cols: list[str]
         Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique, par défaut AssignmentSolver.dense.
 
     Returns
     -------
     df : DataFrame
         DataFrame contenant les statistiques de conformité pour chaque ligne.
     """
-    df_offre_realisee = drop_duplicates_heure_theorique(df_offre_realisee)
+    stops = group_offre_realisee_by_stop(df_offre_realisee)
 
-    df_grouped = df_offre_realisee.groupby(by=[
-        InputColumns.ligne, InputColumns.sens, InputColumns.arret
-    ])
+    return compute_ponctualite_stat_from_stops(stops=stops, metadata_cols=metadata_cols, solver=solver)
 
-    df_concat_ponctualite = pd.DataFrame()
-    for (ligne, sens, arret), df_by_stop in df_grouped:
-        logger.debug(f'Process: ligne {ligne} - sens {sens} - arret {arret}')
 
-        df_by_stop = add_frequency(df_by_stop)
+def compute_ponctualite_stat_from_stops(
+    stops: list[tuple[StopKey, pd.DataFrame]], metadata_cols: list[str] = [],
+    solver: AssignmentSolver = AssignmentSolver.dense
+) -> pd.DataFrame:
+    """Calcule les statistiques de ponctualité à partir des données déjà regroupées par arrêt.
+
+    Parameters
+    ----------
+    stops : list[tuple[StopKey, DataFrame]]
+        Groupes (ligne, sens, arrêt) et leurs données avec la fréquence de passage, voir
+        group_offre_realisee_by_stop.
+    metadata_cols: list[str]
+        Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique, par défaut AssignmentSolver.dense. Avec
+        AssignmentSolver.time_window, l'histogramme des tailles de blocs est journalisé au niveau DEBUG.
+
+    Returns
+    -------
+    df : DataFrame
+        DataFrame contenant les statistiques de conformité pour chaque ligne.
+    """
+    block_sizes = (
+        Counter() if solver == AssignmentSolver.time_window and logger.isEnabledFor(logging.DEBUG) else None
+    )
+
+    scores_by_stop_ponctualite: list[pd.DataFrame] = []
+    for (ligne, sens, arret), df_by_stop in stops:
+        logger.debug(f'Process: ligne {ligne} - sens {sens} - arret {arret}')
 
         logger.debug('Ponctualite')
-        score_by_stop_ponctualite = process_stop_ponctualite(df_by_stop)
+        score_by_stop_ponctualite = process_stop_ponctualite(df_by_stop, solver=solver, block_sizes=block_sizes)
         if not score_by_stop_ponctualite.empty:
-            df_concat_ponctualite = pd.concat([df_concat_ponctualite, score_by_stop_ponctualite], ignore_index=True)
+            scores_by_stop_ponctualite.append(score_by_stop_ponctualite)
+
+    if block_sizes:
+        logger.debug(f'Ponctualite block sizes: {block_size_histogram(block_sizes)}')
+
+    df_concat_ponctualite = (
+        pd.concat(scores_by_stop_ponctualite, ignore_index=True) if scores_by_stop_ponctualite else pd.DataFrame()
+    )
 
-    return stat_compliance_score_ponctualite(df=df_concat_ponctualite, metadata_cols=metadata_cols)
+    with get_metrics().timer(MetricName.stat_ponctualite):
+        return stat_compliance_score_ponctualite(df=df_concat_ponctualite, metadata_cols=metadata_cols)
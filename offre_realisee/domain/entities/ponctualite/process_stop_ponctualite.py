@@ -1,9 +1,16 @@
+from collections import Counter
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 from scipy.optimize import linear_sum_assignment
 
-from offre_realisee.config.offre_realisee_config import MesurePonctualite, FrequenceType, ComplianceType
-from offre_realisee.domain.entities.ponctualite.compliance_score import score
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.config.offre_realisee_config import (MesurePonctualite, FrequenceType, ComplianceType,
+                                                         AssignmentSolver)
+from offre_realisee.domain.entities.metrics import get_metrics
+from offre_realisee.domain.entities.ponctualite.compliance_score import score, FrequencyThreshold
+from offre_realisee.domain.entities.ponctualite.solve_assignment import solve_assignment
 from offre_realisee.domain.entities.ponctualite.pandas_datetime_series_to_unix_timestamp_seconds import (
     pandas_datetime_series_to_unix_timestamp_seconds)
 from numpy import set_printoptions
@@ -11,7 +18,8 @@ from numpy import set_printoptions
 set_printoptions(suppress=True)
 
 
-def process_stop_ponctualite(df_by_stop: pd.DataFrame) -> pd.DataFrame:
+def process_stop_ponctualite(df_by_stop: pd.DataFrame, solver: AssignmentSolver = AssignmentSolver.dense,
+                             block_sizes: Optional[Counter] = None) -> pd.DataFrame:
     """Traitement des données par arrêt et ajout des scores de conformité.
 
     Cette fonction prend un DataFrame avec des données de ponctualité par arrêt et optimise les attributions de temps
@@ -22,6 +30,11 @@ def process_stop_ponctualite(df_by_stop: pd.DataFrame) -> pd.DataFrame:
     ----------
     df_by_stop : DataFrame
         DataFrame contenant les données par arrêt.
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique, par défaut AssignmentSolver.dense. Toutes les
+        méthodes donnent la même somme des scores de conformité.
+    block_sizes : Counter, optional
+        Compteur du nombre de passages théoriques par bloc, alimenté avec AssignmentSolver.time_window.
 
     Returns
     -------
@@ -43,14 +56,30 @@ def process_stop_ponctualite(df_by_stop: pd.DataFrame) -> pd.DataFrame:
         .diff(1).shift(-1)
     )
 
-    # Calcul de la pénalité associée à chaque paires théorique/réelle possible
-    cost_matrix = compute_cost_matrix(df_by_stop, heure_reelle_col_copy)
+    metrics = get_metrics()
+    metrics.count(MetricName.stops_processed)
+    if solver == AssignmentSolver.time_window:
+        # Les passages théoriques sans heure réelle associée restent en situation d'absence
+        df_by_stop[MesurePonctualite.resultat] = ComplianceType.situation_inacceptable_absence
+        with metrics.timer(MetricName.time_window_blocks):
+            reelle_indices, theorique_indices, resultat = solve_time_window_blocks(
+                df_by_stop, heure_reelle_col_copy, block_sizes=block_sizes)
+    else:
+        # Calcul de la pénalité associée à chaque paires théorique/réelle possible
+        with metrics.timer(MetricName.cost_matrix):
+            cost_matrix = compute_cost_matrix(df_by_stop, heure_reelle_col_copy)
+        metrics.count(MetricName.matrix_cells_scored, cost_matrix.size)
 
-    # Calcul de la meilleur combinaison possible minimisant les pénalités reçues
-    reelle_indices, theorique_indices = linear_sum_assignment(cost_matrix, maximize=True)
+        # Calcul de la meilleur combinaison possible minimisant les pénalités reçues
+        with metrics.timer(MetricName.assignment):
+            reelle_indices, theorique_indices = solve_assignment(cost_matrix, solver=solver)
+        metrics.count(MetricName.assignments)
+        metrics.count(MetricName.assigned_pairs, len(reelle_indices))
+        metrics.maximum(MetricName.assignment_max_size, max(cost_matrix.shape))
+        resultat = cost_matrix[reelle_indices, theorique_indices]
 
     # Associe les scores de compliance
-    df_by_stop.loc[theorique_indices, MesurePonctualite.resultat] = cost_matrix[reelle_indices, theorique_indices]
+    df_by_stop.loc[theorique_indices, MesurePonctualite.resultat] = resultat
 
     # Associe toutes les heures réelles aux meilleurs heures théoriques possible
     df_by_stop.loc[theorique_indices, MesurePonctualite.heure_reelle] = pd.to_datetime(
@@ -118,3 +147,138 @@ def compute_cost_matrix(df_by_stop: pd.DataFrame, heure_reelle_col: pd.Series) -
     )
 
     return matrix.T
+
+
+def solve_time_window_blocks(df_by_stop: pd.DataFrame, heure_reelle_col: pd.Series,
+                             block_sizes: Optional[Counter] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calcule l'association réelle/théorique en résolvant indépendamment chaque bloc de passages voisins.
+
+    Une heure réelle ne peut être associée à une heure théorique que dans une fenêtre de temps autour de celle-ci : au
+    plus une heure d'écart, sans dépasser le passage théorique précédent ni le suivant (sans limite en avance pour un
+    terminus). En dehors de cette fenêtre, la paire est en situation d'absence, comme dans compute_cost_matrix.
+    Un parcours unique des fenêtres triées découpe l'arrêt en blocs indépendants, séparés par les périodes où aucune
+    fenêtre ne se chevauche. La matrice des scores n'est calculée que pour chaque bloc, et chaque bloc est résolu
+    séparément.
+
+    Les scores obtenus sont ceux de la résolution de la matrice complète. En cas d'égalité de score entre plusieurs
+    associations, l'association retenue peut différer.
+
+    Parameters
+    ----------
+    df_by_stop : DataFrame
+        DataFrame contenant les données de ponctualité par arrêt, trié par heure théorique.
+    heure_reelle_col : pd.Series
+        Série contenant les heures réelles des passages.
+    block_sizes : Counter, optional
+        Compteur du nombre de passages théoriques par bloc, mis à jour si renseigné.
+
+    Returns
+    -------
+    reelle_indices, theorique_indices, resultat : tuple[ndarray, ndarray, ndarray]
+        Positions des heures réelles et des heures théoriques associées, et score de conformité de chaque paire. Les
+        heures théoriques absentes n'ont aucune heure réelle associable.
+    """
+    heure_theorique = pandas_datetime_series_to_unix_timestamp_seconds(
+        df_by_stop[MesurePonctualite.heure_theorique]).to_numpy(dtype=float)
+    heure_reelle = pandas_datetime_series_to_unix_timestamp_seconds(heure_reelle_col).to_numpy(dtype=float)
+
+    frequence = df_by_stop[MesurePonctualite.frequence].to_numpy()
+    is_terminus = df_by_stop[MesurePonctualite.is_terminus].to_numpy(dtype=bool, na_value=False)
+    next_theorique_interval = df_by_stop[MesurePonctualite.difference_theorique].to_numpy(dtype=float)
+
+    # Même intervalle avec le passage précédent que celui utilisé par score, calculé par type de fréquence
+    previous_theorique_interval = np.full(len(df_by_stop), np.nan)
+    mask_hf = frequence == FrequenceType.haute_frequence
+    for mask in (mask_hf, ~mask_hf):
+        previous_theorique_interval[mask] = np.roll(next_theorique_interval[mask], 1)
+
+    # Fenêtre des heures réelles associables à chaque heure théorique (np.fmin ignore les intervalles manquants)
+    late_train = np.where(mask_hf, FrequencyThreshold.late_train[FrequenceType.haute_frequence],
+                          FrequencyThreshold.late_train[FrequenceType.basse_frequence])
+    early_train = np.where(mask_hf, FrequencyThreshold.early_train[FrequenceType.haute_frequence],
+                           FrequencyThreshold.early_train[FrequenceType.basse_frequence])
+    window_start = heure_theorique - np.fmin(-early_train, previous_theorique_interval)
+    window_start[is_terminus] = -np.inf
+    window_end = heure_theorique + np.fmin(late_train, next_theorique_interval)
+
+    # Les heures réelles manquantes ne sont jamais associées
+    reelle_positions = np.flatnonzero(~np.isnan(heure_reelle))
+    reelle_positions = reelle_positions[np.argsort(heure_reelle[reelle_positions], kind="stable")]
+    sorted_heure_reelle = heure_reelle[reelle_positions]
+
+    # Intervalle [start, end) des heures réelles triées de chaque fenêtre
+    reelle_start = np.searchsorted(sorted_heure_reelle, window_start, side="left")
+    reelle_end = np.searchsorted(sorted_heure_reelle, window_end, side="right")
+
+    theorique_order = np.argsort(reelle_start, kind="stable")
+    theorique_order = theorique_order[reelle_start[theorique_order] < reelle_end[theorique_order]]
+
+    # Un nouveau bloc commence dès qu'une fenêtre ne chevauche aucune des fenêtres précédentes
+    block_reelle_end = np.maximum.accumulate(reelle_end[theorique_order])
+    is_block_start = np.ones(len(theorique_order), dtype=bool)
+    is_block_start[1:] = reelle_start[theorique_order[1:]] >= block_reelle_end[:-1]
+    block_starts = np.flatnonzero(is_block_start)
+    block_ends = np.append(block_starts[1:], len(theorique_order))
+
+    metrics = get_metrics()
+    reelle_indices, theorique_indices, resultat = [], [], []
+    for block_start, block_end in zip(block_starts, block_ends):
+        # Les positions sont remises dans l'ordre de compute_cost_matrix
+        block_theorique = np.sort(theorique_order[block_start:block_end])
+        block_reelle = np.sort(
+            reelle_positions[reelle_start[theorique_order[block_start]]:block_reelle_end[block_end - 1]])
+
+        block_mask_hf = mask_hf[block_theorique]
+        block_timedelta = np.subtract.outer(heure_reelle[block_reelle], heure_theorique[block_theorique]).T
+        block_matrix = np.full(block_timedelta.shape, np.nan)
+        for freq, mask in ((FrequenceType.haute_frequence, block_mask_hf),
+                           (FrequenceType.basse_frequence, ~block_mask_hf)):
+            block_matrix[mask] = score(
+                freq=freq,
+                matrix=block_timedelta[mask],
+                is_terminus=is_terminus[block_theorique][mask],
+                next_theorique_interval=next_theorique_interval[block_theorique][mask, None],
+                previous_theorique_interval=previous_theorique_interval[block_theorique][mask, None]
+            )
+
+        # Même orientation que compute_cost_matrix (lignes: heures réelles, colonnes: heures théoriques)
+        block_matrix = block_matrix.T
+        block_reelle_indices, block_theorique_indices = linear_sum_assignment(block_matrix, maximize=True)
+        metrics.count(MetricName.matrix_cells_scored, block_matrix.size)
+        metrics.count(MetricName.assignments)
+        metrics.count(MetricName.assigned_pairs, len(block_reelle_indices))
+        metrics.maximum(MetricName.assignment_max_size, max(block_matrix.shape))
+        reelle_indices.append(block_reelle[block_reelle_indices])
+        theorique_indices.append(block_theorique[block_theorique_indices])
+        resultat.append(block_matrix[block_reelle_indices, block_theorique_indices])
+
+        if block_sizes is not None:
+            block_sizes[len(block_theorique)] += 1
+
+    if not resultat:
+        return np.array([], dtype=int), np.array([], dtype=int), np.array([])
+
+    return np.concatenate(reelle_indices), np.concatenate(theorique_indices), np.concatenate(resultat)
+
+
+def block_size_histogram(block_sizes: Counter) -> dict[str, int]:
+    """Regroupe les tailles de blocs par tranches de puissances de deux.
+
+    Parameters
+    ----------
+    block_sizes : Counter
+        Nombre de blocs pour chaque nombre de passages théoriques par bloc.
+
+    Returns
+    -------
+    histogram : dict[str, int]
+        Nombre de blocs par tranche de taille ("1", "2-3", "4-7", ...).
+    """
+    histogram = Counter()
+    for size, count in block_sizes.items():
+        lower = 1 << (int(size).bit_length() - 1)
+        histogram[lower] += count
+
+    return {
+        (str(lower) if lower == 1 else f'{lower}-{2 * lower - 1}'): histogram[lower] for lower in sorted(histogram)
+    }
@@ -0,0 +1,89 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from offre_realisee.config.offre_realisee_config import AssignmentSolver, ComplianceType
+
+
+def solve_assignment(cost_matrix: np.ndarray, solver: AssignmentSolver = AssignmentSolver.dense
+                     ) -> tuple[np.ndarray, np.ndarray]:
+    """Calcule l'association heures réelles / heures théoriques maximisant la somme des scores de conformité.
+
+    Parameters
+    ----------
+    cost_matrix : ndarray
+        Matrice des scores de conformité (lignes: heures réelles, colonnes: heures théoriques).
+    solver : AssignmentSolver
+        Méthode de résolution :
+        - AssignmentSolver.dense : résolution de la matrice complète.
+        - AssignmentSolver.sparse : résolution indépendante de chaque bloc de paires assignables, voir
+          solve_sparse_assignment.
+
+    Returns
+    -------
+    reelle_indices, theorique_indices : tuple[ndarray, ndarray]
+        Indices des heures réelles et des heures théoriques associées, triés par heure réelle.
+    """
+    if solver == AssignmentSolver.sparse:
+        return solve_sparse_assignment(cost_matrix)
+    return linear_sum_assignment(cost_matrix, maximize=True)
+
+
+def solve_sparse_assignment(cost_matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Résout l'association en exploitant la structure creuse de la matrice des scores.
+
+    Une paire dont le score vaut ComplianceType.situation_inacceptable_absence (écart de plus d'une heure, passage
+    au-delà des passages théoriques voisins, heure réelle manquante) n'est jamais réellement assignée. Les autres paires
+    forment un graphe biparti creux, proche d'une bande autour de la diagonale, dont les composantes connexes sont des
+    sous-problèmes indépendants. Chaque composante est résolue séparément, puis les heures restantes sont appariées
+    entre elles en situation d'absence, comme le ferait la résolution de la matrice complète.
+
+    La somme des scores obtenue est identique à celle de la résolution de la matrice complète. En cas d'égalité de
+    score entre plusieurs associations, l'association retenue peut différer.
+
+    Parameters
+    ----------
+    cost_matrix : ndarray
+        Matrice des scores de conformité (lignes: heures réelles, colonnes: heures théoriques).
+
+    Returns
+    -------
+    reelle_indices, theorique_indices : tuple[ndarray, ndarray]
+        Indices des heures réelles et des heures théoriques associées, triés par heure réelle.
+    """
+    n_reelle, n_theorique = cost_matrix.shape
+
+    reelle_assignable, theorique_assignable = np.nonzero(
+        cost_matrix != ComplianceType.situation_inacceptable_absence)
+
+    # Graphe biparti: les noeuds [0, n_reelle) sont les heures réelles, les suivants les heures théoriques
+    graph = coo_matrix(
+        (np.ones(len(reelle_assignable)), (reelle_assignable, theorique_assignable + n_reelle)),
+        shape=(n_reelle + n_theorique, n_reelle + n_theorique)
+    )
+    _, labels = connected_components(graph, directed=False)
+    reelle_labels, theorique_labels = labels[:n_reelle], labels[n_reelle:]
+
+    reelle_indices, theorique_indices = [], []
+    for label in np.unique(labels[reelle_assignable]):
+        block_reelle = np.flatnonzero(reelle_labels == label)
+        block_theorique = np.flatnonzero(theorique_labels == label)
+        block_reelle_indices, block_theorique_indices = linear_sum_assignment(
+            cost_matrix[np.ix_(block_reelle, block_theorique)], maximize=True)
+        reelle_indices.append(block_reelle[block_reelle_indices])
+        theorique_indices.append(block_theorique[block_theorique_indices])
+
+    reelle_indices = np.concatenate(reelle_indices, dtype=int) if reelle_indices else np.array([], dtype=int)
+    theorique_indices = np.concatenate(theorique_indices, dtype=int) if theorique_indices else np.array([], dtype=int)
+
+    # Les heures non associées sont appariées entre elles, toutes ces paires sont en situation d'absence
+    unassigned_reelle = np.setdiff1d(np.arange(n_reelle), reelle_indices)
+    unassigned_theorique = np.setdiff1d(np.arange(n_theorique), theorique_indices)
+    n_unassigned = min(len(unassigned_reelle), len(unassigned_theorique))
+
+    reelle_indices = np.concatenate([reelle_indices, unassigned_reelle[:n_unassigned]])
+    theorique_indices = np.concatenate([theorique_indices, unassigned_theorique[:n_unassigned]])
+
+    order = np.argsort(reelle_indices, kind="stable")
+    return reelle_indices[order], theorique_indices[order]
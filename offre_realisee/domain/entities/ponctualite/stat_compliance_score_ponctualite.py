@@ -1,14 +1,31 @@
+import numpy as np
 import pandas as pd
 
 from offre_realisee.config.offre_realisee_config import FrequenceType, MesurePonctualite, ComplianceType, MesureType
+from offre_realisee.domain.entities.count_resultat_by_group import (
+    encode_groups, encode_resultat, count_resultat_by_group, sum_resultat_by_group)
 
-_SI_VALUES_SET = {
+# Catégories de score de conformité, voir encode_resultat
+_RESULTAT_CATEGORIES = (
+    ComplianceType.compliant_delay,
+    ComplianceType.compliant_advance,
+    ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+    ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.basse_frequence],
+    ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+    ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.basse_frequence],
+    ComplianceType.situation_inacceptable_avance,
+    ComplianceType.situation_inacceptable_retard,
+    ComplianceType.situation_inacceptable_absence,
+)
+_MISSING_CODE = len(_RESULTAT_CATEGORIES) + 1
+
+_SI_CODES = [_RESULTAT_CATEGORIES.index(value) for value in (
     ComplianceType.situation_inacceptable_avance,
     ComplianceType.situation_inacceptable_retard,
-    ComplianceType.situation_inacceptable_absence
-}
+    ComplianceType.situation_inacceptable_absence,
+)]
 
-_ASSIGNED_VALUES_SET = {
+_ASSIGNED_CODES = [_RESULTAT_CATEGORIES.index(value) for value in (
     ComplianceType.compliant_delay,
     ComplianceType.compliant_advance,
     ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
@@ -17,7 +34,7 @@ _ASSIGNED_VALUES_SET = {
     ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.basse_frequence],
     ComplianceType.situation_inacceptable_avance,
     ComplianceType.situation_inacceptable_retard,
-}
+)]
 
 
 def stat_situation_inacceptable(df: pd.DataFrame) -> pd.DataFrame:
@@ -38,23 +55,19 @@ def stat_situation_inacceptable(df: pd.DataFrame) -> pd.DataFrame:
         DataFrame contenant les statistiques sur les SI pour chaque ligne.
     """
     # Compte le nombre de SI par arrêts
-    df_si_grouped = df.groupby([MesurePonctualite.ligne, MesurePonctualite.sens, MesurePonctualite.arret])
-    df_si = df_si_grouped[MesurePonctualite.resultat].agg([
-        (
-            MesurePonctualite.situation_inacceptable_avance,
-            lambda x: x.isin({ComplianceType.situation_inacceptable_avance}).sum()
-        ),
-        (
-            MesurePonctualite.situation_inacceptable_retard,
-            lambda x: x.isin({ComplianceType.situation_inacceptable_retard}).sum()
-        ),
-        (
-            MesurePonctualite.situation_inacceptable_sans_horaire_reel_attribue,
-            lambda x: x.isin({ComplianceType.situation_inacceptable_absence}).sum()
-        )
-    ]).reset_index()
-
-    df_si_grouped_by_sens = df_si.groupby([MesurePonctualite.ligne, MesurePonctualite.sens])
+    stop_index, stop_codes = encode_groups(
+        df, [MesurePonctualite.ligne, MesurePonctualite.sens, MesurePonctualite.arret])
+    resultat_codes = encode_resultat(df[MesurePonctualite.resultat], _RESULTAT_CATEGORIES)
+    counts = count_resultat_by_group(stop_codes, resultat_codes, len(stop_index), len(_RESULTAT_CATEGORIES))
+    df_si = pd.DataFrame(
+        counts[:, _SI_CODES],
+        columns=[MesurePonctualite.situation_inacceptable_avance,
+                 MesurePonctualite.situation_inacceptable_retard,
+                 MesurePonctualite.situation_inacceptable_sans_horaire_reel_attribue],
+        index=stop_index
+    ).reset_index()
+
+    df_si_grouped_by_sens = df_si.groupby([MesurePonctualite.ligne, MesurePonctualite.sens], observed=True)
 
     # Conserve le plus grand nombre de SI de retard pour chaque ligne et sens
     df_retard_max = df_si.loc[df_si_grouped_by_sens[MesurePonctualite.situation_inacceptable_retard].idxmax().values]
@@ -79,7 +92,7 @@ def stat_situation_inacceptable(df: pd.DataFrame) -> pd.DataFrame:
 
     df_final = df_final.drop(columns=[MesurePonctualite.sens])
     df_final = df_final[MesurePonctualite.si_column_order]
-    return df_final.groupby(MesurePonctualite.ligne).sum(numeric_only=True).reset_index()
+    return df_final.groupby(MesurePonctualite.ligne, observed=True).sum(numeric_only=True).reset_index()
 
 
 def stat_compliance_score_ponctualite(df: pd.DataFrame, metadata_cols: list[str] = []) -> pd.DataFrame:
@@ -110,20 +123,32 @@ def stat_compliance_score_ponctualite(df: pd.DataFrame, metadata_cols: list[str]
     """
     df_si = stat_situation_inacceptable(df)
 
-    df = df.groupby([MesurePonctualite.ligne] + metadata_cols)[MesurePonctualite.resultat].agg([
-        (MesurePonctualite.nombre_theorique, 'count'),
-        (MesurePonctualite.nombre_reel, lambda x: x.isin(_ASSIGNED_VALUES_SET).sum()),
-        (MesurePonctualite.score_de_conformite, lambda x: x[~x.isin(_SI_VALUES_SET)].sum()),
-        (MesurePonctualite.non_conforme, lambda x: x.isin(
-            [ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
-             ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.basse_frequence]]).sum()),
-        (MesurePonctualite.semi_conforme, lambda x: x.isin(
-            [ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
-             ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.basse_frequence]]
-        ).sum()),
-        (MesurePonctualite.avance_conforme, lambda x: x.isin([ComplianceType.compliant_advance]).sum()),
-        (MesurePonctualite.retard_conforme, lambda x: x.isin([ComplianceType.compliant_delay]).sum())
-    ]).reset_index()
+    by = [MesurePonctualite.ligne] + metadata_cols
+    group_index, group_codes = encode_groups(df, by)
+    resultat_codes = encode_resultat(df[MesurePonctualite.resultat], _RESULTAT_CATEGORIES)
+    counts = count_resultat_by_group(group_codes, resultat_codes, len(group_index), len(_RESULTAT_CATEGORIES))
+
+    def count(*values: float) -> np.ndarray:
+        return counts[:, [_RESULTAT_CATEGORIES.index(value) for value in values]].sum(axis=1)
+
+    # Somme des scores de conformité hors SI
+    is_score = ~np.isin(resultat_codes, _SI_CODES)
+    resultat = df[MesurePonctualite.resultat].to_numpy(dtype=float, na_value=np.nan)
+    score = sum_resultat_by_group(group_codes[is_score], resultat[is_score], len(group_index))
+
+    df = pd.DataFrame({
+        MesurePonctualite.nombre_theorique: counts[:, :_MISSING_CODE].sum(axis=1),
+        MesurePonctualite.nombre_reel: counts[:, _ASSIGNED_CODES].sum(axis=1),
+        MesurePonctualite.score_de_conformite: score,
+        MesurePonctualite.non_conforme: count(
+            ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+            ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.basse_frequence]),
+        MesurePonctualite.semi_conforme: count(
+            ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+            ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.basse_frequence]),
+        MesurePonctualite.avance_conforme: count(ComplianceType.compliant_advance),
+        MesurePonctualite.retard_conforme: count(ComplianceType.compliant_delay),
+    }, index=group_index).reset_index()
 
     df = df.merge(df_si, on=[MesurePonctualite.ligne])
 
@@ -5,6 +5,11 @@ import pandas as pd
 from offre_realisee.config.offre_realisee_config import Borne, MesureRegularite, ComplianceType, MesureType
 
 
+def _timedelta_array(column: pd.Series) -> np.ndarray:
+    """Retourne une colonne d'intervalles sous forme de tableau timedelta64[ns] (NaT si l'intervalle est absent)."""
+    return pd.to_timedelta(column).to_numpy(dtype='timedelta64[ns]')
+
+
 def calculate_compliance_score_for_each_borne(df_with_interval: pd.DataFrame) -> pd.DataFrame:
     """Calcule un score de conformité pour la régularité pour une heure de passage réel selon les 2 passages théoriques
     les plus proches qui lui sont attribués (= borne inférieure et borne supérieure).
@@ -27,12 +32,13 @@ def calculate_compliance_score_for_each_borne(df_with_interval: pd.DataFrame) ->
         DataFrame qui contient les scores de conformité calculés en fonction de la différence réelle et théorique (cf.
         tableau des scores de conformité pour la régularité de la notice)
     """
-    timedelta_train_de_bus = timedelta(seconds=90)
-    timedelta_borne_haute_compliant = timedelta(minutes=2)
+    timedelta_train_de_bus = np.timedelta64(timedelta(seconds=90))
+    timedelta_borne_haute_compliant = np.timedelta64(timedelta(minutes=2))
 
+    # Les comparaisons avec NaT sont fausses, comme avec les séries pandas
+    diff_reelle = _timedelta_array(df_with_interval[MesureRegularite.difference_reelle])
     for borne in [Borne.inf, Borne.sup]:
-        diff_reelle = df_with_interval[MesureRegularite.difference_reelle]
-        diff_theorique_borne = df_with_interval[MesureRegularite.difference_theorique + borne]
+        diff_theorique_borne = _timedelta_array(df_with_interval[MesureRegularite.difference_theorique + borne])
 
         conditions = [
             diff_reelle < timedelta_train_de_bus,
@@ -68,21 +74,25 @@ def select_closest_defined_time_result(df_score: pd.DataFrame) -> pd.DataFrame:
         DataFrame qui contient les scores de conformité dans les cas où les intervalles inférieurs et supérieurs sont
         différents pour un même passage
     """
-    diff_with_inf = df_score[MesureRegularite.heure_reelle] - df_score[MesureRegularite.heure_theorique_inf]
-    diff_with_sup = df_score[MesureRegularite.heure_theorique_sup] - df_score[MesureRegularite.heure_reelle]
+    diff_with_inf = _timedelta_array(
+        df_score[MesureRegularite.heure_reelle] - df_score[MesureRegularite.heure_theorique_inf])
+    diff_with_sup = _timedelta_array(
+        df_score[MesureRegularite.heure_theorique_sup] - df_score[MesureRegularite.heure_reelle])
     borne_inf_is_closer = diff_with_inf < diff_with_sup
     borne_sup_is_closer = diff_with_inf > diff_with_sup
 
-    borne_inf_is_defined = df_score[MesureRegularite.heure_theorique_inf].notna()
-    borne_sup_is_defined = df_score[MesureRegularite.heure_theorique_sup].notna()
+    borne_inf_is_defined = df_score[MesureRegularite.heure_theorique_inf].notna().to_numpy()
+    borne_sup_is_defined = df_score[MesureRegularite.heure_theorique_sup].notna().to_numpy()
     borne_inf_is_not_defined = ~borne_inf_is_defined
     borne_sup_is_not_defined = ~borne_sup_is_defined
 
     choose_borne_inf = borne_inf_is_closer | (borne_inf_is_defined & borne_sup_is_not_defined)
     choose_borne_sup = borne_sup_is_closer | (borne_sup_is_defined & borne_inf_is_not_defined)
 
-    df_score.loc[choose_borne_inf, MesureRegularite.resultat] = df_score[MesureRegularite.resultat_inf]
-    df_score.loc[choose_borne_sup, MesureRegularite.resultat] = df_score[MesureRegularite.resultat_sup]
+    resultat = df_score[MesureRegularite.resultat].to_numpy(dtype=float)
+    resultat = np.where(choose_borne_inf, df_score[MesureRegularite.resultat_inf].to_numpy(dtype=float), resultat)
+    resultat = np.where(choose_borne_sup, df_score[MesureRegularite.resultat_sup].to_numpy(dtype=float), resultat)
+    df_score[MesureRegularite.resultat] = resultat
 
     return df_score
 
@@ -102,10 +112,14 @@ def select_best_score_if_equals(df_score: pd.DataFrame) -> pd.DataFrame:
         DataFrame qui contient les scores de conformité déjà présents ainsi que les scores de conformités pour les
         passages dont les 2 intervalles sont égaux
     """
-    df_result_is_not_set = df_score[MesureRegularite.resultat].isna()
-    df_score.loc[df_result_is_not_set, MesureRegularite.resultat] = np.maximum(
-        df_score.loc[df_result_is_not_set, MesureRegularite.resultat_inf],
-        df_score.loc[df_result_is_not_set, MesureRegularite.resultat_sup]
+    resultat = df_score[MesureRegularite.resultat].to_numpy(dtype=float)
+    df_score[MesureRegularite.resultat] = np.where(
+        np.isnan(resultat),
+        np.maximum(
+            df_score[MesureRegularite.resultat_inf].to_numpy(dtype=float),
+            df_score[MesureRegularite.resultat_sup].to_numpy(dtype=float)
+        ),
+        resultat
     )
 
     return df_score
@@ -1,9 +1,9 @@
 from offre_realisee.config.input_config import InputColumns
-from offre_realisee.config.logger import logger
+from offre_realisee.config.metrics_config import MetricName
 from offre_realisee.config.offre_realisee_config import FrequenceType, MesureRegularite
-from offre_realisee.domain.entities.add_frequency import add_frequency
-from offre_realisee.domain.entities.drop_duplicates_heure_theorique import drop_duplicates_heure_theorique
-from offre_realisee.domain.entities.regularite.process_stop_regularite import process_stop_regularite
+from offre_realisee.domain.entities.group_offre_realisee_by_stop import prepare_offre_realisee_by_stop
+from offre_realisee.domain.entities.metrics import get_metrics
+from offre_realisee.domain.entities.regularite.process_day_regularite import process_day_regularite
 from offre_realisee.domain.entities.regularite.stat_compliance_score_regularite import stat_compliance_score_regularite
 
 
@@ -25,32 +25,53 @@ def compute_regularite_stat_from_dataframe(
     metadata_cols: list[str]
         Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
     """
-    df_offre_realisee = drop_duplicates_heure_theorique(df_offre_realisee)
-
-    df_grouped = df_offre_realisee.groupby(by=[
-        InputColumns.ligne, InputColumns.sens, InputColumns.arret
-    ])
-
-    df_concat_regularite = pd.DataFrame()
-    theorique_passages_by_lignes = defaultdict(int)
-    any_high_frequency_on_lignes = defaultdict(bool)
-    for (ligne, sens, arret), df_by_stop in df_grouped:
-        logger.debug(f'Process: ligne {ligne} - sens {sens} - arret {arret}')
-
-        df_by_stop = add_frequency(df_by_stop)
-
-        logger.debug('Regularite')
-        score_by_stop_regularite = process_stop_regularite(
-            df_by_stop=df_by_stop,
-            metadata_cols=[MesureRegularite.ligne, MesureRegularite.sens, MesureRegularite.arret] + metadata_cols
-        )
-        if not score_by_stop_regularite.empty:
-            df_concat_regularite = pd.concat([df_concat_regularite, score_by_stop_regularite], ignore_index=True)
-            theorique_passages_by_lignes[ligne] += df_by_stop[InputColumns.heure_theorique].notna().sum()
-
-        if any(df_by_stop[MesureRegularite.frequence] == FrequenceType.haute_frequence):
-            any_high_frequency_on_lignes[ligne] = True
-    if df_concat_regularite.empty:
+    df_offre_realisee_by_stop = prepare_offre_realisee_by_stop(df_offre_realisee)
+
+    return compute_regularite_stat_from_prepared_dataframe(
+        df_offre_realisee_by_stop=df_offre_realisee_by_stop, metadata_cols=metadata_cols)
+
+
+def compute_regularite_stat_from_prepared_dataframe(
+    df_offre_realisee_by_stop: pd.DataFrame, metadata_cols: list[str] = [],
+) -> pd.DataFrame:
+    """Calcule les statistiques de régularité de tous les arrêts d'une journée en une seule passe.
+
+    Le résultat est identique à celui d'un calcul arrêt par arrêt avec process_stop_regularite.
+
+    Parameters
+    ----------
+    df_offre_realisee_by_stop : DataFrame
+        DataFrame d'offre réalisée avec la fréquence de passage, voir prepare_offre_realisee_by_stop.
+    metadata_cols: list[str]
+        Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    """
+    stop_columns = [MesureRegularite.ligne, MesureRegularite.sens, MesureRegularite.arret]
+
+    metrics = get_metrics()
+    with metrics.timer(MetricName.process_day_regularite):
+        df_score_regularite = process_day_regularite(
+            df_offre_realisee=df_offre_realisee_by_stop, metadata_cols=stop_columns + metadata_cols)
+    metrics.count(MetricName.passages_regularite_scored, len(df_score_regularite))
+    if df_score_regularite.empty:
         return pd.DataFrame()
-    return stat_compliance_score_regularite(
-        df_concat_regularite, theorique_passages_by_lignes, any_high_frequency_on_lignes, metadata_cols=metadata_cols)
+
+    with metrics.timer(MetricName.stat_regularite):
+        df_offre_realisee_by_stop = df_offre_realisee_by_stop.dropna(subset=stop_columns)
+
+        # Seuls les passages théoriques des arrêts ayant des scores de régularité sont comptés
+        stops_with_score = pd.MultiIndex.from_frame(df_score_regularite[stop_columns].drop_duplicates())
+        n_theorique_by_stop = df_offre_realisee_by_stop.groupby(
+            by=stop_columns, observed=True)[InputColumns.heure_theorique].count()
+        theorique_passages_by_lignes = defaultdict(int, (
+            n_theorique_by_stop[n_theorique_by_stop.index.isin(stops_with_score)].groupby(
+                level=InputColumns.ligne, observed=True).sum()
+        ).to_dict())
+
+        is_haute_frequence = df_offre_realisee_by_stop[MesureRegularite.frequence] == FrequenceType.haute_frequence
+        any_high_frequency_on_lignes = defaultdict(bool, (
+            is_haute_frequence.groupby(df_offre_realisee_by_stop[InputColumns.ligne], observed=True).any()
+        ).to_dict())
+
+        return stat_compliance_score_regularite(
+            df_score_regularite, theorique_passages_by_lignes, any_high_frequency_on_lignes,
+            metadata_cols=metadata_cols)
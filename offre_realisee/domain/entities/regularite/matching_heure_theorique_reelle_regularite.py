@@ -4,38 +4,20 @@ import pandas as pd
 from offre_realisee.config.offre_realisee_config import MesureRegularite
 
 
-def _formate_to_dataframe(matching_array: np.ndarray) -> pd.DataFrame:
-    """
-    Fonction qui permet de formater un tableau numpy en DataFrame avec les colonnes suivantes : "HEURE_RELLE",
-    "DIFFERENCE_REELLE", "HEURE_THEORIQUE_INF", "DIFFERENCE_THEORIQUE_INF", "HEURE_THEORIQUE_SUP",
-    "DIFFERENCE_THEORIQUE_SUP"
+def to_datetime64(heures: pd.Series) -> np.ndarray:
+    """Convertit une série d'heures en tableau datetime64[ns] en UTC, NaT si l'heure est absente.
 
     Parameters
     ----------
-    matching_array : np.ndarray
-                        Array qui contient les heures réelles, les heures théoriques inférieures et supérieures, les
-                        différences réelles, théoriques inf. et théoriques sup.
+    heures : pd.Series
+        Série d'heures, avec ou sans fuseau horaire (les heures sans fuseau sont considérées en UTC).
+
     Returns
     ----------
-    matching_array_df : pd.DataFrame
-                        DataFrame formaté
+    heures : np.ndarray
+        Tableau datetime64[ns] sans fuseau horaire, en UTC.
     """
-    matching_array_df = pd.DataFrame(matching_array, columns=[MesureRegularite.heure_reelle,
-                                                              MesureRegularite.difference_reelle,
-                                                              MesureRegularite.heure_theorique_inf,
-                                                              MesureRegularite.difference_theorique_inf,
-                                                              MesureRegularite.heure_theorique_sup,
-                                                              MesureRegularite.difference_theorique_sup])
-
-    for col in [MesureRegularite.difference_reelle, MesureRegularite.difference_theorique_inf,
-                MesureRegularite.difference_theorique_sup]:
-        matching_array_df[col] = pd.to_timedelta(matching_array_df[col])
-
-    for col in [MesureRegularite.heure_reelle, MesureRegularite.heure_theorique_inf,
-                MesureRegularite.heure_theorique_sup]:
-        matching_array_df[col] = pd.to_datetime(matching_array_df[col], utc=True)
-
-    return matching_array_df
+    return pd.to_datetime(heures, utc=True).dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
 
 
 def matching_heure_theorique_reelle_regularite(df_by_stop: pd.DataFrame) -> pd.DataFrame:
@@ -52,36 +34,124 @@ def matching_heure_theorique_reelle_regularite(df_by_stop: pd.DataFrame) -> pd.D
     Returns
     ----------
     matching_array : DataFrame
-        DataFrame qui contient les heures réelles, les heures théoriques inférieures et supérieures associées et les
-        différences réelles, théoriques inf. et théoriques sup.
+        DataFrame qui contient les heures réelles, les heures théoriques inférieures et supérieures associées
+        (datetime64[ns, UTC]) et les différences réelles, théoriques inf. et théoriques sup. (timedelta64[ns]).
     """
-    heure_theorique_sorted = np.sort(df_by_stop[MesureRegularite.heure_theorique].dropna().to_numpy())
-    heure_reelle_sorted = np.sort(df_by_stop[MesureRegularite.heure_reelle].dropna().to_numpy())
+    matching_array_df, _ = matching_heure_theorique_reelle_regularite_by_stop(
+        stop_codes=np.zeros(len(df_by_stop), dtype=int),
+        heure_theorique=to_datetime64(df_by_stop[MesureRegularite.heure_theorique]),
+        heure_reelle=to_datetime64(df_by_stop[MesureRegularite.heure_reelle]),
+    )
 
-    indices_superieur = np.searchsorted(heure_theorique_sorted, heure_reelle_sorted)
-    indices_inferieur = indices_superieur - 1
+    return matching_array_df
 
-    # If there are several real values lower than the first theoretical value,
-    # compare the difference with the second theoretical time
-    indices_superieur[1:][indices_superieur[1:] == 0] = 1
 
-    diff_theorique = np.concatenate([[np.timedelta64('NaT')], heure_theorique_sorted[1:] - heure_theorique_sorted[:-1]])
-    diff_reelle = np.concatenate([[np.timedelta64('NaT')], heure_reelle_sorted[1:] - heure_reelle_sorted[:-1]])
+def _sort_by_stop(stop_codes: np.ndarray, heures: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Supprime les heures manquantes et trie les heures par arrêt puis par heure."""
+    is_defined = ~np.isnat(heures)
+    stop_codes, heures = stop_codes[is_defined], heures[is_defined]
+    order = np.lexsort((heures, stop_codes))
 
-    # La première heure n'est pas assignable pour une comparaison, elle ne possède pas de valeur d'intervalle
-    heure_theorique_sorted[0] = np.datetime64('NaT')
+    return stop_codes[order], heures[order]
 
-    heure_theorique_with_diff = np.column_stack([heure_theorique_sorted, diff_theorique])
-    heure_reelle_with_diff = np.column_stack([heure_reelle_sorted, diff_reelle])
 
-    heure_theorique_with_diff_and_padding = np.concatenate(
-        [heure_theorique_with_diff, [[np.datetime64('NaT'), np.timedelta64('NaT')]]]
-    )
+def _searchsorted_by_stop(sorted_stop_codes: np.ndarray, sorted_heures: np.ndarray,
+                          stop_codes: np.ndarray, heures: np.ndarray) -> np.ndarray:
+    """Équivalent de np.searchsorted (side="left") appliqué arrêt par arrêt.
 
-    matching_array = np.column_stack((
-        heure_reelle_with_diff,
-        heure_theorique_with_diff_and_padding[indices_inferieur],
-        heure_theorique_with_diff_and_padding[indices_superieur]
+    Les deux tableaux sont triés par arrêt puis par heure. Pour chaque heure, on compte les éléments du tableau trié
+    qui la précèdent dans l'ordre (arrêt, heure) : c'est la position d'insertion dans le tableau trié complet, dont on
+    déduit la position dans l'arrêt en retirant le début de l'arrêt.
+    """
+    is_sorted_array = np.concatenate([np.zeros(len(heures), dtype=bool), np.ones(len(sorted_heures), dtype=bool)])
+    # À heure égale, l'heure recherchée est placée avant l'élément du tableau trié (side="left")
+    order = np.lexsort((
+        is_sorted_array,
+        np.concatenate([heures, sorted_heures]),
+        np.concatenate([stop_codes, sorted_stop_codes])
     ))
+    is_sorted_array = is_sorted_array[order]
+    n_sorted_before = np.cumsum(is_sorted_array) - is_sorted_array
+
+    return n_sorted_before[~is_sorted_array]
+
+
+def _difference_by_stop(heures: np.ndarray, stop_start: np.ndarray) -> np.ndarray:
+    """Calcule l'intervalle avec l'heure précédente du même arrêt, NaT pour la première heure de chaque arrêt."""
+    difference = np.full(len(heures), np.timedelta64('NaT'), dtype='timedelta64[ns]')
+    difference[1:] = heures[1:] - heures[:-1]
+    difference[stop_start] = np.timedelta64('NaT')
+
+    return difference
 
-    return _formate_to_dataframe(matching_array)
+
+def matching_heure_theorique_reelle_regularite_by_stop(
+    stop_codes: np.ndarray, heure_theorique: np.ndarray, heure_reelle: np.ndarray
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Applique matching_heure_theorique_reelle_regularite à tous les arrêts d'une journée à la fois.
+
+    Les heures théoriques et réelles de toute la journée sont triées une seule fois par arrêt puis par heure, et
+    l'association à la borne inférieure et supérieure est faite avec un searchsorted décalé du début de chaque arrêt.
+    Chaque colonne est construite directement comme un tableau typé, sans passer par des objets Python.
+
+    Parameters
+    ----------
+    stop_codes : ndarray
+        Code de l'arrêt (ligne, sens, arrêt) de chaque passage.
+    heure_theorique : ndarray
+        Heures théoriques des passages (datetime64[ns], NaT si absente).
+    heure_reelle : ndarray
+        Heures réelles des passages (datetime64[ns], NaT si absente).
+
+    Returns
+    ----------
+    matching_array, reelle_stop_codes : tuple[DataFrame, ndarray]
+        DataFrame identique à la concaténation, par code d'arrêt croissant, des résultats de
+        matching_heure_theorique_reelle_regularite pour chaque arrêt, et code de l'arrêt de chacune de ses lignes.
+    """
+    theorique_stop_codes, heure_theorique_sorted = _sort_by_stop(stop_codes, heure_theorique)
+    reelle_stop_codes, heure_reelle_sorted = _sort_by_stop(stop_codes, heure_reelle)
+
+    n_stops = stop_codes.max(initial=-1) + 1
+    n_theorique = np.bincount(theorique_stop_codes, minlength=n_stops)
+    theorique_start = np.cumsum(n_theorique) - n_theorique
+    n_reelle = np.bincount(reelle_stop_codes, minlength=n_stops)
+    reelle_start = np.cumsum(n_reelle) - n_reelle
+
+    rang_reelle = np.arange(len(reelle_stop_codes)) - reelle_start[reelle_stop_codes]
+
+    indices_superieur = _searchsorted_by_stop(
+        theorique_stop_codes, heure_theorique_sorted, reelle_stop_codes, heure_reelle_sorted
+    ) - theorique_start[reelle_stop_codes]
+    indices_inferieur = indices_superieur - 1
+
+    # If there are several real values lower than the first theoretical value,
+    # compare the difference with the second theoretical time
+    indices_superieur[(rang_reelle > 0) & (indices_superieur == 0)] = 1
+
+    diff_theorique = _difference_by_stop(heure_theorique_sorted, theorique_start[n_theorique > 0])
+    diff_reelle = _difference_by_stop(heure_reelle_sorted, reelle_start[n_reelle > 0])
+
+    # La première heure de chaque arrêt n'est pas assignable pour une comparaison, elle ne possède pas de valeur
+    # d'intervalle. Les indices hors de l'arrêt pointent vers une valeur de remplissage.
+    heure_theorique_with_padding = np.append(heure_theorique_sorted, np.datetime64('NaT'))
+    diff_theorique_with_padding = np.append(diff_theorique, np.timedelta64('NaT'))
+
+    def _borne(indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        is_assignable = (indices >= 1) & (indices < n_theorique[reelle_stop_codes])
+        positions = np.where(is_assignable, theorique_start[reelle_stop_codes] + indices, len(heure_theorique_sorted))
+        return heure_theorique_with_padding[positions], diff_theorique_with_padding[positions]
+
+    heure_theorique_inf, diff_theorique_inf = _borne(indices_inferieur)
+    heure_theorique_sup, diff_theorique_sup = _borne(indices_superieur)
+
+    matching_array_df = pd.DataFrame({
+        MesureRegularite.heure_reelle: pd.to_datetime(heure_reelle_sorted, utc=True),
+        MesureRegularite.difference_reelle: pd.to_timedelta(diff_reelle),
+        MesureRegularite.heure_theorique_inf: pd.to_datetime(heure_theorique_inf, utc=True),
+        MesureRegularite.difference_theorique_inf: pd.to_timedelta(diff_theorique_inf),
+        MesureRegularite.heure_theorique_sup: pd.to_datetime(heure_theorique_sup, utc=True),
+        MesureRegularite.difference_theorique_sup: pd.to_timedelta(diff_theorique_sup),
+    })
+
+    return matching_array_df, reelle_stop_codes
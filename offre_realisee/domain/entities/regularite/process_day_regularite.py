@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from offre_realisee.config.offre_realisee_config import MesureRegularite, ComplianceType
+from offre_realisee.domain.entities.regularite.compliance_score import (
+    calculate_compliance_score_for_each_borne, select_closest_defined_time_result, select_best_score_if_equals)
+from offre_realisee.domain.entities.regularite.matching_heure_theorique_reelle_regularite import (
+    matching_heure_theorique_reelle_regularite_by_stop, to_datetime64)
+
+STOP_COLUMNS = [MesureRegularite.ligne, MesureRegularite.sens, MesureRegularite.arret]
+
+
+def process_day_regularite(df_offre_realisee: pd.DataFrame, metadata_cols: list[str] = []) -> pd.DataFrame:
+    """Calcule le score de conformité pour la régularité de tous les passages de tous les arrêts d'une journée.
+
+    Le résultat est identique à la concaténation des résultats de process_stop_regularite pour chaque arrêt (ligne,
+    sens, arrêt), dans l'ordre des arrêts, mais le calcul est fait en une seule fois sur toute la journée :
+    1. Association des passages réels aux passages théoriques de tous les arrêts, voir
+       matching_heure_theorique_reelle_regularite_by_stop
+    2. Calcul des scores de conformité de chaque borne et sélection du meilleur score sur toute la journée
+    3. Le premier passage réel de chaque arrêt est fixé à "conforme"
+
+    Parameters
+    ----------
+    df_offre_realisee : DataFrame
+        DataFrame qui contient les données de passages réels et théoriques de tous les arrêts, avec la fréquence de
+        passage, voir prepare_offre_realisee_by_stop
+    metadata_cols: list[str]
+        Colonnes contenant des méta informations invariables par arrêt qui doivent être conservées, par défaut à [].
+
+    Returns
+    ----------
+    df_score : DataFrame
+        DataFrame qui contient les scores de conformité de tous les passages réels, vide si aucun arrêt ne permet de
+        calculer un score
+    """
+    df_offre_realisee = df_offre_realisee.dropna(subset=STOP_COLUMNS)
+    stop_codes = df_offre_realisee.groupby(by=STOP_COLUMNS, observed=True).ngroup().to_numpy()
+
+    heure_theorique = to_datetime64(df_offre_realisee[MesureRegularite.heure_theorique])
+    heure_reelle = to_datetime64(df_offre_realisee[MesureRegularite.heure_reelle])
+
+    # Comme dans process_stop_regularite, un score n'est calculé que si l'arrêt a au moins deux passages théoriques et
+    # au moins deux passages réels (pour disposer d'un intervalle réel)
+    n_stops = stop_codes.max(initial=-1) + 1
+    n_theorique = np.bincount(stop_codes[~np.isnat(heure_theorique)], minlength=n_stops)
+    n_reelle = np.bincount(stop_codes[~np.isnat(heure_reelle)], minlength=n_stops)
+    is_scored_stop = ((n_theorique >= 2) & (n_reelle >= 2))[stop_codes]
+
+    if not is_scored_stop.any():
+        return pd.DataFrame()
+
+    df_score, reelle_stop_codes = matching_heure_theorique_reelle_regularite_by_stop(
+        stop_codes[is_scored_stop], heure_theorique[is_scored_stop], heure_reelle[is_scored_stop])
+
+    df_score = calculate_compliance_score_for_each_borne(df_score)
+    df_score[MesureRegularite.resultat] = np.nan
+    df_score = select_closest_defined_time_result(df_score)
+    df_score = select_best_score_if_equals(df_score)
+
+    # Le premier passage réel de chaque arrêt est toujours conforme
+    is_first_reelle = np.ones(len(reelle_stop_codes), dtype=bool)
+    is_first_reelle[1:] = reelle_stop_codes[1:] != reelle_stop_codes[:-1]
+    df_score.loc[is_first_reelle, MesureRegularite.resultat] = ComplianceType.compliant
+
+    df_score = df_score[[MesureRegularite.heure_reelle, MesureRegularite.resultat]].copy()
+
+    assert not any(df_score[MesureRegularite.resultat].isna())
+
+    # Les méta informations sont celles de la première ligne de chaque arrêt
+    _, first_position_by_stop = np.unique(stop_codes, return_index=True)
+    first_position = first_position_by_stop[reelle_stop_codes]
+    for metadata_column in metadata_cols:
+        df_score[metadata_column] = df_offre_realisee[metadata_column].to_numpy()[first_position]
+
+    return df_score
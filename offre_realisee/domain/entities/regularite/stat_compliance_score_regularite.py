@@ -1,10 +1,23 @@
+import numpy as np
 import pandas as pd
 from offre_realisee.config.offre_realisee_config import MesureRegularite, ComplianceType, MesureType
+from offre_realisee.domain.entities.count_resultat_by_group import (
+    encode_groups, encode_resultat, count_resultat_by_group, sum_resultat_by_group)
 
-_SI_VALUES_SET = {
+# Catégories de score de conformité, voir encode_resultat
+_RESULTAT_CATEGORIES = (
+    ComplianceType.compliant,
+    ComplianceType.semi_compliant[MesureType.regularite],
+    ComplianceType.not_compliant[MesureType.regularite],
     ComplianceType.situation_inacceptable_train_de_bus,
     ComplianceType.situation_inacceptable_faible_frequence,
-}
+)
+_MISSING_CODE = len(_RESULTAT_CATEGORIES) + 1
+
+_SI_CODES = [_RESULTAT_CATEGORIES.index(value) for value in (
+    ComplianceType.situation_inacceptable_train_de_bus,
+    ComplianceType.situation_inacceptable_faible_frequence,
+)]
 
 
 def stat_compliance_score_regularite(
@@ -39,35 +52,39 @@ def stat_compliance_score_regularite(
     """
 
     # Filter lignes with at least one high frequency measure
-    df = df[df[MesureRegularite.ligne].apply(lambda x: any_high_frequency_on_lignes[x])]
+    high_frequency_lignes = [ligne for ligne, any_high_frequency in any_high_frequency_on_lignes.items()
+                             if any_high_frequency]
+    df = df[df[MesureRegularite.ligne].isin(high_frequency_lignes)]
 
     if df.empty:
         return pd.DataFrame()
 
     # Aggregate stops results by lignes
-    df = df.groupby([MesureRegularite.ligne] + metadata_cols)[MesureRegularite.resultat].agg([
-        (MesureRegularite.nombre_reel, 'count'),
-        (MesureRegularite.score_de_conformite, lambda x: x[~x.isin(_SI_VALUES_SET)].sum()),
-        (
-            MesureRegularite.semi_conforme,
-            lambda x: x.isin({ComplianceType.semi_compliant[MesureType.regularite]}).sum()
-        ),
-        (
-            MesureRegularite.non_conforme,
-            lambda x: x.isin({ComplianceType.not_compliant[MesureType.regularite]}).sum()
-        ),
-        (
-            MesureRegularite.situation_inacceptable_train_de_bus,
-            lambda x: x.isin({ComplianceType.situation_inacceptable_train_de_bus}).sum()
-        ),
-        (
-            MesureRegularite.situation_inacceptable_ecart_important,
-            lambda x: x.isin({ComplianceType.situation_inacceptable_faible_frequence}).sum()
-        ),
-        (MesureRegularite.situation_inacceptable_total, lambda x: x.isin(_SI_VALUES_SET).sum()),
-    ]).reset_index()
-
-    df[MesureRegularite.nombre_theorique] = df[MesureRegularite.ligne].apply(lambda x: int(n_theorique_by_lignes[x]))
+    by = [MesureRegularite.ligne] + metadata_cols
+    group_index, group_codes = encode_groups(df, by)
+    resultat_codes = encode_resultat(df[MesureRegularite.resultat], _RESULTAT_CATEGORIES)
+    counts = count_resultat_by_group(group_codes, resultat_codes, len(group_index), len(_RESULTAT_CATEGORIES))
+
+    def count(*values: float) -> np.ndarray:
+        return counts[:, [_RESULTAT_CATEGORIES.index(value) for value in values]].sum(axis=1)
+
+    # Somme des scores de conformité hors SI
+    is_score = ~np.isin(resultat_codes, _SI_CODES)
+    resultat = df[MesureRegularite.resultat].to_numpy(dtype=float, na_value=np.nan)
+    score = sum_resultat_by_group(group_codes[is_score], resultat[is_score], len(group_index))
+
+    df = pd.DataFrame({
+        MesureRegularite.nombre_reel: counts[:, :_MISSING_CODE].sum(axis=1),
+        MesureRegularite.score_de_conformite: score,
+        MesureRegularite.semi_conforme: count(ComplianceType.semi_compliant[MesureType.regularite]),
+        MesureRegularite.non_conforme: count(ComplianceType.not_compliant[MesureType.regularite]),
+        MesureRegularite.situation_inacceptable_train_de_bus: count(ComplianceType.situation_inacceptable_train_de_bus),
+        MesureRegularite.situation_inacceptable_ecart_important: count(
+            ComplianceType.situation_inacceptable_faible_frequence),
+        MesureRegularite.situation_inacceptable_total: counts[:, _SI_CODES].sum(axis=1),
+    }, index=group_index).reset_index()
+
+    df[MesureRegularite.nombre_theorique] = df[MesureRegularite.ligne].map(n_theorique_by_lignes).astype(int)
 
     df[MesureRegularite.taux_de_conformite] = round(
             df[MesureRegularite.score_de_conformite] / df[MesureRegularite.nombre_theorique] * 100, 2
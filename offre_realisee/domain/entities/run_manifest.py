@@ -0,0 +1,143 @@
+from datetime import date
+from importlib.metadata import version, PackageNotFoundError
+from typing import Callable
+
+from offre_realisee.config.aggregation_config import AggregationLevel
+from offre_realisee.config.offre_realisee_config import MesureType
+from offre_realisee.config.run_manifest_config import PACKAGE_NAME, RunManifestEntry
+
+
+def get_code_version() -> str:
+    """Version du package installé, "unknown" si le package n'est pas installé."""
+    try:
+        return version(PACKAGE_NAME)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def manifest_key(date: date, dsp: str, mesure_type: MesureType) -> str:
+    """Clé du manifeste d'exécution d'une mesure journalière.
+
+    Parameters
+    ----------
+    date : date
+        Date de la mesure.
+    dsp : str
+        DSP de la mesure.
+    mesure_type : MesureType
+        Type de mesure (ponctualite, regularite).
+
+    Returns
+    -------
+    key : str
+        Clé de la forme "AAAA-MM-JJ/dsp/mesure_type".
+    """
+    return f"{date.strftime('%Y-%m-%d')}/{dsp}/{mesure_type}"
+
+
+def build_manifest_entry(input_fingerprint: str, parameters: dict) -> dict:
+    """Construit l'entrée du manifeste d'exécution d'une mesure journalière.
+
+    Une mesure journalière n'a pas à être recalculée si son entrée est identique à celle enregistrée lors de la
+    dernière exécution : mêmes données d'entrée, même version du code et mêmes paramètres de calcul.
+
+    Parameters
+    ----------
+    input_fingerprint : str
+        Empreinte des données d'entrée du jour.
+    parameters : dict
+        Paramètres de calcul ayant une influence sur la mesure (méthode de résolution, colonnes conservées...).
+
+    Returns
+    -------
+    entry : dict
+        Entrée du manifeste d'exécution.
+    """
+    return {
+        RunManifestEntry.input_fingerprint: input_fingerprint,
+        RunManifestEntry.code_version: get_code_version(),
+        RunManifestEntry.parameters: parameters,
+    }
+
+
+def select_dates_to_compute(
+    manifest: dict, entry_by_date: dict[date, dict], dsp: str, mesure_types: list[MesureType],
+    has_output: Callable[[date, MesureType], bool]
+) -> list[date]:
+    """Sélectionne les dates dont au moins une mesure journalière doit être recalculée.
+
+    Une mesure journalière est à jour si son entrée est identique à celle du manifeste et si le fichier de mesure
+    produit lors de la dernière exécution existe toujours.
+
+    Parameters
+    ----------
+    manifest : dict
+        Manifeste d'exécution de la dernière exécution.
+    entry_by_date : dict[date, dict]
+        Entrée du manifeste de chaque date pour l'exécution courante, voir build_manifest_entry.
+    dsp : str
+        DSP des mesures.
+    mesure_types : list[MesureType]
+        Types de mesure calculés.
+    has_output : Callable[[date, MesureType], bool]
+        Indique si le fichier de mesure journalière d'une date et d'un type de mesure existe.
+
+    Returns
+    -------
+    dates : list[date]
+        Dates dont au moins une mesure journalière n'est pas à jour, dans l'ordre d'origine.
+    """
+    def is_up_to_date(date_to_compute: date, mesure_type: MesureType, entry: dict) -> bool:
+        stored_entry = manifest.get(manifest_key(date_to_compute, dsp, mesure_type))
+        if stored_entry is None:
+            return False
+
+        stored_entry = dict(stored_entry)
+        had_output = stored_entry.pop(RunManifestEntry.has_output, True)
+        return stored_entry == entry and (not had_output or has_output(date_to_compute, mesure_type))
+
+    return [
+        date_to_compute for date_to_compute, entry in entry_by_date.items()
+        if not all(is_up_to_date(date_to_compute, mesure_type, entry) for mesure_type in mesure_types)
+    ]
+
+
+def aggregation_manifest_key(dsp: str, mesure_type: MesureType) -> str:
+    """Clé du manifeste d'exécution des agrégations d'un type de mesure.
+
+    Parameters
+    ----------
+    dsp : str
+        DSP des mesures agrégées.
+    mesure_type : MesureType
+        Type de mesure (ponctualite, regularite).
+
+    Returns
+    -------
+    key : str
+        Clé de la forme "aggregation/dsp/mesure_type".
+    """
+    return f"aggregation/{dsp}/{mesure_type}"
+
+
+def build_aggregation_manifest_entry(aggregation_levels: list[AggregationLevel]) -> dict:
+    """Construit l'entrée du manifeste d'exécution des agrégations d'un type de mesure.
+
+    Seuls les paramètres qui changent le calcul d'une agrégation à jours identiques y figurent. Les jours de chaque
+    agrégation (plage de dates, période d'été, journées exceptionnelles) sont comparés suffixe par suffixe aux jours
+    des sommes partielles persistées, voir update_partial_sums_by_suffix.
+
+    Parameters
+    ----------
+    aggregation_levels : list[AggregationLevel]
+        Niveaux d'agrégation calculés.
+
+    Returns
+    -------
+    entry : dict
+        Entrée du manifeste d'exécution.
+    """
+    return {
+        RunManifestEntry.code_version: get_code_version(),
+        RunManifestEntry.parameters: {'aggregation_levels': list(aggregation_levels)},
+    }
@@ -1,7 +1,9 @@
 import abc
 from datetime import date
+from typing import Optional
 
 import pandas as pd
+import pyarrow as pa
 
 from offre_realisee.config.aggregation_config import AggregationLevel
 from offre_realisee.config.offre_realisee_config import MesureType
@@ -9,18 +11,22 @@ from offre_realisee.config.offre_realisee_config import MesureType
 
 class FileSystemHandler(abc.ABC):
     @abc.abstractmethod
-    def read_offre_realisee(self, **kwargs) -> pd.DataFrame:
-        """Récupération des données d'offre réalisée.
+    def get_daily_offre_realisee_table(self, date: date, dsp: str = "", ligne: str = "") -> pa.Table:
+        """Récupération des données d'offre réalisée pour une date, sous forme de table Arrow.
 
         Parameters
         ----------
-        **kwargs :
-            Keyword arguments supplémentaires passés à la fonction pandas read_parquet.
+        date : date
+            Date pour laquelle nous voulons les données d'offre théorique.
+        dsp : str
+            DSP pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+        ligne : str
+            Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
 
         Returns
         -------
-        df : DataFrame
-            DataFrame d'offre réalisée.
+        table : Table
+            Table Arrow d'offre réalisée.
         """
         pass
 
@@ -44,6 +50,124 @@ class FileSystemHandler(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def get_daily_offre_realisee_fingerprint(self, date: date) -> str:
+        """Empreinte des données d'offre réalisée d'une date.
+
+        L'empreinte change dès que les fichiers d'entrée du jour sont modifiés, ajoutés ou supprimés.
+
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée.
+
+        Returns
+        -------
+        fingerprint : str
+            Empreinte des données d'offre réalisée du jour.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_daily_offre_realisee_row_count(self, date: date) -> int:
+        """Nombre estimé de passages d'une date, sans lire les données, voir WorkerPool.
+
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée.
+
+        Returns
+        -------
+        row_count : int
+            Nombre de passages du jour, tous filtres confondus.
+        """
+        pass
+
+    @abc.abstractmethod
+    def new_shared_offre_realisee(self) -> str:
+        """Réserve un identifiant de table d'offre réalisée partagée, sans rien partager.
+
+        L'identifiant est choisi avant le partage pour que la table puisse être libérée même si le calcul qui la
+        partage échoue, voir release_shared_offre_realisee.
+
+        Returns
+        -------
+        shared_offre_realisee : str
+            Identifiant de la table à partager, voir share_offre_realisee.
+        """
+        pass
+
+    @abc.abstractmethod
+    def share_offre_realisee(self, table: pa.Table, shared_offre_realisee: str) -> None:
+        """Partage une table d'offre réalisée avec les processus de calcul, sans copie à la lecture.
+
+        Parameters
+        ----------
+        table : Table
+            Table Arrow d'offre réalisée à partager.
+        shared_offre_realisee : str
+            Identifiant de la table partagée, voir new_shared_offre_realisee.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_shared_offre_realisee(
+        self, shared_offre_realisee: str, offset: int = 0, length: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Récupération d'une tranche de lignes d'une table d'offre réalisée partagée.
+
+        Parameters
+        ----------
+        shared_offre_realisee : str
+            Identifiant de la table partagée, voir share_offre_realisee.
+        offset : int
+            Première ligne à lire, par défaut à 0.
+        length : Optional[int]
+            Nombre de lignes à lire, par défaut toutes les lignes à partir de offset.
+
+        Returns
+        -------
+        df_offre_realisee : DataFrame
+            DataFrame d'offre réalisée.
+        """
+        pass
+
+    @abc.abstractmethod
+    def release_shared_offre_realisee(self, shared_offre_realisee: str) -> None:
+        """Libère une table d'offre réalisée partagée, une fois tous les calculs qui l'utilisent terminés.
+
+        Une table qui n'a pas été partagée ou déjà libérée est ignorée.
+
+        Parameters
+        ----------
+        shared_offre_realisee : str
+            Identifiant de la table partagée, voir share_offre_realisee.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_run_manifest(self) -> dict:
+        """Récupération du manifeste d'exécution, voir run_incremental_date_range.
+
+        Returns
+        -------
+        manifest : dict
+            Manifeste d'exécution, vide s'il n'existe pas encore.
+        """
+        pass
+
+    @abc.abstractmethod
+    def save_run_manifest(self, manifest: dict) -> None:
+        """Sauvegarde du manifeste d'exécution.
+
+        Parameters
+        ----------
+        manifest : dict
+            Manifeste d'exécution.
+        """
+        pass
+
     @abc.abstractmethod
     def save_daily_mesure_qs(
         self, df_mesure_qs: pd.DataFrame, date: date, dsp: str, mesure_type: MesureType
@@ -63,6 +187,23 @@ class FileSystemHandler(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def save_daily_metrics(self, metrics: dict, date: date, dsp: str) -> None:
+        """Sauvegarde des mesures de performance du calcul des mesures QS d'une journée, voir MetricsRegistry.
+
+        Chaque exécution ajoute une ligne JSON, les mesures des exécutions précédentes sont conservées.
+
+        Parameters
+        ----------
+        metrics : dict
+            Mesures de performance de la journée.
+        date : date
+            Date des données de mesure QS.
+        dsp : str
+            DSP des données de mesure QS.
+        """
+        pass
+
     @abc.abstractmethod
     def save_error_mesure_qs(
             self, df_mesure_qs: pd.DataFrame, date: date, mesure_type: MesureType, dsp: str, ligne: str
@@ -108,6 +249,49 @@ class FileSystemHandler(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def has_daily_mesure_qs(self, date: date, dsp: str, mesure_type: MesureType) -> bool:
+        """Indique si le fichier de mesure QS d'un jour existe.
+
+        Parameters
+        ----------
+        date : date
+            Date des données de mesure QS.
+        dsp : str
+            DSP des données de mesure QS.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+
+        Returns
+        -------
+        exists : bool
+            True si le fichier de mesure QS du jour existe.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_mesure_qs_by_dates(self, dates: list[date], dsp: str, mesure_type: MesureType, **kwargs) -> pd.DataFrame:
+        """Récupération des données de mesure QS de plusieurs jours.
+
+        Parameters
+        ----------
+        dates : list[date]
+            Dates des données de mesure QS.
+        dsp : str
+            DSP des données de mesure QS.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        **kwargs : dict
+            Options complémentaires de lecture.
+
+        Returns
+        -------
+        df : DataFrame
+            DataFrame des mesures QS de tous les jours, avec le jour de chaque mesure (AAAA-MM-JJ) dans la colonne
+            JOUR, vide si aucune mesure n'est disponible.
+        """
+        pass
+
     @abc.abstractmethod
     def save_mesure_qs_by_aggregation(
         self, df_mesure_qs: pd.DataFrame, suffix: str, date_range: tuple[date, date], dsp: str,
@@ -142,6 +326,56 @@ class FileSystemHandler(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def get_partial_sums(self, dsp: str, mesure_type: MesureType, name: str) -> Optional[dict]:
+        """Récupération d'un élément du stockage des sommes partielles d'agrégation, voir update_partial_sums_by_suffix.
+
+        Parameters
+        ----------
+        dsp : str
+            DSP des sommes partielles.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        name : str
+            Nom relatif de l'élément, par exemple 'by_month/2023_09'.
+
+        Returns
+        -------
+        partial_sums : Optional[dict]
+            Élément du stockage des sommes partielles, None s'il n'existe pas.
+        """
+        pass
+
+    @abc.abstractmethod
+    def save_partial_sums(self, partial_sums: dict, dsp: str, mesure_type: MesureType, name: str) -> None:
+        """Sauvegarde d'un élément du stockage des sommes partielles d'agrégation.
+
+        Parameters
+        ----------
+        partial_sums : dict
+            Élément du stockage des sommes partielles.
+        dsp : str
+            DSP des sommes partielles.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        name : str
+            Nom relatif de l'élément, par exemple 'by_month/2023_09'.
+        """
+        pass
+
+    @abc.abstractmethod
+    def delete_partial_sums(self, dsp: str, mesure_type: MesureType) -> None:
+        """Suppression de tous les éléments du stockage des sommes partielles d'agrégation d'un type de mesure.
+
+        Parameters
+        ----------
+        dsp : str
+            DSP des sommes partielles.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        """
+        pass
+
     @abc.abstractmethod
     def get_calendrier_scolaire(self, **kwargs) -> pd.DataFrame:
         """Récupération des données de calendrier scolaire.
@@ -0,0 +1,25 @@
+import abc
+
+
+class ProcessMemoryHandler(abc.ABC):
+    @abc.abstractmethod
+    def get_rss(self) -> tuple[int, int]:
+        """Mémoire résidente courante et pic de mémoire résidente du processus courant, en octets.
+
+        Returns
+        -------
+        rss, peak_rss : tuple[int, int]
+            Mémoire résidente courante et pic de mémoire résidente.
+        """
+        pass
+
+    @abc.abstractmethod
+    def reset_peak_rss(self) -> bool:
+        """Remet le pic de mémoire résidente du processus courant à sa mémoire résidente courante.
+
+        Returns
+        -------
+        is_reset : bool
+            False si le pic n'a pas pu être remis à zéro : le pic mesuré ensuite est alors celui du processus.
+        """
+        pass
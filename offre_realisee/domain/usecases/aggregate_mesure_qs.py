@@ -5,23 +5,36 @@ import pandas as pd
 
 from offre_realisee.domain.entities.aggregation.generate_suffix_by_aggregation import generate_suffix_by_aggregation
 from offre_realisee.config.logger import logger
-from offre_realisee.config.aggregation_config import AggregationLevel
+from offre_realisee.config.aggregation_config import AggregationLevel, PartialSums
+from offre_realisee.config.input_config import InputColumns
 from offre_realisee.config.offre_realisee_config import (MesureType, Mesure, MESURE_TYPE, MesurePonctualite,
                                                          MesureRegularite)
 from offre_realisee.domain.entities.aggregation.generate_date_aggregation_lists import (
     generate_date_aggregation_lists)
+from offre_realisee.domain.entities.aggregation.partial_sums import (
+    add_partial_sums, add_taux, compute_daily_partial_sums, empty_partial_sums, get_columns_to_sum,
+    partial_sums_digest, partial_sums_from_records, partial_sums_to_mesure, partial_sums_to_records)
 from offre_realisee.domain.port.file_system_handler import FileSystemHandler
 
 
+# Nom de l'index de la dernière version de la contribution de chaque jour aux sommes partielles
+_JOURS_INDEX_NAME = f"{PartialSums.jours}/{PartialSums.jours_index}"
+
+# Colonnes techniques identifiant l'agrégation à laquelle contribue chaque mesure journalière
+AGGREGATION_LEVEL_COLUMN = 'AGGREGATION_LEVEL'
+AGGREGATION_SUFFIX_COLUMN = 'AGGREGATION_SUFFIX'
+
+
 def aggregate_mesure_qs(file_system_handler: FileSystemHandler, date_range: tuple[datetime, datetime], dsp: str,
                         aggregation_level: AggregationLevel, mesure_type: MesureType,
                         periode_ete: tuple[date, date],
                         list_journees_exceptionnelles: Optional[list[datetime]] = None,
-                        window_name: str = "", read_options: dict = {}, write_options: dict = {}) -> None:
+                        window_name: str = "", read_options: dict = {}, write_options: dict = {},
+                        updated_dates: Optional[list[date]] = None) -> None:
     """Agrège les mesures journalières de la qualité de service et les sauvegarde selon les spécifications fournies.
 
     Agrège les dates contenu dans la plage de données date_range en fonction du type de mesure: ponctualité ou
-    régularité.
+    régularité. Voir aggregate_mesure_qs_by_levels.
 
     Parameters
     ----------
@@ -45,30 +58,98 @@ def aggregate_mesure_qs(file_system_handler: FileSystemHandler, date_range: tupl
         Options complémentaires de lecture.
     write_options : dict
         Options complémentaires d'écriture.
+    updated_dates : Optional[list[date]]
+        Si spécifiée, les agrégations sont mises à jour à partir de leurs sommes partielles persistées en ne lisant
+        que les mesures journalières de ces dates, voir update_partial_sums_by_suffix. Par défaut, toutes les mesures
+        journalières sont lues et toutes les agrégations sont calculées.
+    """
+    aggregate_mesure_qs_by_levels(
+        file_system_handler=file_system_handler, date_range=date_range, dsp=dsp, aggregation_levels=[aggregation_level],
+        mesure_type=mesure_type, periode_ete=periode_ete, list_journees_exceptionnelles=list_journees_exceptionnelles,
+        window_name=window_name, read_options=read_options, write_options=write_options,
+        updated_dates=updated_dates
+    )
+
+
+def aggregate_mesure_qs_by_levels(
+    file_system_handler: FileSystemHandler, date_range: tuple[datetime, datetime], dsp: str,
+    aggregation_levels: list[AggregationLevel], mesure_type: MesureType, periode_ete: tuple[date, date],
+    list_journees_exceptionnelles: Optional[list[datetime]] = None,
+    window_name: str = "", read_options: dict = {}, write_options: dict = {},
+    updated_dates: Optional[list[date]] = None
+) -> None:
+    """Agrège les mesures journalières de la qualité de service pour plusieurs niveaux d'agrégation à la fois.
+
+    Le calendrier scolaire et chaque mesure journalière ne sont lus qu'une seule fois, quel que soit le nombre de
+    niveaux d'agrégation. Chaque jour est associé au suffixe de chacun des niveaux d'agrégation, puis toutes les
+    agrégations sont calculées en un seul regroupement par (niveau, suffixe, ligne). Les fichiers produits sont
+    identiques à ceux d'un appel à aggregate_mesure_qs par niveau d'agrégation.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    date_range : Tuple[datetime, datetime]
+        Plage de dates pour l'agrégation.
+    dsp : str
+        DSP à agréger.
+    aggregation_levels : list[AggregationLevel]
+        Niveaux d'agrégation des données.
+    mesure_type : MesureType
+        Type de mesure à agréger (ponctualite ou regularite).
+    periode_ete : tuple[date, date]
+        Période d'été sous forme de tuple (début, fin) - Requis si l'aggregation concerne une period.
+    list_journees_exceptionnelles : Optional[List[datetime]]
+        La liste des journées exceptionnelles à exclure (ex: émeutes, grèves...). Par défaut, cette liste est vide.
+    window_name : Optional[str]
+        Nom de la fenêtre d'aggregation, optionnel par défaut égal à ""
+    read_options : dict
+        Options complémentaires de lecture.
+    write_options : dict
+        Options complémentaires d'écriture.
+    updated_dates : Optional[list[date]]
+        Si spécifiée, les agrégations sont mises à jour à partir de leurs sommes partielles persistées en ne lisant
+        que les mesures journalières de ces dates, voir update_partial_sums_by_suffix. Par défaut, toutes les mesures
+        journalières sont lues, toutes les agrégations sont calculées et les sommes partielles persistées seront
+        reconstruites lors de la prochaine mise à jour.
     """
 
     df_calendrier_scolaire = file_system_handler.get_calendrier_scolaire()
     suffix_by_agg = generate_suffix_by_aggregation(
-        df_calendrier_scolaire=df_calendrier_scolaire, periode_ete=periode_ete, window_name=window_name)
-    dict_date_lists = generate_date_aggregation_lists(
-        date_range=date_range, aggregation_level=aggregation_level, suffix_by_agg=suffix_by_agg,
-        list_journees_exceptionnelles=list_journees_exceptionnelles
-    )
+        df_calendrier_scolaire=df_calendrier_scolaire, periode_ete=periode_ete, window_name=window_name,
+        date_range=date_range)
+    dict_date_lists_by_level = {
+        aggregation_level: generate_date_aggregation_lists(
+            date_range=date_range, aggregation_level=aggregation_level, suffix_by_agg=suffix_by_agg,
+            list_journees_exceptionnelles=list_journees_exceptionnelles
+        )
+        for aggregation_level in aggregation_levels
+    }
+
+    if updated_dates is None:
+        df_aggregated_by_suffix = aggregate_mesure_qs_by_suffix(
+            file_system_handler=file_system_handler, dict_date_lists_by_level=dict_date_lists_by_level, dsp=dsp,
+            mesure_type=mesure_type, read_options=read_options)
+        # Les mesures journalières ont pu être recalculées sans mise à jour des sommes partielles : l'index des jours
+        # est vidé, chaque jour sera relu lors de la prochaine mise à jour incrémentale
+        if file_system_handler.get_partial_sums(dsp=dsp, mesure_type=mesure_type, name=_JOURS_INDEX_NAME) is not None:
+            file_system_handler.save_partial_sums({}, dsp=dsp, mesure_type=mesure_type, name=_JOURS_INDEX_NAME)
+        suffixes_to_save = [
+            (aggregation_level, suffix)
+            for aggregation_level, dict_date_lists in dict_date_lists_by_level.items()
+            for suffix in dict_date_lists
+        ]
+    else:
+        df_aggregated_by_suffix = update_partial_sums_by_suffix(
+            file_system_handler=file_system_handler, dict_date_lists_by_level=dict_date_lists_by_level,
+            updated_dates=updated_dates, dsp=dsp, mesure_type=mesure_type, read_options=read_options)
+        suffixes_to_save = list(df_aggregated_by_suffix)
 
-    for suffix, date_list in dict_date_lists.items():
+    for aggregation_level, suffix in suffixes_to_save:
         logger.info(f"Processing {mesure_type} aggregation: {suffix}")
-        mesure_list: list[pd.DataFrame] = []
-
-        for date_to_agg in date_list:
-            df = file_system_handler.get_daily_mesure_qs(
-                date=date_to_agg, dsp=dsp, mesure_type=mesure_type, **read_options
-            )
-            if not df.empty:
-                mesure_list.append(df)
-
-        if len(mesure_list) != 0:
-            df_all_mesure = pd.concat(mesure_list)
-            df_aggregated = aggregate_df(df_all_mesure, MESURE_TYPE[mesure_type])
+
+        if (aggregation_level, suffix) in df_aggregated_by_suffix:
+            df_aggregated = df_aggregated_by_suffix[(aggregation_level, suffix)]
         elif mesure_type == MesureType.ponctualite:
             df_aggregated = pd.DataFrame(columns=MesurePonctualite.column_order)
         else:
@@ -86,7 +167,191 @@ def aggregate_mesure_qs(file_system_handler: FileSystemHandler, date_range: tupl
         )
 
 
-def aggregate_df(df_all_mesure: pd.DataFrame, mesure: Mesure) -> pd.DataFrame:
+def aggregate_mesure_qs_by_suffix(
+    file_system_handler: FileSystemHandler, dict_date_lists_by_level: dict[AggregationLevel, dict[str, list[date]]],
+    dsp: str, mesure_type: MesureType, read_options: dict = {}
+) -> dict[tuple[AggregationLevel, str], pd.DataFrame]:
+    """Agrège les mesures journalières de toutes les agrégations à partir d'une seule lecture des mesures.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    dict_date_lists_by_level : dict[AggregationLevel, dict[str, list[date]]]
+        Dates de chaque suffixe d'agrégation, pour chaque niveau d'agrégation.
+    dsp : str
+        DSP à agréger.
+    mesure_type : MesureType
+        Type de mesure à agréger (ponctualite ou regularite).
+    read_options : dict
+        Options complémentaires de lecture.
+
+    Returns
+    -------
+    df_aggregated_by_suffix : dict[tuple[AggregationLevel, str], pd.DataFrame]
+        Mesures agrégées de chaque (niveau d'agrégation, suffixe) contenant au moins une mesure.
+    """
+    # Association de chaque jour aux suffixes de chaque niveau d'agrégation
+    df_suffix_by_jour = pd.DataFrame([
+        (date_to_agg.strftime('%Y-%m-%d'), aggregation_level, suffix)
+        for aggregation_level, dict_date_lists in dict_date_lists_by_level.items()
+        for suffix, date_list in dict_date_lists.items()
+        for date_to_agg in date_list
+    ], columns=[InputColumns.jour, AGGREGATION_LEVEL_COLUMN, AGGREGATION_SUFFIX_COLUMN])
+
+    dates_to_agg = sorted({
+        date_to_agg
+        for dict_date_lists in dict_date_lists_by_level.values()
+        for date_list in dict_date_lists.values()
+        for date_to_agg in date_list
+    })
+    df_all_mesure = file_system_handler.get_mesure_qs_by_dates(
+        dates=dates_to_agg, dsp=dsp, mesure_type=mesure_type, **read_options
+    )
+
+    if df_all_mesure.empty:
+        return {}
+
+    df_all_mesure = df_all_mesure.merge(df_suffix_by_jour, on=InputColumns.jour)
+    return {
+        suffix_key: df_aggregated.drop(columns=[AGGREGATION_LEVEL_COLUMN, AGGREGATION_SUFFIX_COLUMN]).reset_index(
+            drop=True)
+        for suffix_key, df_aggregated in aggregate_df(
+            df_all_mesure, MESURE_TYPE[mesure_type], by=[AGGREGATION_LEVEL_COLUMN, AGGREGATION_SUFFIX_COLUMN]
+        ).groupby([AGGREGATION_LEVEL_COLUMN, AGGREGATION_SUFFIX_COLUMN])
+    }
+
+
+def update_partial_sums_by_suffix(
+    file_system_handler: FileSystemHandler, dict_date_lists_by_level: dict[AggregationLevel, dict[str, list[date]]],
+    updated_dates: list[date], dsp: str, mesure_type: MesureType, read_options: dict = {}
+) -> dict[tuple[AggregationLevel, str], pd.DataFrame]:
+    """Met à jour les sommes partielles persistées des agrégations et en déduit les mesures agrégées modifiées.
+
+    Les taux agrégés ne dépendent que des sommes, par ligne, des colonnes de aggregate_df. Ces sommes sont conservées
+    pour chaque (niveau d'agrégation, suffixe) avec la version de la contribution de chacun de ses jours :
+    - seules les mesures journalières des dates mises à jour, ou jamais lues, sont lues. La contribution de chaque jour
+      est conservée sous une version identifiée par son empreinte, l'index des jours référence la dernière version.
+    - pour chaque suffixe, les contributions des jours qui ne font plus partie de l'agrégation (journées
+      exceptionnelles, dates hors de la plage) ou dont la version a changé sont retirées, puis les nouvelles
+      contributions sont ajoutées. Mettre à jour un jour d'une agrégation annuelle ne coûte donc que la lecture de ce
+      jour.
+    - un suffixe dont les sommes partielles n'existent pas encore est calculé à partir de toutes ses contributions.
+
+    Les mesures agrégées sont identiques à celles de aggregate_df, au dernier chiffre significatif du score de
+    conformité près, les sommes partielles étant exactes.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    dict_date_lists_by_level : dict[AggregationLevel, dict[str, list[date]]]
+        Dates de chaque suffixe d'agrégation, pour chaque niveau d'agrégation.
+    updated_dates : list[date]
+        Dates dont les mesures journalières ont été recalculées depuis la dernière mise à jour.
+    dsp : str
+        DSP à agréger.
+    mesure_type : MesureType
+        Type de mesure à agréger (ponctualite ou regularite).
+    read_options : dict
+        Options complémentaires de lecture.
+
+    Returns
+    -------
+    df_aggregated_by_suffix : dict[tuple[AggregationLevel, str], pd.DataFrame]
+        Mesures agrégées de chaque (niveau d'agrégation, suffixe) dont les sommes partielles ont changé.
+    """
+    mesure = MESURE_TYPE[mesure_type]
+
+    jours_by_suffix = {
+        (aggregation_level, suffix): sorted({date_to_agg.strftime('%Y-%m-%d') for date_to_agg in date_list})
+        for aggregation_level, dict_date_lists in dict_date_lists_by_level.items()
+        for suffix, date_list in dict_date_lists.items()
+    }
+    updated_jours = {updated_date.strftime('%Y-%m-%d') for updated_date in updated_dates}
+
+    jours_index = file_system_handler.get_partial_sums(
+        dsp=dsp, mesure_type=mesure_type, name=_JOURS_INDEX_NAME) or {}
+    jours_to_read = sorted({
+        jour for jours in jours_by_suffix.values() for jour in jours
+        if jour in updated_jours or jour not in jours_index
+    })
+
+    daily_partial_sums: dict[tuple[str, str], Optional[pd.DataFrame]] = {}
+    if jours_to_read:
+        df_all_mesure = file_system_handler.get_mesure_qs_by_dates(
+            dates=[date.fromisoformat(jour) for jour in jours_to_read], dsp=dsp, mesure_type=mesure_type,
+            **read_options
+        )
+        df_partial_sums_by_jour = {} if df_all_mesure.empty else compute_daily_partial_sums(df_all_mesure, mesure)
+
+        for jour in jours_to_read:
+            df_daily_partial_sums = df_partial_sums_by_jour.get(jour, empty_partial_sums(mesure))
+            records = partial_sums_to_records(df_daily_partial_sums)
+            digest = partial_sums_digest(records)
+            file_system_handler.save_partial_sums(
+                {PartialSums.sums: records}, dsp=dsp, mesure_type=mesure_type, name=_jour_name(jour, digest))
+            daily_partial_sums[(jour, digest)] = df_daily_partial_sums
+            jours_index[jour] = digest
+
+    def get_daily_partial_sums(jour: str, digest: str) -> Optional[pd.DataFrame]:
+        if (jour, digest) not in daily_partial_sums:
+            stored = file_system_handler.get_partial_sums(
+                dsp=dsp, mesure_type=mesure_type, name=_jour_name(jour, digest))
+            daily_partial_sums[(jour, digest)] = (
+                None if stored is None else partial_sums_from_records(stored[PartialSums.sums], mesure))
+        return daily_partial_sums[(jour, digest)]
+
+    df_aggregated_by_suffix: dict[tuple[AggregationLevel, str], pd.DataFrame] = {}
+    for (aggregation_level, suffix), jours in jours_by_suffix.items():
+        name = f"{aggregation_level}/{suffix}"
+        stored = file_system_handler.get_partial_sums(dsp=dsp, mesure_type=mesure_type, name=name)
+        digest_by_jour = {jour: jours_index[jour] for jour in jours}
+
+        if stored is None:
+            stored_digest_by_jour, df_partial_sums = {}, empty_partial_sums(mesure)
+        else:
+            stored_digest_by_jour = stored[PartialSums.jours]
+            df_partial_sums = partial_sums_from_records(stored[PartialSums.sums], mesure)
+            if stored_digest_by_jour == digest_by_jour:
+                continue
+
+        removed = [
+            get_daily_partial_sums(jour, digest) for jour, digest in stored_digest_by_jour.items()
+            if digest_by_jour.get(jour) != digest
+        ]
+        added = [
+            (jour, digest) for jour, digest in digest_by_jour.items() if stored_digest_by_jour.get(jour) != digest
+        ]
+
+        # Une contribution à retirer introuvable empêche la mise à jour, les sommes partielles sont recalculées
+        if any(df_removed is None for df_removed in removed):
+            logger.info(f"Missing daily partial sums, rebuilding {mesure_type} aggregation: {suffix}")
+            df_partial_sums, removed, added = empty_partial_sums(mesure), [], list(digest_by_jour.items())
+
+        df_partial_sums = add_partial_sums(df_partial_sums, removed, sign=-1)
+        df_partial_sums = add_partial_sums(
+            df_partial_sums, [get_daily_partial_sums(jour, digest) for jour, digest in added])
+
+        file_system_handler.save_partial_sums(
+            {PartialSums.jours: digest_by_jour, PartialSums.sums: partial_sums_to_records(df_partial_sums)},
+            dsp=dsp, mesure_type=mesure_type, name=name)
+        if not df_partial_sums.empty:
+            df_aggregated_by_suffix[(aggregation_level, suffix)] = partial_sums_to_mesure(df_partial_sums, mesure)
+        else:
+            df_aggregated_by_suffix[(aggregation_level, suffix)] = pd.DataFrame(columns=mesure.column_order)
+
+    file_system_handler.save_partial_sums(
+        jours_index, dsp=dsp, mesure_type=mesure_type, name=_JOURS_INDEX_NAME)
+
+    return df_aggregated_by_suffix
+
+
+def _jour_name(jour: str, digest: str) -> str:
+    return f"{PartialSums.jours}/{jour}_{digest}"
+
+
+def aggregate_df(df_all_mesure: pd.DataFrame, mesure: Mesure, by: list[str] = []) -> pd.DataFrame:
     """Agrège les mesures de la qualité de service.
 
     Cette fonction prend un DataFrame de toutes les mesures quotidiennes de qualité de service et agrège ces mesures par
@@ -99,29 +364,15 @@ def aggregate_df(df_all_mesure: pd.DataFrame, mesure: Mesure) -> pd.DataFrame:
         DataFrame contenant les mesures quotidiennes de qualité de service.
     mesure : Mesure
         Objet Mesure spécifiant les colonnes à agréger.
+    by : list[str]
+        Colonnes de regroupement supplémentaires, placées avant la ligne, par défaut à [].
 
     Returns
     -------
     pd.DataFrame: DataFrame agrégé des mesures de qualité de service.
     """
-    grouped_df = df_all_mesure.groupby(mesure.ligne, observed=True)
-
-    columns_to_sum = [
-        mesure.nombre_theorique,
-        mesure.nombre_reel,
-        mesure.score_de_conformite,
-        *mesure.situation_inacceptable_types,
-    ]
-
-    df_aggregated = grouped_df[columns_to_sum].sum()
+    grouped_df = df_all_mesure.groupby(by + [mesure.ligne], observed=True)
 
-    df_aggregated[mesure.taux_de_conformite] = round(
-            df_aggregated[mesure.score_de_conformite] / df_aggregated[mesure.nombre_theorique] * 100, 2
-    )
-
-    df_aggregated[mesure.taux_absence_de_donnees] = round(
-            (df_aggregated[mesure.nombre_theorique] - df_aggregated[mesure.nombre_reel]) /
-            df_aggregated[mesure.nombre_theorique] * 100, 2
-    )
+    df_aggregated = grouped_df[get_columns_to_sum(mesure)].sum()
 
-    return df_aggregated.reset_index()
+    return add_taux(df_aggregated, mesure).reset_index()
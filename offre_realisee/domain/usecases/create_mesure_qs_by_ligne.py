@@ -0,0 +1,359 @@
+from collections import defaultdict
+from datetime import date
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.config.logger import logger
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.config.offre_realisee_config import MesureType, AssignmentSolver
+from offre_realisee.domain.entities.drop_stop_without_real_time import drop_stop_without_real_time
+from offre_realisee.domain.entities.metrics import collect_metrics, get_metrics
+from offre_realisee.domain.entities.offre_realisee_table_to_pandas import offre_realisee_table_to_pandas
+from offre_realisee.domain.entities.group_offre_realisee_by_stop import (
+    prepare_offre_realisee_by_stop, group_prepared_offre_realisee_by_stop)
+from offre_realisee.domain.entities.ponctualite.compute_ponctualite_stat_from_dataframe import (
+    compute_ponctualite_stat_from_stops)
+from offre_realisee.domain.entities.regularite.compute_regularite_stat_from_dataframe import (
+    compute_regularite_stat_from_prepared_dataframe)
+from offre_realisee.domain.port.file_system_handler import FileSystemHandler
+from offre_realisee.domain.usecases.worker_pool import WorkerPool
+
+
+def plan_mesure_qs_by_ligne(
+    file_system_handler: FileSystemHandler, date: date, dsp: str = "", ligne: str = "",
+    shared_offre_realisee: Optional[str] = None
+) -> dict:
+    """Découpe le calcul des mesures d'une journée en unités (date, ligne) et estime le coût de chacune.
+
+    Les informations qui dépendent de toute la journée sont calculées ici, pour que le calcul d'une ligne seule donne
+    le même résultat que le calcul de la journée complète :
+    - les arrêts sans aucune heure réelle, toutes lignes confondues, voir drop_stop_without_real_time
+    - la validité de la journée pour la ponctualité (heures théoriques, sens et arrêts renseignés)
+    Une journée invalide, vide, d'une seule ligne ou ayant des passages sans ligne ou sans arrêt n'est pas découpée et
+    est calculée en une seule unité.
+
+    La journée découpée est triée par ligne et partagée avec les processus de calcul (voir
+    FileSystemHandler.share_offre_realisee) : chaque unité lit la tranche de sa ligne sans relire ni décoder les
+    données d'entrée. La table partagée doit être libérée par l'appelant, même si le découpage échoue : son
+    identifiant peut être réservé par l'appelant avant le découpage, voir FileSystemHandler.new_shared_offre_realisee.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    date : date
+        Date à découper.
+    dsp : str
+        DSP pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    ligne : str
+        Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    shared_offre_realisee : Optional[str]
+        Identifiant réservé pour la journée partagée, par défaut un nouvel identifiant est réservé.
+
+    Returns
+    -------
+    plan : dict
+        - n_passages : nombre de passages de la journée
+        - shared_offre_realisee : identifiant de la journée partagée, None si la journée n'est pas découpée
+        - slices_by_ligne : première ligne et nombre de passages de chaque ligne dans la journée partagée
+        - arrets_without_real_time : arrêts à exclure de chaque ligne, None si aucun arrêt n'est exclu
+    """
+    metrics = get_metrics()
+    # Le tri est stable : les passages d'une ligne restent dans l'ordre de lecture d'une ligne seule
+    with metrics.timer(MetricName.read):
+        table_offre_realisee = file_system_handler.get_daily_offre_realisee_table(
+            date=date, dsp=dsp, ligne=ligne).sort_by(InputColumns.ligne)
+        df_offre_realisee = offre_realisee_table_to_pandas(table_offre_realisee)
+    metrics.count(MetricName.rows_read, len(df_offre_realisee))
+    df_offre_realisee_without_empty_stops = drop_stop_without_real_time(df_offre_realisee)
+
+    plan = {
+        'n_passages': len(df_offre_realisee), 'shared_offre_realisee': None, 'slices_by_ligne': None,
+        'arrets_without_real_time': None
+    }
+
+    if (df_offre_realisee_without_empty_stops[InputColumns.heure_theorique].isna().all() or
+            df_offre_realisee_without_empty_stops[InputColumns.sens].isna().any() or
+            df_offre_realisee_without_empty_stops[InputColumns.arret].isna().any() or
+            df_offre_realisee[InputColumns.ligne].isna().any() or
+            df_offre_realisee[InputColumns.arret].isna().any() or
+            df_offre_realisee[InputColumns.ligne].nunique() < 2):
+        return plan
+
+    # drop_stop_without_real_time ne filtre rien si la journée n'a aucune heure réelle
+    if len(df_offre_realisee_without_empty_stops) < len(df_offre_realisee):
+        plan['arrets_without_real_time'] = sorted(
+            set(df_offre_realisee[InputColumns.arret]) - set(df_offre_realisee_without_empty_stops[InputColumns.arret]))
+
+    plan['slices_by_ligne'] = {
+        str(ligne_to_compute): (int(positions[0]), len(positions))
+        for ligne_to_compute, positions in df_offre_realisee.groupby(
+            InputColumns.ligne, observed=True, sort=False).indices.items()
+    }
+    if shared_offre_realisee is None:
+        shared_offre_realisee = file_system_handler.new_shared_offre_realisee()
+    file_system_handler.share_offre_realisee(table_offre_realisee, shared_offre_realisee=shared_offre_realisee)
+    plan['shared_offre_realisee'] = shared_offre_realisee
+    return plan
+
+
+def compute_mesure_qs_ligne(
+    file_system_handler: FileSystemHandler, shared_offre_realisee: str, offset: int, length: int,
+    mesure_types: list[MesureType], arrets_without_real_time: Optional[list[str]] = None, metadata_cols: list[str] = [],
+    solver: AssignmentSolver = AssignmentSolver.dense
+) -> dict[MesureType, pd.DataFrame]:
+    """Calcule les mesures de qualité de service d'une seule ligne d'une journée valide, sans les sauvegarder.
+
+    Les statistiques étant calculées par arrêt puis par ligne, le résultat est identique aux lignes correspondantes
+    des mesures de la journée complète, voir create_mesure_qs_ponctualite_regularite.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    shared_offre_realisee : str
+        Identifiant de la journée partagée, voir plan_mesure_qs_by_ligne.
+    offset : int
+        Première ligne de la ligne dans la journée partagée.
+    length : int
+        Nombre de passages de la ligne.
+    mesure_types : list[MesureType]
+        Types de mesure à calculer.
+    arrets_without_real_time : Optional[list[str]]
+        Arrêts sans heure réelle sur toute la journée, à exclure, voir plan_mesure_qs_by_ligne.
+    metadata_cols: list[str]
+        Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique en ponctualité, par défaut AssignmentSolver.dense.
+
+    Returns
+    -------
+    df_stat_by_mesure_type : dict[MesureType, DataFrame]
+        Statistiques de la ligne pour chaque type de mesure.
+    """
+    with get_metrics().timer(MetricName.read):
+        df_offre_realisee = file_system_handler.get_shared_offre_realisee(
+            shared_offre_realisee=shared_offre_realisee, offset=offset, length=length)
+    if arrets_without_real_time is not None:
+        df_offre_realisee = df_offre_realisee[~df_offre_realisee[InputColumns.arret].isin(arrets_without_real_time)]
+
+    df_offre_realisee_by_stop = prepare_offre_realisee_by_stop(df_offre_realisee)
+
+    df_stat_by_mesure_type = {}
+    if MesureType.ponctualite in mesure_types:
+        df_stat_by_mesure_type[MesureType.ponctualite] = compute_ponctualite_stat_from_stops(
+            stops=group_prepared_offre_realisee_by_stop(df_offre_realisee_by_stop), metadata_cols=metadata_cols,
+            solver=solver)
+    if MesureType.regularite in mesure_types:
+        df_stat_by_mesure_type[MesureType.regularite] = compute_regularite_stat_from_prepared_dataframe(
+            df_offre_realisee_by_stop=df_offre_realisee_by_stop, metadata_cols=metadata_cols)
+    return df_stat_by_mesure_type
+
+
+def _run_with_metrics(
+    file_system_handler: FileSystemHandler, task_function: Callable[..., Any], metrics: bool, **kwargs
+) -> tuple[Any, Optional[dict]]:
+    with collect_metrics(enabled=metrics) as registry:
+        result = task_function(file_system_handler=file_system_handler, **kwargs)
+    return result, registry.to_dict() if registry.enabled else None
+
+
+def _compute_mesure_qs_unit(
+    file_system_handler: FileSystemHandler, create_daily_mesure_qs: Callable[..., None], date: date,
+    ligne: Optional[str], **kwargs
+) -> Optional[dict[MesureType, pd.DataFrame]]:
+    if ligne is None:
+        create_daily_mesure_qs(
+            file_system_handler=file_system_handler, date=date, dsp=kwargs['dsp'], ligne=kwargs['ligne_filter'],
+            metadata_cols=kwargs['metadata_cols'], **kwargs['daily_options'])
+        return None
+
+    logger.info(f'Process: {date.strftime("%Y-%m-%d")} - ligne {ligne}')
+    return compute_mesure_qs_ligne(
+        file_system_handler=file_system_handler, shared_offre_realisee=kwargs['shared_offre_realisee'],
+        offset=kwargs['offset'], length=kwargs['length'], mesure_types=kwargs['mesure_types'],
+        arrets_without_real_time=kwargs['arrets_without_real_time'],
+        metadata_cols=kwargs['metadata_cols'], solver=kwargs['solver'])
+
+
+def _compute_mesure_qs_units(
+    file_system_handler: FileSystemHandler, worker_pool: WorkerPool, dates: list[date], plans: list[dict],
+    mesure_types: list[MesureType], create_daily_mesure_qs: Callable[..., None], dsp: str, ligne: str,
+    metadata_cols: list[str], solver: AssignmentSolver, metrics: bool
+) -> tuple[list[tuple[Any, Optional[dict]]], list[dict]]:
+    daily_options = {'solver': solver} if MesureType.ponctualite in mesure_types else {}
+    units, costs, plan_positions = [], [], []
+    for plan_position, (date_to_compute, plan) in enumerate(zip(dates, plans)):
+        unit = {
+            'create_daily_mesure_qs': create_daily_mesure_qs, 'date': date_to_compute, 'dsp': dsp,
+            'ligne_filter': ligne, 'mesure_types': mesure_types, 'metadata_cols': metadata_cols, 'solver': solver,
+            'daily_options': daily_options, 'arrets_without_real_time': plan['arrets_without_real_time'],
+            'shared_offre_realisee': plan['shared_offre_realisee'],
+        }
+        if plan['slices_by_ligne'] is None:
+            units.append({**unit, 'ligne': None})
+            costs.append(plan['n_passages'])
+            plan_positions.append(plan_position)
+            continue
+        for ligne_to_compute, (offset, length) in plan['slices_by_ligne'].items():
+            units.append({**unit, 'ligne': ligne_to_compute, 'offset': offset, 'length': length})
+            costs.append(length)
+            plan_positions.append(plan_position)
+
+    order = sorted(range(len(units)), key=lambda position: costs[position], reverse=True)
+    remaining_units_by_plan = [plan_positions.count(plan_position) for plan_position in range(len(plans))]
+
+    def release_finished_day(position: int, _: Any) -> None:
+        plan_position = plan_positions[order[position]]
+        remaining_units_by_plan[plan_position] -= 1
+        shared_offre_realisee = plans[plan_position]['shared_offre_realisee']
+        if remaining_units_by_plan[plan_position] == 0 and shared_offre_realisee is not None:
+            file_system_handler.release_shared_offre_realisee(shared_offre_realisee)
+
+    logger.info(f"Computing {len(units)} units for {len(dates)} dates")
+    results = worker_pool.map(_run_with_metrics, [
+        {'task_function': _compute_mesure_qs_unit, 'metrics': metrics, **units[position]} for position in order
+    ], costs=[costs[position] for position in order], task_kind='unit', on_result=release_finished_day)
+    return results, [units[position] for position in order]
+
+
+def create_mesure_qs_by_ligne(
+    file_system_handler: FileSystemHandler, dates: list[date], mesure_types: list[MesureType],
+    create_daily_mesure_qs: Callable[..., None], n_thread: int, worker_pool: Optional[WorkerPool] = None,
+    dsp: str = "", ligne: str = "", metadata_cols: list[str] = [], solver: AssignmentSolver = AssignmentSolver.dense,
+    metrics: bool = False
+) -> None:
+    """Calcule et sauvegarde les mesures de plusieurs journées en parallélisant les calculs par (date, ligne).
+
+    1. Chaque journée est lue une seule fois, découpée en lignes et partagée en parallèle, voir
+       plan_mesure_qs_by_ligne. Les journées sont lues par nombre de passages décroissant, lu dans les métadonnées
+       des fichiers d'entrée (voir FileSystemHandler.get_daily_offre_realisee_row_count) : les grosses journées ne
+       s'accumulent pas en fin de file sur un même processus.
+    2. Les unités (date, ligne) de toutes les journées sont triées par nombre de passages décroissant, puis réparties
+       sur les processus depuis une file unique : les lignes les plus coûteuses sont calculées en premier et le
+       nombre d'unités ne limite plus le parallélisme à une journée par processus. Avec un budget mémoire (voir
+       WorkerPool), le nombre de passages de chaque unité limite aussi les unités calculées en même temps. Une
+       journée partagée est libérée dès que toutes ses unités sont calculées, et toutes les journées partagées sont
+       libérées si le découpage ou le calcul échoue.
+    3. Les résultats des lignes d'une journée sont réunis, triés par ligne, et sauvegardés dans le même fichier
+       journalier que create_daily_mesure_qs. Une journée qui n'a pas pu être découpée est calculée en une seule
+       unité par create_daily_mesure_qs.
+    4. Si metrics vaut True, les durées et compteurs de chaque étape (voir MetricName) mesurés par les processus
+       pour une journée sont additionnés et sauvegardés sur une ligne JSON, voir FileSystemHandler.save_daily_metrics.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    dates : list[date]
+        Dates pour lesquelles les mesures de qualité de service doivent être calculées.
+    mesure_types : list[MesureType]
+        Types de mesure à calculer.
+    create_daily_mesure_qs : Callable[..., None]
+        Fonction calculant et sauvegardant les mesures d'une journée complète, pour les mêmes types de mesure.
+    n_thread : int
+        Nombre de processus en parallèle, si aucun pool n'est fourni.
+    worker_pool : Optional[WorkerPool]
+        Pool de processus à utiliser, par défaut un pool est créé pour ces dates.
+    dsp : str
+        DSP pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    ligne : str
+        Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    metadata_cols: list[str]
+        Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique en ponctualité, par défaut AssignmentSolver.dense.
+    metrics : bool
+        Si True, les mesures de performance de chaque journée sont sauvegardées. Par défaut à False, aucune mesure
+        n'est prise.
+    """
+    if worker_pool is None:
+        with WorkerPool(file_system_handler=file_system_handler, n_thread=n_thread) as dates_worker_pool:
+            create_mesure_qs_by_ligne(
+                file_system_handler=file_system_handler, dates=dates, mesure_types=mesure_types,
+                create_daily_mesure_qs=create_daily_mesure_qs, n_thread=n_thread, worker_pool=dates_worker_pool,
+                dsp=dsp, ligne=ligne, metadata_cols=metadata_cols, solver=solver, metrics=metrics)
+        return
+
+    if worker_pool.file_system_handler is not file_system_handler:
+        raise ValueError("The worker pool must use the same file system handler as the tasks")
+
+    # Les journées les plus coûteuses sont lues en premier (LPT), le nombre de passages sert aussi au budget mémoire
+    plan_costs = [file_system_handler.get_daily_offre_realisee_row_count(date=date_to_plan) for date_to_plan in dates]
+    plan_order = sorted(range(len(dates)), key=lambda position: plan_costs[position], reverse=True)
+    # Les identifiants des journées partagées sont réservés avant le découpage, pour les libérer même s'il échoue
+    shared_offre_realisee_by_date = [file_system_handler.new_shared_offre_realisee() for _ in dates]
+    try:
+        ordered_plans_with_metrics = worker_pool.map(_run_with_metrics, [
+            {'task_function': plan_mesure_qs_by_ligne, 'metrics': metrics, 'date': dates[position], 'dsp': dsp,
+             'ligne': ligne, 'shared_offre_realisee': shared_offre_realisee_by_date[position]}
+            for position in plan_order
+        ], costs=[plan_costs[position] for position in plan_order], task_kind='plan')
+        plans_with_metrics = [None] * len(dates)
+        for position, plan_with_metrics in zip(plan_order, ordered_plans_with_metrics):
+            plans_with_metrics[position] = plan_with_metrics
+
+        results, units = _compute_mesure_qs_units(
+            file_system_handler=file_system_handler, worker_pool=worker_pool, dates=dates,
+            plans=[plan for plan, _ in plans_with_metrics], mesure_types=mesure_types,
+            create_daily_mesure_qs=create_daily_mesure_qs, dsp=dsp, ligne=ligne, metadata_cols=metadata_cols,
+            solver=solver, metrics=metrics)
+    finally:
+        for shared_offre_realisee in shared_offre_realisee_by_date:
+            file_system_handler.release_shared_offre_realisee(shared_offre_realisee)
+
+    df_stats_by_date = defaultdict(lambda: defaultdict(list))
+    metrics_by_date = defaultdict(list)
+    for date_to_compute, (_, plan_metrics) in zip(dates, plans_with_metrics):
+        metrics_by_date[date_to_compute].append(plan_metrics)
+    for unit, (df_stat_by_mesure_type, unit_metrics) in zip(units, results):
+        metrics_by_date[unit['date']].append(unit_metrics)
+        if df_stat_by_mesure_type is None:
+            continue
+        for mesure_type, df_stat in df_stat_by_mesure_type.items():
+            df_stats_by_date[unit['date']][mesure_type].append(df_stat)
+
+    for date_to_save in dates:
+        with collect_metrics(enabled=metrics) as date_metrics:
+            for mesure_type, df_stats in df_stats_by_date[date_to_save].items():
+                df_stat = merge_mesure_qs_lignes(df_stats)
+
+                # Comme pour la journée complète, une régularité vide n'est pas sauvegardée
+                if mesure_type == MesureType.regularite and df_stat.empty:
+                    logger.info(f'No data to save on regularity for {date_to_save.strftime("%Y-%m-%d")}, for dsp '
+                                f'{dsp} and ligne {ligne}')
+                    continue
+
+                with date_metrics.timer(MetricName.write):
+                    file_system_handler.save_daily_mesure_qs(
+                        df_mesure_qs=df_stat, date=date_to_save, dsp=dsp, mesure_type=mesure_type)
+
+        if metrics:
+            for unit_metrics in metrics_by_date[date_to_save]:
+                date_metrics.merge(unit_metrics)
+            file_system_handler.save_daily_metrics(metrics={
+                'jour': date_to_save.strftime('%Y-%m-%d'), 'dsp': dsp, 'ligne': ligne, 'mesure_types': mesure_types,
+                'units': len(metrics_by_date[date_to_save]) - 1, **date_metrics.to_dict()
+            }, date=date_to_save, dsp=dsp)
+
+
+def merge_mesure_qs_lignes(df_stats: list[pd.DataFrame]) -> pd.DataFrame:
+    """Réunit les statistiques de plusieurs lignes d'une journée, triées par ligne comme celles de la journée complète.
+
+    Parameters
+    ----------
+    df_stats : list[DataFrame]
+        Statistiques de chaque ligne.
+
+    Returns
+    -------
+    df_stat : DataFrame
+        Statistiques de toutes les lignes, vide si aucune ligne n'a de statistique.
+    """
+    df_stats_not_empty = [df_stat for df_stat in df_stats if not df_stat.empty]
+    if not df_stats_not_empty:
+        return df_stats[0]
+
+    return pd.concat(df_stats_not_empty).sort_values(by=InputColumns.ligne, kind='stable').reset_index(drop=True)
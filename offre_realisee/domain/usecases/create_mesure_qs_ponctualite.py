@@ -1,14 +1,18 @@
 from datetime import date
-from functools import partial
+from typing import Optional
 
 import pandas as pd
-from multiprocess import Pool
 
 from offre_realisee.config.input_config import InputColumns
 from offre_realisee.config.logger import logger
-from offre_realisee.config.offre_realisee_config import MesureType
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.config.offre_realisee_config import MesureType, AssignmentSolver
 from offre_realisee.domain.entities.drop_stop_without_real_time import drop_stop_without_real_time
+from offre_realisee.domain.entities.metrics import get_metrics
 from offre_realisee.domain.port.file_system_handler import FileSystemHandler
+from offre_realisee.domain.usecases.run_incremental_date_range import run_incremental_date_range
+from offre_realisee.domain.usecases.create_mesure_qs_by_ligne import create_mesure_qs_by_ligne
+from offre_realisee.domain.usecases.worker_pool import WorkerPool
 from offre_realisee.domain.entities.ponctualite.compute_ponctualite_stat_from_dataframe import (
     compute_ponctualite_stat_from_dataframe)
 
@@ -18,7 +22,8 @@ NUMBER_OF_PARALLEL_PROCESS: int = 6
 
 def create_mesure_qs_ponctualite(
     file_system_handler: FileSystemHandler,
-    date: date, dsp: str = "", ligne: str = "", metadata_cols: list[str] = []
+    date: date, dsp: str = "", ligne: str = "", metadata_cols: list[str] = [],
+    solver: AssignmentSolver = AssignmentSolver.dense
 ) -> None:
     """Crée et sauvegarde les mesures de qualité de service de type ponctualité.
 
@@ -37,15 +42,20 @@ def create_mesure_qs_ponctualite(
         Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
     metadata_cols: list[str]
         Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique en ponctualité, par défaut AssignmentSolver.dense.
     """
 
     logger.info(f'Process: {date.strftime("%Y-%m-%d")}')
 
+    metrics = get_metrics()
     try:
-        df_offre_realisee = file_system_handler.get_daily_offre_realisee(date=date, dsp=dsp, ligne=ligne)
+        with metrics.timer(MetricName.read):
+            df_offre_realisee = file_system_handler.get_daily_offre_realisee(date=date, dsp=dsp, ligne=ligne)
     except FileNotFoundError:
         logger.info(f'No data to process for {date.strftime("%Y-%m-%d")} with dsp: [{dsp}] and ligne: [{ligne}]')
         return
+    metrics.count(MetricName.rows_read, len(df_offre_realisee))
 
     # Un arrêt sans aucune heure réelle n'est pas pris en compte, il peut s'agir d'un arrêt non desservi.
     df_offre_realisee_without_empty_stops = drop_stop_without_real_time(df_offre_realisee)
@@ -53,21 +63,24 @@ def create_mesure_qs_ponctualite(
     if (df_offre_realisee_without_empty_stops[InputColumns.heure_theorique].isna().all() or
             df_offre_realisee_without_empty_stops[InputColumns.sens].isna().any() or
             df_offre_realisee_without_empty_stops[InputColumns.arret].isna().any()):
-        file_system_handler.save_error_mesure_qs(
-            df_mesure_qs=df_offre_realisee, date=date, mesure_type=MesureType.ponctualite, dsp=dsp, ligne=ligne)
+        with metrics.timer(MetricName.write):
+            file_system_handler.save_error_mesure_qs(
+                df_mesure_qs=df_offre_realisee, date=date, mesure_type=MesureType.ponctualite, dsp=dsp, ligne=ligne)
     else:
         df_stat_ponctualite = compute_ponctualite_stat_from_dataframe(
-            df_offre_realisee=df_offre_realisee_without_empty_stops, metadata_cols=metadata_cols)
-        file_system_handler.save_daily_mesure_qs(
-            df_mesure_qs=df_stat_ponctualite, date=date, dsp=dsp, mesure_type=MesureType.ponctualite
-        )
+            df_offre_realisee=df_offre_realisee_without_empty_stops, metadata_cols=metadata_cols, solver=solver)
+        with metrics.timer(MetricName.write):
+            file_system_handler.save_daily_mesure_qs(
+                df_mesure_qs=df_stat_ponctualite, date=date, dsp=dsp, mesure_type=MesureType.ponctualite
+            )
 
 
 def create_mesure_qs_ponctualite_date_range(
         file_system_handler: FileSystemHandler,
         date_range: tuple[date, date], dsp: str = "", ligne: str = "", metadata_cols: list[str] = [],
-        n_thread: int = NUMBER_OF_PARALLEL_PROCESS
-) -> None:
+        n_thread: int = NUMBER_OF_PARALLEL_PROCESS, solver: AssignmentSolver = AssignmentSolver.dense,
+        incremental: bool = False, worker_pool: Optional[WorkerPool] = None, metrics: bool = False
+) -> list[date]:
     """Appelle la fonction create_mesure_qs_ponctualite sur une plage de date, en parallélisant les calculs.
 
     Parameters
@@ -84,13 +97,35 @@ def create_mesure_qs_ponctualite_date_range(
         Nombre de processus en parallèle.
     metadata_cols: list[str]
         Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique en ponctualité, par défaut AssignmentSolver.dense.
+    incremental : bool
+        Si True, seules les dates dont les données d'entrée, la version du code ou les paramètres ont changé depuis la
+        dernière exécution sont calculées, voir run_incremental_date_range. Par défaut à False.
+    worker_pool : Optional[WorkerPool]
+        Pool de processus partagé par toute l'exécution, par défaut un pool de n_thread processus est créé pour ces
+        seules dates.
+    metrics : bool
+        Si True, les mesures de performance de chaque journée sont sauvegardées à côté des mesures, voir
+        create_mesure_qs_by_ligne. Par défaut à False.
+
+    Returns
+    -------
+    computed_dates : list[date]
+        Dates effectivement calculées.
     """
     date_range_list = pd.date_range(start=date_range[0], end=date_range[1])
 
-    create_mesure_qs_ponctualite_partial = partial(
-        create_mesure_qs_ponctualite,
-        file_system_handler=file_system_handler, dsp=dsp, ligne=ligne, metadata_cols=metadata_cols
-    )
+    def compute_dates(dates: list[date]) -> None:
+        create_mesure_qs_by_ligne(
+            file_system_handler=file_system_handler, dates=dates, mesure_types=[MesureType.ponctualite],
+            create_daily_mesure_qs=create_mesure_qs_ponctualite, n_thread=n_thread, worker_pool=worker_pool, dsp=dsp,
+            ligne=ligne, metadata_cols=metadata_cols, solver=solver, metrics=metrics
+        )
 
-    with Pool(processes=n_thread) as pool:
-        pool.map(lambda date: create_mesure_qs_ponctualite_partial(date=date), date_range_list)
+    return run_incremental_date_range(
+        file_system_handler=file_system_handler, dates=list(date_range_list), dsp=dsp,
+        mesure_types=[MesureType.ponctualite],
+        parameters={'solver': solver, 'ligne': ligne, 'metadata_cols': metadata_cols},
+        compute_dates=compute_dates, incremental=incremental
+    )
@@ -0,0 +1,154 @@
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.config.logger import logger
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.config.offre_realisee_config import MesureType, AssignmentSolver
+from offre_realisee.domain.entities.drop_stop_without_real_time import drop_stop_without_real_time
+from offre_realisee.domain.entities.metrics import get_metrics
+from offre_realisee.domain.entities.group_offre_realisee_by_stop import (
+    prepare_offre_realisee_by_stop, group_prepared_offre_realisee_by_stop)
+from offre_realisee.domain.port.file_system_handler import FileSystemHandler
+from offre_realisee.domain.usecases.run_incremental_date_range import run_incremental_date_range
+from offre_realisee.domain.usecases.create_mesure_qs_by_ligne import create_mesure_qs_by_ligne
+from offre_realisee.domain.usecases.worker_pool import WorkerPool
+from offre_realisee.domain.entities.ponctualite.compute_ponctualite_stat_from_dataframe import (
+    compute_ponctualite_stat_from_stops)
+from offre_realisee.domain.entities.regularite.compute_regularite_stat_from_dataframe import (
+    compute_regularite_stat_from_prepared_dataframe)
+
+
+NUMBER_OF_PARALLEL_PROCESS: int = 6
+
+
+def create_mesure_qs_ponctualite_regularite(
+    file_system_handler: FileSystemHandler,
+    date: date, dsp: str = "", ligne: str = "", metadata_cols: list[str] = [],
+    solver: AssignmentSolver = AssignmentSolver.dense
+) -> None:
+    """Crée et sauvegarde les mesures de qualité de service de ponctualité et de régularité pour une date.
+
+    Les données d'offre réalisée ne sont lues et préparées (suppression des arrêts sans heure réelle, des heures
+    théoriques dupliquées, ajout de la fréquence) qu'une seule fois. Les données préparées sont regroupées par arrêt
+    pour la ponctualité et utilisées telles quelles pour la régularité, calculée sur toute la journée à la fois. Les
+    fichiers produits sont identiques à ceux de create_mesure_qs_ponctualite et create_mesure_qs_regularite.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    date : date
+        Date pour laquelle les mesures de qualité de service doivent être calculées.
+    dsp : str
+        DSP pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    ligne : str
+        Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    metadata_cols: list[str]
+        Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique en ponctualité, par défaut AssignmentSolver.dense.
+    """
+
+    logger.info(f'Process: {date.strftime("%Y-%m-%d")}')
+
+    metrics = get_metrics()
+    try:
+        with metrics.timer(MetricName.read):
+            df_offre_realisee = file_system_handler.get_daily_offre_realisee(date=date, dsp=dsp, ligne=ligne)
+    except FileNotFoundError:
+        logger.info(f'No data to process for {date.strftime("%Y-%m-%d")} with dsp: [{dsp}] and ligne: [{ligne}]')
+        return
+    metrics.count(MetricName.rows_read, len(df_offre_realisee))
+
+    # Un arrêt sans aucune heure réelle n'est pas pris en compte, il peut s'agir d'un arrêt non desservi.
+    df_offre_realisee_without_empty_stops = drop_stop_without_real_time(df_offre_realisee)
+
+    df_offre_realisee_by_stop = prepare_offre_realisee_by_stop(df_offre_realisee_without_empty_stops)
+
+    if (df_offre_realisee_without_empty_stops[InputColumns.heure_theorique].isna().all() or
+            df_offre_realisee_without_empty_stops[InputColumns.sens].isna().any() or
+            df_offre_realisee_without_empty_stops[InputColumns.arret].isna().any()):
+        with metrics.timer(MetricName.write):
+            file_system_handler.save_error_mesure_qs(
+                df_mesure_qs=df_offre_realisee, date=date, mesure_type=MesureType.ponctualite, dsp=dsp, ligne=ligne)
+    else:
+        df_stat_ponctualite = compute_ponctualite_stat_from_stops(
+            stops=group_prepared_offre_realisee_by_stop(df_offre_realisee_by_stop), metadata_cols=metadata_cols,
+            solver=solver)
+        with metrics.timer(MetricName.write):
+            file_system_handler.save_daily_mesure_qs(
+                df_mesure_qs=df_stat_ponctualite, date=date, dsp=dsp, mesure_type=MesureType.ponctualite
+            )
+
+    df_stat_regularite = compute_regularite_stat_from_prepared_dataframe(
+        df_offre_realisee_by_stop=df_offre_realisee_by_stop, metadata_cols=metadata_cols)
+
+    # Si le dataframe ne contient pas suffisament de données pour calculer de la régulartié, on ne sauvegarde rien
+    if df_stat_regularite.empty:
+        logger.info(f'No data to save on regularity for {date.strftime("%Y-%m-%d")}, for dsp {dsp} and ligne {ligne}')
+        return
+
+    with metrics.timer(MetricName.write):
+        file_system_handler.save_daily_mesure_qs(
+            df_mesure_qs=df_stat_regularite, date=date, dsp=dsp, mesure_type=MesureType.regularite
+        )
+
+
+def create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler: FileSystemHandler,
+        date_range: tuple[date, date], dsp: str = "", ligne: str = "", metadata_cols: list[str] = [],
+        n_thread: int = NUMBER_OF_PARALLEL_PROCESS, solver: AssignmentSolver = AssignmentSolver.dense,
+        incremental: bool = False, worker_pool: Optional[WorkerPool] = None, metrics: bool = False
+) -> list[date]:
+    """Appelle la fonction create_mesure_qs_ponctualite_regularite sur une plage de date, en parallélisant les calculs.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    date_range : datetime
+        Dates de début et de fin pour laquelle les mesures de qualité de service doivent être calculées.
+    dsp : str
+        DSP pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    ligne : str
+        Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+    metadata_cols: list[str]
+        Colonnes contenant des méta informations invariables par lignes qui doivent être conservées, par défaut à [].
+    n_thread: int
+        Nombre de processus en parallèle.
+    solver : AssignmentSolver
+        Méthode de résolution de l'association réelle/théorique en ponctualité, par défaut AssignmentSolver.dense.
+    incremental : bool
+        Si True, seules les dates dont les données d'entrée, la version du code ou les paramètres ont changé depuis la
+        dernière exécution sont calculées, voir run_incremental_date_range. Par défaut à False.
+    worker_pool : Optional[WorkerPool]
+        Pool de processus partagé par toute l'exécution, par défaut un pool de n_thread processus est créé pour ces
+        seules dates.
+    metrics : bool
+        Si True, les mesures de performance de chaque journée sont sauvegardées à côté des mesures, voir
+        create_mesure_qs_by_ligne. Par défaut à False.
+
+    Returns
+    -------
+    computed_dates : list[date]
+        Dates effectivement calculées.
+    """
+    date_range_list = pd.date_range(start=date_range[0], end=date_range[1])
+
+    def compute_dates(dates: list[date]) -> None:
+        create_mesure_qs_by_ligne(
+            file_system_handler=file_system_handler, dates=dates,
+            mesure_types=[MesureType.ponctualite, MesureType.regularite],
+            create_daily_mesure_qs=create_mesure_qs_ponctualite_regularite, n_thread=n_thread, worker_pool=worker_pool,
+            dsp=dsp, ligne=ligne, metadata_cols=metadata_cols, solver=solver, metrics=metrics
+        )
+
+    return run_incremental_date_range(
+        file_system_handler=file_system_handler, dates=list(date_range_list), dsp=dsp,
+        mesure_types=[MesureType.ponctualite, MesureType.regularite],
+        parameters={'solver': solver, 'ligne': ligne, 'metadata_cols': metadata_cols},
+        compute_dates=compute_dates, incremental=incremental
+    )
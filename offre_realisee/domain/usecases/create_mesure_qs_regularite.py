@@ -1,13 +1,17 @@
 from datetime import date
-from functools import partial
+from typing import Optional
 
 import pandas as pd
-from multiprocess import Pool
 
 from offre_realisee.config.logger import logger
+from offre_realisee.config.metrics_config import MetricName
 from offre_realisee.config.offre_realisee_config import MesureType
 from offre_realisee.domain.entities.drop_stop_without_real_time import drop_stop_without_real_time
+from offre_realisee.domain.entities.metrics import get_metrics
 from offre_realisee.domain.port.file_system_handler import FileSystemHandler
+from offre_realisee.domain.usecases.run_incremental_date_range import run_incremental_date_range
+from offre_realisee.domain.usecases.create_mesure_qs_by_ligne import create_mesure_qs_by_ligne
+from offre_realisee.domain.usecases.worker_pool import WorkerPool
 from offre_realisee.domain.entities.regularite.compute_regularite_stat_from_dataframe import (
     compute_regularite_stat_from_dataframe)
 
@@ -40,11 +44,14 @@ def create_mesure_qs_regularite(
 
     logger.info(f'Process: {date.strftime("%Y-%m-%d")}')
 
+    metrics = get_metrics()
     try:
-        df_offre_realisee = file_system_handler.get_daily_offre_realisee(date=date, dsp=dsp, ligne=ligne)
+        with metrics.timer(MetricName.read):
+            df_offre_realisee = file_system_handler.get_daily_offre_realisee(date=date, dsp=dsp, ligne=ligne)
     except FileNotFoundError:
         logger.info(f'No data to process for {date.strftime("%Y-%m-%d")}, for dsp {dsp}')
         return
+    metrics.count(MetricName.rows_read, len(df_offre_realisee))
 
     # Un arrêt sans aucune heure réelle n'est pas pris en compte, il peut s'agir d'un arrêt non desservi.
     df_offre_realisee = drop_stop_without_real_time(df_offre_realisee)
@@ -57,16 +64,18 @@ def create_mesure_qs_regularite(
         logger.info(f'No data to save on regularity for {date.strftime("%Y-%m-%d")}, for dsp {dsp} and ligne {ligne}')
         return
 
-    file_system_handler.save_daily_mesure_qs(
-        df_mesure_qs=df_stat_regularite, date=date, dsp=dsp, mesure_type=MesureType.regularite
-    )
+    with metrics.timer(MetricName.write):
+        file_system_handler.save_daily_mesure_qs(
+            df_mesure_qs=df_stat_regularite, date=date, dsp=dsp, mesure_type=MesureType.regularite
+        )
 
 
 def create_mesure_qs_regularite_date_range(
         file_system_handler: FileSystemHandler,
         date_range: tuple[date, date], dsp: str = "", ligne: str = "", metadata_cols: list[str] = [],
-        n_thread: int = NUMBER_OF_PARALLEL_PROCESS
-) -> None:
+        n_thread: int = NUMBER_OF_PARALLEL_PROCESS, incremental: bool = False,
+        worker_pool: Optional[WorkerPool] = None, metrics: bool = False
+) -> list[date]:
     """Appelle la fonction create_mesure_qs_regularite sur une plage de date, en parallélisant les calculs.
 
     Parameters
@@ -81,13 +90,32 @@ def create_mesure_qs_regularite_date_range(
         Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
     n_thread: int
         Nombre de processus en parallèle.
+    incremental : bool
+        Si True, seules les dates dont les données d'entrée, la version du code ou les paramètres ont changé depuis la
+        dernière exécution sont calculées, voir run_incremental_date_range. Par défaut à False.
+    worker_pool : Optional[WorkerPool]
+        Pool de processus partagé par toute l'exécution, par défaut un pool de n_thread processus est créé pour ces
+        seules dates.
+    metrics : bool
+        Si True, les mesures de performance de chaque journée sont sauvegardées à côté des mesures, voir
+        create_mesure_qs_by_ligne. Par défaut à False.
+
+    Returns
+    -------
+    computed_dates : list[date]
+        Dates effectivement calculées.
     """
     date_range_list = pd.date_range(start=date_range[0], end=date_range[1])
 
-    create_mesure_qs_regularite_partial = partial(
-        create_mesure_qs_regularite,
-        file_system_handler=file_system_handler, dsp=dsp, ligne=ligne, metadata_cols=metadata_cols,
+    def compute_dates(dates: list[date]) -> None:
+        create_mesure_qs_by_ligne(
+            file_system_handler=file_system_handler, dates=dates, mesure_types=[MesureType.regularite],
+            create_daily_mesure_qs=create_mesure_qs_regularite, n_thread=n_thread, worker_pool=worker_pool, dsp=dsp,
+            ligne=ligne, metadata_cols=metadata_cols, metrics=metrics
+        )
+
+    return run_incremental_date_range(
+        file_system_handler=file_system_handler, dates=list(date_range_list), dsp=dsp,
+        mesure_types=[MesureType.regularite], parameters={'ligne': ligne, 'metadata_cols': metadata_cols},
+        compute_dates=compute_dates, incremental=incremental
     )
-
-    with Pool(processes=n_thread) as pool:
-        pool.map(lambda date: create_mesure_qs_regularite_partial(date=date), date_range_list)
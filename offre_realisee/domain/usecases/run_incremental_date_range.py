@@ -0,0 +1,118 @@
+from datetime import date
+from typing import Callable, Optional
+
+from offre_realisee.config.logger import logger
+from offre_realisee.config.offre_realisee_config import MesureType
+from offre_realisee.config.run_manifest_config import RunManifestEntry
+from offre_realisee.domain.entities.run_manifest import (
+    aggregation_manifest_key, build_manifest_entry, manifest_key, select_dates_to_compute)
+from offre_realisee.domain.port.file_system_handler import FileSystemHandler
+
+
+def run_incremental_date_range(
+    file_system_handler: FileSystemHandler, dates: list[date], dsp: str, mesure_types: list[MesureType],
+    parameters: dict, compute_dates: Callable[[list[date]], None], incremental: bool = False
+) -> list[date]:
+    """Calcule les mesures journalières d'une liste de dates, en ne recalculant si demandé que ce qui a changé.
+
+    En mode incrémental, les dates dont les données d'entrée, la version du code et les paramètres de calcul sont
+    identiques à ceux enregistrés dans le manifeste d'exécution, et dont les fichiers de mesure existent toujours, ne
+    sont pas recalculées. Le manifeste est mis à jour une fois toutes les dates calculées, y compris hors du mode
+    incrémental : une exécution complète remplace les mesures journalières enregistrées par les précédentes.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    dates : list[date]
+        Dates à calculer.
+    dsp : str
+        DSP pour laquelle les mesures de qualité de service doivent être calculées.
+    mesure_types : list[MesureType]
+        Types de mesure calculés.
+    parameters : dict
+        Paramètres de calcul ayant une influence sur les mesures, voir build_manifest_entry.
+    compute_dates : Callable[[list[date]], None]
+        Fonction calculant et sauvegardant les mesures journalières d'une liste de dates.
+    incremental : bool
+        Si True, seules les dates ayant changé depuis la dernière exécution sont calculées, par défaut à False.
+
+    Returns
+    -------
+    computed_dates : list[date]
+        Dates effectivement calculées.
+    """
+    manifest = file_system_handler.get_run_manifest()
+    entry_by_date = {
+        date_to_compute: build_manifest_entry(
+            input_fingerprint=file_system_handler.get_daily_offre_realisee_fingerprint(date=date_to_compute),
+            parameters=parameters)
+        for date_to_compute in dates
+    }
+
+    if incremental:
+        dates_to_compute = select_dates_to_compute(
+            manifest, entry_by_date, dsp=dsp, mesure_types=mesure_types,
+            has_output=lambda date_to_check, mesure_type: file_system_handler.has_daily_mesure_qs(
+                date=date_to_check, dsp=dsp, mesure_type=mesure_type))
+        logger.info(f"Incremental run: {len(dates_to_compute)} dates to compute, "
+                    f"{len(dates) - len(dates_to_compute)} unchanged dates skipped")
+    else:
+        dates_to_compute = dates
+
+    if dates_to_compute:
+        compute_dates(dates_to_compute)
+
+    # Une journée sans données ne produit pas de fichier de mesure, elle n'est pas recalculée pour autant
+    for date_computed in dates_to_compute:
+        for mesure_type in mesure_types:
+            manifest[manifest_key(date_computed, dsp, mesure_type)] = {
+                **entry_by_date[date_computed],
+                RunManifestEntry.has_output: file_system_handler.has_daily_mesure_qs(
+                    date=date_computed, dsp=dsp, mesure_type=mesure_type),
+            }
+    file_system_handler.save_run_manifest(manifest)
+
+    return dates_to_compute
+
+
+def run_incremental_aggregation(
+    file_system_handler: FileSystemHandler, dsp: str, mesure_type: MesureType, entry: dict,
+    aggregate: Callable[[Optional[list[date]]], None], updated_dates: Optional[list[date]] = None
+) -> None:
+    """Agrège les mesures journalières d'un type de mesure, en ne mettant à jour si demandé que ce qui a changé.
+
+    En mode incrémental, les agrégations sont mises à jour à partir de leurs sommes partielles : un changement des
+    jours d'une agrégation (plage de dates glissante, période d'été, journées exceptionnelles) ne retire ou n'ajoute
+    que la contribution des jours concernés, voir update_partial_sums_by_suffix. Si l'entrée des agrégations diffère
+    de celle enregistrée dans le manifeste d'exécution (niveaux d'agrégation ou version du code), ou s'il n'y en a
+    pas, les sommes partielles sont supprimées puis reconstruites en lisant chaque mesure journalière une seule fois.
+    Le manifeste est mis à jour une fois les agrégations sauvegardées.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    dsp : str
+        DSP à agréger.
+    mesure_type : MesureType
+        Type de mesure à agréger.
+    entry : dict
+        Entrée du manifeste des agrégations pour l'exécution courante, voir build_aggregation_manifest_entry.
+    aggregate : Callable[[Optional[list[date]]], None]
+        Fonction calculant et sauvegardant les agrégations, seules celles contenant les dates fournies si elles sont
+        spécifiées, voir aggregate_mesure_qs_by_levels.
+    updated_dates : Optional[list[date]]
+        Dates recalculées en mode incrémental, par défaut toutes les agrégations sont calculées.
+    """
+    key = aggregation_manifest_key(dsp, mesure_type)
+    if updated_dates is not None and file_system_handler.get_run_manifest().get(key) != entry:
+        logger.info(f"Aggregation code or levels changed, rebuilding all {mesure_type} partial sums")
+        file_system_handler.delete_partial_sums(dsp=dsp, mesure_type=mesure_type)
+        updated_dates = []
+
+    aggregate(updated_dates)
+
+    manifest = file_system_handler.get_run_manifest()
+    manifest[key] = entry
+    file_system_handler.save_run_manifest(manifest)
@@ -0,0 +1,270 @@
+import queue
+from typing import Any, Callable, ContextManager, Optional
+
+from multiprocess import Pool
+
+from offre_realisee.config.logger import logger
+from offre_realisee.domain.port.file_system_handler import FileSystemHandler
+from offre_realisee.domain.port.process_memory_handler import ProcessMemoryHandler
+
+
+# Nom du profil des tâches sans argument date, voir l'argument task_profiler de WorkerPool
+NO_DATE_PROFILE_LABEL = "no_date"
+
+# Estimation de la mémoire d'une tâche par passage traité, tant qu'aucune tâche suffisamment grande n'a été mesurée
+DEFAULT_BYTES_PER_ROW = 4096
+# Les tâches plus petites sont dominées par la mémoire fixe du processus et ne servent pas à l'estimation
+MIN_ROWS_FOR_BYTES_PER_ROW = 10_000
+
+# Gestionnaire du système de fichiers de chaque processus du pool, transmis une seule fois à son démarrage
+_worker_file_system_handler: Optional[FileSystemHandler] = None
+_worker_task_profiler: Optional[Callable[[str], ContextManager[None]]] = None
+_worker_process_memory_handler: Optional[ProcessMemoryHandler] = None
+_worker_start_rss: int = 0
+
+
+def _init_worker(
+    file_system_handler: FileSystemHandler, task_profiler: Optional[Callable[[str], ContextManager[None]]] = None,
+    process_memory_handler: Optional[ProcessMemoryHandler] = None
+) -> None:
+    global _worker_file_system_handler, _worker_task_profiler, _worker_process_memory_handler, _worker_start_rss
+    _worker_file_system_handler = file_system_handler
+    _worker_task_profiler = task_profiler
+    _worker_process_memory_handler = process_memory_handler
+    if process_memory_handler is not None:
+        _worker_start_rss, _ = process_memory_handler.get_rss()
+
+
+def _run_task(task: tuple[Callable[..., Any], dict]) -> tuple[Any, Optional[int]]:
+    function, kwargs = task
+    label = kwargs['date'].strftime('%Y_%m_%d') if 'date' in kwargs else NO_DATE_PROFILE_LABEL
+
+    # Sans remise à zéro, le pic serait celui de toutes les tâches précédentes du processus : il n'est pas mesuré
+    is_peak_rss_reset = _worker_process_memory_handler is not None and _worker_process_memory_handler.reset_peak_rss()
+
+    if _worker_task_profiler is None:
+        result = function(file_system_handler=_worker_file_system_handler, **kwargs)
+    else:
+        with _worker_task_profiler(label):
+            result = function(file_system_handler=_worker_file_system_handler, **kwargs)
+
+    if not is_peak_rss_reset:
+        return result, None
+
+    # La mémoire libérée par les tâches précédentes et conservée par le processus est comptée : c'est la mémoire
+    # effectivement occupée par le processus pendant la tâche
+    _, peak_rss = _worker_process_memory_handler.get_rss()
+    task_memory = max(peak_rss - _worker_start_rss, 0)
+    ligne = kwargs.get('ligne')
+    logger.info(f"Task {label}{f' - ligne {ligne}' if ligne else ''}: peak RSS {peak_rss / 1024 ** 2:.0f} MB "
+                f"({task_memory / 1024 ** 2:.0f} MB above process start)")
+    return result, task_memory
+
+
+def _run_indexed_task(
+    indexed_task: tuple[int, tuple[Callable[..., Any], dict]]
+) -> tuple[int, tuple[Any, Optional[int]]]:
+    position, task = indexed_task
+    return position, _run_task(task)
+
+
+class WorkerPool:
+    """Pool de processus conservé pendant toute une exécution, pour le calcul des mesures journalières.
+
+    Les processus ne sont démarrés qu'à la première tâche, puis réutilisés par toutes les tâches suivantes, quels que
+    soient le type de mesure et la plage de dates. Le gestionnaire du système de fichiers n'est transmis qu'une fois à
+    chaque processus : les données qu'il conserve (dataset d'offre réalisée découvert, par exemple) restent disponibles
+    d'une tâche à l'autre.
+
+    Parameters
+    ----------
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers utilisé par toutes les tâches.
+    n_thread : int
+        Nombre de processus en parallèle.
+    task_profiler : Optional[Callable[[str], ContextManager[None]]]
+        Si renseigné, chaque tâche est exécutée dans son processus sous task_profiler(label), label étant la date de la
+        tâche (argument date, AAAA_MM_JJ) ou NO_DATE_PROFILE_LABEL, par exemple partial(profile_block, profile_path).
+        Par défaut à None, sans profilage.
+    memory_budget : Optional[int]
+        Mémoire totale, en octets, que les tâches en cours peuvent utiliser ensemble. Si renseigné, les tâches dont le
+        nombre de passages est connu (argument costs de map) ne sont lancées que si leur estimation (nombre de passages
+        multiplié par bytes_per_row) tient dans le budget restant, sans dépasser n_thread tâches en parallèle. Par
+        défaut à None, n_thread tâches sont toujours en cours.
+    process_memory_handler : Optional[ProcessMemoryHandler]
+        Gestionnaire de la mémoire des processus, utilisé pour mesurer le pic de mémoire résidente de chaque tâche.
+        Par défaut à None, la mémoire des tâches n'est pas mesurée.
+
+    Le pic de mémoire résidente de chaque tâche est journalisé, s'il a pu être remis à zéro au début de la tâche (voir
+    ProcessMemoryHandler.reset_peak_rss). Avec memory_budget, la plus grande mémoire par passage mesurée sur les
+    tâches d'au moins MIN_ROWS_FOR_BYTES_PER_ROW passages d'un même type (argument task_kind de map) devient
+    l'estimation de ce type, DEFAULT_BYTES_PER_ROW avant la première mesure, voir bytes_per_row.
+    """
+
+    def __init__(self, file_system_handler: FileSystemHandler, n_thread: int,
+                 task_profiler: Optional[Callable[[str], ContextManager[None]]] = None,
+                 memory_budget: Optional[int] = None, process_memory_handler: Optional[ProcessMemoryHandler] = None):
+        self.file_system_handler = file_system_handler
+        self.n_thread = n_thread
+        self.task_profiler = task_profiler
+        self.memory_budget = memory_budget
+        self.process_memory_handler = process_memory_handler
+        self.measured_bytes_per_row: dict[str, float] = {}
+        self._pool = None
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, exc_type, *_) -> None:
+        self.close(terminate=exc_type is not None)
+
+    def bytes_per_row(self, task_kind: str = "") -> float:
+        """Estimation de la mémoire utilisée par une tâche pour chaque passage traité, en octets.
+
+        Parameters
+        ----------
+        task_kind : str
+            Type des tâches, voir map.
+
+        Returns
+        -------
+        bytes_per_row : float
+            Plus grande mémoire par passage mesurée pour ce type de tâche, DEFAULT_BYTES_PER_ROW sans mesure.
+        """
+        return self.measured_bytes_per_row.get(task_kind, DEFAULT_BYTES_PER_ROW)
+
+    def map(
+        self, function: Callable[..., Any], tasks: list[dict], costs: Optional[list[int]] = None, task_kind: str = "",
+        on_result: Optional[Callable[[int, Any], None]] = None
+    ) -> list[Any]:
+        """Exécute function(file_system_handler=..., **task) pour chaque tâche, depuis une file unique.
+
+        Parameters
+        ----------
+        function : Callable[..., Any]
+            Fonction à exécuter, qui reçoit le gestionnaire du système de fichiers en argument file_system_handler.
+        tasks : list[dict]
+            Arguments de chaque tâche.
+        costs : Optional[list[int]]
+            Nombre estimé de passages traités par chaque tâche, utilisé avec memory_budget. Par défaut à None.
+        task_kind : str
+            Type des tâches : la mémoire par passage est mesurée séparément pour chaque type, par défaut à "".
+        on_result : Optional[Callable[[int, Any], None]]
+            Fonction appelée dans le processus principal avec la position et le résultat de chaque tâche, dès la fin
+            de la tâche, par exemple pour libérer les données qu'elle seule utilisait. Par défaut à None.
+
+        Returns
+        -------
+        results : list[Any]
+            Résultat de chaque tâche, dans l'ordre des tâches.
+        """
+        if not tasks:
+            return []
+
+        if self._pool is None:
+            logger.info(f"Starting a pool of {self.n_thread} processes")
+            self._pool = Pool(
+                processes=self.n_thread, initializer=_init_worker,
+                initargs=(self.file_system_handler, self.task_profiler, self.process_memory_handler))
+
+        if self.memory_budget is None or costs is None:
+            # Une tâche par envoi : les processus libres prennent la tâche suivante de la file
+            results: list[Optional[tuple[Any, Optional[int]]]] = [None] * len(tasks)
+            for position, result in self._pool.imap_unordered(
+                    _run_indexed_task, [(position, (function, task)) for position, task in enumerate(tasks)],
+                    chunksize=1):
+                results[position] = result
+                if on_result is not None:
+                    on_result(position, result[0])
+        else:
+            results = self._map_with_memory_budget(function, tasks, costs, task_kind, on_result)
+        return [result for result, _ in results]
+
+    def _map_with_memory_budget(
+        self, function: Callable[..., Any], tasks: list[dict], costs: list[int], task_kind: str,
+        on_result: Optional[Callable[[int, Any], None]]
+    ) -> list[tuple[Any, Optional[int]]]:
+        # Les tâches sont lancées dans l'ordre, une tâche plus petite qui tient dans le budget restant peut passer
+        # devant une tâche qui n'y tient pas encore. Une tâche seule est toujours lancée, même au-delà du budget.
+        logger.info(f"Scheduling {len(tasks)} tasks within a memory budget of {self.memory_budget / 1024 ** 2:.0f} MB "
+                    f"({self.bytes_per_row(task_kind):.0f} bytes per row)")
+        results: list[Optional[tuple[Any, Optional[int]]]] = [None] * len(tasks)
+        pending = list(range(len(tasks)))
+        running: dict[int, float] = {}
+        finished = queue.Queue()
+
+        while pending or running:
+            for position in list(pending):
+                if len(running) >= self.n_thread:
+                    break
+                memory = costs[position] * self.bytes_per_row(task_kind)
+                if running and sum(running.values()) + memory > self.memory_budget:
+                    continue
+                pending.remove(position)
+                running[position] = memory
+                self._pool.apply_async(
+                    _run_task, ((function, tasks[position]),),
+                    callback=lambda result, position=position: finished.put((position, result, None)),
+                    error_callback=lambda error, position=position: finished.put((position, None, error)))
+
+            position, result, error = finished.get()
+            if error is not None:
+                raise error
+            del running[position]
+            results[position] = result
+            if on_result is not None:
+                on_result(position, result[0])
+
+            # L'estimation est affinée dès la fin de chaque tâche, pour les tâches suivantes
+            if result[1] is not None and costs[position] >= MIN_ROWS_FOR_BYTES_PER_ROW:
+                self.measured_bytes_per_row[task_kind] = max(
+                    self.measured_bytes_per_row.get(task_kind, 0), result[1] / costs[position])
+
+        return results
+
+    def close(self, terminate: bool = False) -> None:
+        """Arrête les processus du pool.
+
+        Parameters
+        ----------
+        terminate : bool
+            Si True, les processus sont arrêtés sans attendre la fin des tâches en cours, par défaut à False.
+        """
+        if self._pool is None:
+            return
+
+        if terminate:
+            self._pool.terminate()
+        else:
+            self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+
+def run_tasks(
+    function: Callable[..., None], tasks: list[dict], file_system_handler: FileSystemHandler, n_thread: int,
+    worker_pool: Optional[WorkerPool] = None
+) -> None:
+    """Exécute les tâches dans le pool fourni, ou à défaut dans un pool créé pour ces seules tâches.
+
+    Parameters
+    ----------
+    function : Callable[..., None]
+        Fonction à exécuter, voir WorkerPool.map.
+    tasks : list[dict]
+        Arguments de chaque tâche.
+    file_system_handler : FileSystemHandler
+        Gestionnaire du système de fichiers.
+    n_thread : int
+        Nombre de processus en parallèle, si aucun pool n'est fourni.
+    worker_pool : Optional[WorkerPool]
+        Pool de processus à utiliser, par défaut un pool est créé pour ces tâches.
+    """
+    if worker_pool is None:
+        with WorkerPool(file_system_handler=file_system_handler, n_thread=n_thread) as task_worker_pool:
+            task_worker_pool.map(function, tasks)
+        return
+
+    if worker_pool.file_system_handler is not file_system_handler:
+        raise ValueError("The worker pool must use the same file system handler as the tasks")
+    worker_pool.map(function, tasks)
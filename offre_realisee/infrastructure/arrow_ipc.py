@@ -0,0 +1,50 @@
+import os
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+
+def write_arrow_ipc_file(table: pa.Table, file_path: str) -> None:
+    """Écrit une table Arrow dans un fichier IPC (Feather v2) non compressé.
+
+    Le fichier est écrit dans un fichier temporaire propre au processus puis renommé, un lecteur ne voit donc jamais un
+    fichier incomplet.
+
+    Parameters
+    ----------
+    table : Table
+        Table Arrow à écrire.
+    file_path : str
+        Chemin du fichier à écrire.
+    """
+    temporary_file_path = f"{file_path}.{os.getpid()}.tmp"
+    with pa.OSFile(temporary_file_path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary_file_path, file_path)
+
+
+def read_arrow_ipc_file(file_path: str, offset: int = 0, length: Optional[int] = None) -> pa.Table:
+    """Lit une table Arrow depuis un fichier IPC non compressé, projeté en mémoire (memory map).
+
+    Les colonnes de la table référencent directement les pages du fichier : plusieurs processus qui lisent le même
+    fichier partagent le cache de pages du système, sans copie ni décodage.
+
+    Parameters
+    ----------
+    file_path : str
+        Chemin du fichier IPC.
+    offset : int
+        Première ligne à lire, par défaut à 0.
+    length : Optional[int]
+        Nombre de lignes à lire, par défaut toutes les lignes à partir de offset.
+
+    Returns
+    -------
+    table : Table
+        Table Arrow lue.
+    """
+    with pa.memory_map(file_path, "r") as source:
+        table = ipc.open_file(source).read_all()
+    return table.slice(offset, length)
@@ -1,48 +1,166 @@
+import json
 import os
+import shutil
+import tempfile
+import uuid
 from datetime import date
+from typing import Optional
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 
 from offre_realisee.config.file_extensions import FileExtensions
 from offre_realisee.config.calendrier_scolaire_config import PARQUET_ENGINE, PARQUET_COMPRESSION
-from offre_realisee.config.offre_realisee_config import MesureType
+from offre_realisee.config.offre_realisee_config import MesureType, OutputFormat
 from offre_realisee.config.aggregation_config import AggregationLevel
 from offre_realisee.domain.port.calendrier_scolaire_file_system_handler import CalendrierScolaireFileSystemHandler
+from offre_realisee.domain.entities.offre_realisee_table_to_pandas import offre_realisee_table_to_pandas
 from offre_realisee.domain.port.file_system_handler import FileSystemHandler
+from offre_realisee.infrastructure.arrow_ipc import read_arrow_ipc_file, write_arrow_ipc_file
+from offre_realisee.infrastructure.offre_realisee_dataset import OffreRealiseeDataset
+from offre_realisee.infrastructure.offre_realisee_day_cache import OffreRealiseeDayCache, DAY_CACHE_MAX_SIZE
 
 from offre_realisee.config.input_config import InputColumns
 from offre_realisee.config.offre_realisee_config import MESURE_TYPE
 
 from offre_realisee.config.logger import logger
 
+DAILY_OFFRE_REALISEE_COLUMNS = [
+    InputColumns.ligne, InputColumns.arret, InputColumns.sens, InputColumns.heure_theorique,
+    InputColumns.heure_reelle, InputColumns.is_terminus
+]
+
+# Au format parquet, les mesures journalières d'un type de mesure forment un dataset partitionné par jour
+MESURE_QS_PARTITION_COLUMN = InputColumns.jour
+MESURE_QS_PARTITIONING = ds.partitioning(pa.schema([(MESURE_QS_PARTITION_COLUMN, pa.string())]), flavor="hive")
+
+# Les fichiers dont le nom commence par "_" sont ignorés lors de la lecture d'un dataset parquet
+ERROR_MESURE_QS_FOLDER = "_error"
+
+RUN_MANIFEST_FILE_NAME = "run_manifest"
+
+# Le stockage des sommes partielles d'agrégation est propre à chaque format de sortie
+PARTIAL_SUMS_FOLDER = "_partial_sums"
+
+# Les mesures de performance sont écrites à côté des mesures QS, dans un dossier ignoré par la lecture des datasets
+METRICS_FOLDER = "_metrics"
+
+# Les tables partagées entre processus sont écrites en mémoire (tmpfs) lorsque le système le permet
+SHARED_MEMORY_PATH = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_OFFRE_REALISEE_PREFIX = "offre_realisee_"
+
 
 class LocalFileSystemHandler(FileSystemHandler, CalendrierScolaireFileSystemHandler):
 
     def __init__(self, data_path: str, input_path: str, output_path: str, input_file_name: str,
-                 calendrier_scolaire_file_name: str):
+                 calendrier_scolaire_file_name: str, output_format: str = OutputFormat.csv,
+                 shared_memory_path: str = SHARED_MEMORY_PATH, day_cache_path: Optional[str] = None,
+                 day_cache_max_size: int = DAY_CACHE_MAX_SIZE):
         self.data_path = data_path
         self.input_path = input_path
         self.output_path = output_path
         self.input_file_name = input_file_name
         self.calendrier_scolaire_file_name = calendrier_scolaire_file_name
+        self.output_format = output_format
+        self.shared_memory_path = shared_memory_path
+        self.day_cache = None if day_cache_path is None else OffreRealiseeDayCache(
+            cache_path=day_cache_path, max_size=day_cache_max_size)
+        self._offre_realisee_dataset: Optional[OffreRealiseeDataset] = None
+
+    @property
+    def output_file_extension(self) -> str:
+        """Extension des fichiers de mesure QS, selon le format de sortie."""
+        return FileExtensions.parquet if self.output_format == OutputFormat.parquet else FileExtensions.csv
+
+    def _write_mesure_qs(self, df_mesure_qs: pd.DataFrame, file_path: str) -> None:
+        """Écrit un DataFrame de mesure QS au format de sortie.
 
-    def read_offre_realisee(self, **kwargs) -> pd.DataFrame:
-        """Récupération des données d'offre réalisée.
+        Au format parquet, l'index n'est pas conservé et la colonne LIGNE est encodée en dictionnaire.
 
         Parameters
         ----------
-        `**kwargs` :
-            Keyword arguments supplémentaires passés à la fonction pandas read_parquet.
+        df_mesure_qs : DataFrame
+            DataFrame que nous voulons sauvegarder.
+        file_path : str
+            Chemin du fichier à écrire.
+        """
+        logger.info(f"Writing a dataframe of shape {df_mesure_qs.shape} in {file_path}")
+
+        if self.output_format == OutputFormat.parquet:
+            if InputColumns.ligne in df_mesure_qs.columns:
+                df_mesure_qs = df_mesure_qs.astype({InputColumns.ligne: "category"})
+            df_mesure_qs.to_parquet(file_path, engine=PARQUET_ENGINE, compression=PARQUET_COMPRESSION, index=False)
+        else:
+            df_mesure_qs.to_csv(file_path)
+
+    def _daily_mesure_qs_folder(self, dsp: str, mesure_type: MesureType) -> str:
+        return os.path.join(self.data_path, self.output_path, dsp, mesure_type)
+
+    def _daily_mesure_qs_file_path(self, date: date, dsp: str, mesure_type: MesureType) -> str:
+        folder_path = self._daily_mesure_qs_folder(dsp=dsp, mesure_type=mesure_type)
+        if self.output_format == OutputFormat.parquet:
+            folder_path = os.path.join(folder_path, f"{MESURE_QS_PARTITION_COLUMN}={date.strftime('%Y-%m-%d')}")
+
+        return os.path.join(
+            folder_path, f"mesure_{mesure_type}_{date.strftime('%Y_%m_%d')}" + self.output_file_extension)
+
+    def get_offre_realisee_dataset(self, date: date) -> OffreRealiseeDataset:
+        """Dataset d'offre réalisée, conservé par le gestionnaire pendant toute l'exécution.
+
+        Le dataset n'est redécouvert que si la partition du jour demandé a changé depuis sa découverte, voir
+        OffreRealiseeDataset.is_up_to_date : seul le dossier de cette partition est consulté à chaque appel.
+
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée qui vont être lues.
 
         Returns
         -------
-        df : DataFrame
-            DataFrame d'offre réalisée.
+        dataset : OffreRealiseeDataset
+            Dataset d'offre réalisée.
         """
-        file_path = os.path.join(self.data_path, self.input_path, self.input_file_name)
+        if self._offre_realisee_dataset is None or not self._offre_realisee_dataset.is_up_to_date(date=date):
+            file_path = os.path.join(self.data_path, self.input_path, self.input_file_name)
+            logger.info(f"Discovering input dataset: {file_path}")
+            self._offre_realisee_dataset = OffreRealiseeDataset(file_path)
+        return self._offre_realisee_dataset
 
-        logger.info(f"Reading input data from: {file_path}")
-        return pd.read_parquet(file_path, **kwargs)
+    def get_daily_offre_realisee_table(self, date: date, dsp: str = "", ligne: str = "") -> pa.Table:
+        """Récupération des données d'offre réalisée pour une date, sous forme de table Arrow.
+
+        Si un cache journalier est configuré (day_cache_path), la table est lue depuis le cache lorsque les fichiers
+        d'entrée du jour n'ont pas changé, et y est écrite sinon, voir OffreRealiseeDayCache.
+
+        Parameters
+        ----------
+        date : date
+            Date pour laquelle nous voulons les données d'offre théorique.
+        dsp : str
+            DSP pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+        ligne : str
+            Ligne pour laquelle les mesures de qualité de service doivent être calculées, par défaut à "".
+
+        Returns
+        -------
+        table_offre_realisee : Table
+            Table Arrow d'offre réalisée.
+        """
+        if self.day_cache is None:
+            return self.get_offre_realisee_dataset(date=date).get_daily_table(
+                date=date, columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp=dsp, ligne=ligne
+            )
+
+        cache_key = {'date': date, 'columns': DAILY_OFFRE_REALISEE_COLUMNS, 'dsp': dsp, 'ligne': ligne,
+                     'fingerprint': self.get_daily_offre_realisee_fingerprint(date=date)}
+        table_offre_realisee = self.day_cache.get(**cache_key)
+        if table_offre_realisee is None:
+            table_offre_realisee = self.get_offre_realisee_dataset(date=date).get_daily_table(
+                date=date, columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp=dsp, ligne=ligne
+            )
+            self.day_cache.put(table_offre_realisee, **cache_key)
+        return table_offre_realisee
 
     def get_daily_offre_realisee(self, date: date, dsp: str = "", ligne: str = "") -> pd.DataFrame:
         """Récupération des données d'offre réalisée pour une date.
@@ -61,25 +179,144 @@ class LocalFileSystemHandler(FileSystemHandler, CalendrierScolaireFileSystemHand
         df_offre_realisee : DataFrame
             DataFrame d'offre réalisée.
         """
-        filters = [[(InputColumns.jour, 'in', {date.strftime("%Y-%m-%d")})]]
-        if dsp:
-            filters[0].append((InputColumns.dsp, 'in', dsp))
-        if ligne:
-            filters[0].append((InputColumns.ligne, 'in', ligne))
-        df_offre_realisee = self.read_offre_realisee(
-            columns=[InputColumns.ligne, InputColumns.arret,
-                     InputColumns.sens, InputColumns.heure_theorique,
-                     InputColumns.heure_reelle, InputColumns.is_terminus],
-            filters=filters
-        )
+        return offre_realisee_table_to_pandas(self.get_daily_offre_realisee_table(date=date, dsp=dsp, ligne=ligne))
+
+    def get_daily_offre_realisee_fingerprint(self, date: date) -> str:
+        """Empreinte des données d'offre réalisée d'une date, voir OffreRealiseeDataset.get_daily_fingerprint.
 
-        return df_offre_realisee
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée.
+
+        Returns
+        -------
+        fingerprint : str
+            Empreinte des données d'offre réalisée du jour.
+        """
+        return self.get_offre_realisee_dataset(date=date).get_daily_fingerprint(date=date)
+
+    def get_daily_offre_realisee_row_count(self, date: date) -> int:
+        """Nombre de passages d'une date, voir OffreRealiseeDataset.get_daily_row_count.
+
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée.
+
+        Returns
+        -------
+        row_count : int
+            Nombre de passages du jour, avant filtrage par DSP ou par ligne.
+        """
+        return self.get_offre_realisee_dataset(date=date).get_daily_row_count(date=date)
+
+    def new_shared_offre_realisee(self) -> str:
+        """Réserve le chemin d'un nouveau fichier partagé du dossier shared_memory_path, sans le créer.
+
+        Returns
+        -------
+        shared_offre_realisee : str
+            Chemin du fichier à partager, voir share_offre_realisee.
+        """
+        return os.path.join(
+            self.shared_memory_path, SHARED_OFFRE_REALISEE_PREFIX + uuid.uuid4().hex + FileExtensions.arrow)
+
+    def share_offre_realisee(self, table: pa.Table, shared_offre_realisee: str) -> None:
+        """Partage une table d'offre réalisée avec les processus de calcul, sans copie à la lecture.
+
+        La table est écrite dans un fichier Arrow IPC non compressé du dossier shared_memory_path (en mémoire par
+        défaut, voir SHARED_MEMORY_PATH). Les processus le projettent en mémoire et lisent leurs lignes sans les
+        décoder ni les copier.
+
+        Parameters
+        ----------
+        table : Table
+            Table Arrow d'offre réalisée à partager.
+        shared_offre_realisee : str
+            Chemin du fichier partagé, voir new_shared_offre_realisee.
+        """
+        write_arrow_ipc_file(table, shared_offre_realisee)
+
+    def get_shared_offre_realisee(
+        self, shared_offre_realisee: str, offset: int = 0, length: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Récupération d'une tranche de lignes d'une table d'offre réalisée partagée.
+
+        Parameters
+        ----------
+        shared_offre_realisee : str
+            Chemin du fichier partagé, voir share_offre_realisee.
+        offset : int
+            Première ligne à lire, par défaut à 0.
+        length : Optional[int]
+            Nombre de lignes à lire, par défaut toutes les lignes à partir de offset.
+
+        Returns
+        -------
+        df_offre_realisee : DataFrame
+            DataFrame d'offre réalisée.
+        """
+        return offre_realisee_table_to_pandas(
+            read_arrow_ipc_file(shared_offre_realisee, offset=offset, length=length))
+
+    def release_shared_offre_realisee(self, shared_offre_realisee: str) -> None:
+        """Supprime le fichier d'une table d'offre réalisée partagée.
+
+        Parameters
+        ----------
+        shared_offre_realisee : str
+            Chemin du fichier partagé, voir share_offre_realisee.
+        """
+        if os.path.exists(shared_offre_realisee):
+            os.remove(shared_offre_realisee)
+
+    @property
+    def run_manifest_file_path(self) -> str:
+        """Chemin du manifeste d'exécution, propre au format de sortie."""
+        return os.path.join(
+            self.data_path, self.output_path, f"{RUN_MANIFEST_FILE_NAME}_{self.output_format}" + FileExtensions.json)
+
+    def get_run_manifest(self) -> dict:
+        """Récupération du manifeste d'exécution.
+
+        Returns
+        -------
+        manifest : dict
+            Manifeste d'exécution, vide s'il n'existe pas encore.
+        """
+        if not os.path.exists(self.run_manifest_file_path):
+            return {}
+
+        logger.info(f"Reading run manifest from: {self.run_manifest_file_path}")
+        with open(self.run_manifest_file_path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def save_run_manifest(self, manifest: dict) -> None:
+        """Sauvegarde du manifeste d'exécution.
+
+        Le manifeste est écrit dans un fichier temporaire puis renommé, pour ne jamais laisser de manifeste partiel.
+
+        Parameters
+        ----------
+        manifest : dict
+            Manifeste d'exécution.
+        """
+        os.makedirs(os.path.dirname(self.run_manifest_file_path), exist_ok=True)
+
+        logger.info(f"Writing run manifest with {len(manifest)} entries in {self.run_manifest_file_path}")
+        temporary_file_path = self.run_manifest_file_path + ".tmp"
+        with open(temporary_file_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(temporary_file_path, self.run_manifest_file_path)
 
     def save_daily_mesure_qs(
         self, df_mesure_qs: pd.DataFrame, date: date, dsp: str, mesure_type: MesureType
     ) -> None:
         """Sauvegarde du DataFrame de mesure de Qualité de Service (QS).
 
+        Au format parquet, le fichier est écrit dans la partition JOUR=AAAA-MM-JJ du dataset du type de mesure.
+
         Parameters
         ----------
         df_mesure_qs : DataFrame
@@ -93,14 +330,32 @@ class LocalFileSystemHandler(FileSystemHandler, CalendrierScolaireFileSystemHand
         """
         mesure_qs = MESURE_TYPE[mesure_type]
 
-        folder_path = os.path.join(self.data_path, self.output_path, dsp, mesure_type)
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path, exist_ok=True)
+        file_path = self._daily_mesure_qs_file_path(date=date, dsp=dsp, mesure_type=mesure_type)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-        file_path = os.path.join(folder_path, f"mesure_{mesure_type}_{date.strftime('%Y_%m_%d')}" + FileExtensions.csv)
+        self._write_mesure_qs(df_mesure_qs[mesure_qs.column_order], file_path)
 
-        logger.info(f"Writing a dataframe of shape {df_mesure_qs.shape} in {file_path}")
-        df_mesure_qs[mesure_qs.column_order].to_csv(file_path)
+    def save_daily_metrics(self, metrics: dict, date: date, dsp: str) -> None:
+        """Sauvegarde des mesures de performance du calcul des mesures QS d'une journée.
+
+        Les mesures sont ajoutées sur une nouvelle ligne du fichier output/<dsp>/_metrics/metrics_AAAA_MM_JJ.jsonl.
+
+        Parameters
+        ----------
+        metrics : dict
+            Mesures de performance de la journée.
+        date : date
+            Date des données de mesure QS.
+        dsp : str
+            DSP des données de mesure QS.
+        """
+        file_path = os.path.join(
+            self.data_path, self.output_path, dsp, METRICS_FOLDER,
+            f"metrics_{date.strftime('%Y_%m_%d')}" + FileExtensions.jsonl)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        with open(file_path, "a", encoding="utf-8") as metrics_file:
+            metrics_file.write(json.dumps(metrics, sort_keys=True) + "\n")
 
     def save_mesure_qs_by_aggregation(
             self, df_mesure_qs: pd.DataFrame, suffix: str,
@@ -138,28 +393,29 @@ class LocalFileSystemHandler(FileSystemHandler, CalendrierScolaireFileSystemHand
         if not os.path.exists(folder_path):
             os.makedirs(folder_path, exist_ok=True)
 
-        file_path = os.path.join(folder_path, f"mesure_{mesure_type}_{suffix}" + FileExtensions.csv)
+        file_path = os.path.join(folder_path, f"mesure_{mesure_type}_{suffix}" + self.output_file_extension)
 
-        logger.info(f"Writing a dataframe of shape {df_mesure_qs.shape} in {file_path}")
-        df_mesure_qs[mesure_qs.column_order_agregated].to_csv(file_path)
+        self._write_mesure_qs(df_mesure_qs[mesure_qs.column_order_agregated], file_path)
 
     def save_error_mesure_qs(self, df_mesure_qs: pd.DataFrame, date: date, mesure_type: MesureType, dsp: str,
                              ligne: str) -> None:
         mesure_qs = MESURE_TYPE[mesure_type]
-        folder_path = os.path.join(self.data_path, self.output_path, dsp, mesure_type)
+        folder_path = self._daily_mesure_qs_folder(dsp=dsp, mesure_type=mesure_type)
+
+        # Au format parquet, les erreurs sont écrites hors du dataset des mesures journalières
+        if self.output_format == OutputFormat.parquet:
+            folder_path = os.path.join(folder_path, ERROR_MESURE_QS_FOLDER)
 
         if not os.path.exists(folder_path):
             os.makedirs(folder_path, exist_ok=True)
 
         file_path = os.path.join(folder_path,
                                  f"mesure_{mesure_type}_{ligne}_{date.strftime('%Y_%m_%d')}_error" +
-                                 FileExtensions.csv)
-
-        logger.info(f"Writing a dataframe of shape {df_mesure_qs.shape} in {file_path}")
+                                 self.output_file_extension)
 
-        df_mesure_qs[mesure_qs.column_order].to_csv(file_path)
+        self._write_mesure_qs(df_mesure_qs[mesure_qs.column_order], file_path)
 
-    def get_daily_mesure_qs(self, date: date, dsp: str, mesure_type: MesureType) -> pd.DataFrame:
+    def get_daily_mesure_qs(self, date: date, dsp: str, mesure_type: MesureType, **kwargs) -> pd.DataFrame:
         """Récupération des données de mesure QS par jour.
 
         Parameters
@@ -170,17 +426,149 @@ class LocalFileSystemHandler(FileSystemHandler, CalendrierScolaireFileSystemHand
             DSP des données de mesure QS.
         mesure_type : MesureType
             Le type de mesure (ponctualite, regularite).
+        **kwargs : dict
+            Keyword arguments supplémentaires passés à la fonction pandas read_csv ou read_parquet.
 
         Returns
         -------
         df : DataFrame
             DataFrame d'offre réalisée par jour.
         """
-        folder_path = os.path.join(self.data_path, self.output_path, dsp, mesure_type)
-        file_path = os.path.join(folder_path, f"mesure_{mesure_type}_{date.strftime('%Y_%m_%d')}" + FileExtensions.csv)
+        file_path = self._daily_mesure_qs_file_path(date=date, dsp=dsp, mesure_type=mesure_type)
 
         logger.info(f"Reading daily mesure qs for date: {date.strftime('%Y-%m-%d')}, from: {file_path}")
-        return pd.read_csv(file_path)
+        if self.output_format == OutputFormat.parquet:
+            return pd.read_parquet(file_path, **kwargs)
+        return pd.read_csv(file_path, **kwargs)
+
+    def has_daily_mesure_qs(self, date: date, dsp: str, mesure_type: MesureType) -> bool:
+        """Indique si le fichier de mesure QS d'un jour existe.
+
+        Parameters
+        ----------
+        date : date
+            Date des données de mesure QS.
+        dsp : str
+            DSP des données de mesure QS.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+
+        Returns
+        -------
+        exists : bool
+            True si le fichier de mesure QS du jour existe.
+        """
+        return os.path.exists(self._daily_mesure_qs_file_path(date=date, dsp=dsp, mesure_type=mesure_type))
+
+    def get_mesure_qs_by_dates(self, dates: list[date], dsp: str, mesure_type: MesureType, **kwargs) -> pd.DataFrame:
+        """Récupération des données de mesure QS de plusieurs jours.
+
+        Au format parquet, les jours sont lus en un seul parcours du dataset du type de mesure, filtré sur la partition
+        JOUR. Les jours sans mesure sont ignorés. Dans tous les formats, la colonne JOUR (AAAA-MM-JJ) indique le jour de
+        chaque mesure.
+
+        Parameters
+        ----------
+        dates : list[date]
+            Dates des données de mesure QS.
+        dsp : str
+            DSP des données de mesure QS.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        **kwargs : dict
+            Keyword arguments supplémentaires passés à la fonction pandas read_csv ou à la méthode pyarrow
+            Dataset.to_table.
+
+        Returns
+        -------
+        df : DataFrame
+            DataFrame des mesures QS de tous les jours, vide si aucune mesure n'est disponible.
+        """
+        if self.output_format != OutputFormat.parquet:
+            mesure_list: list[pd.DataFrame] = []
+            for date_to_read in dates:
+                df = self.get_daily_mesure_qs(date=date_to_read, dsp=dsp, mesure_type=mesure_type, **kwargs)
+                if not df.empty:
+                    mesure_list.append(df.assign(**{MESURE_QS_PARTITION_COLUMN: date_to_read.strftime('%Y-%m-%d')}))
+            return pd.concat(mesure_list) if mesure_list else pd.DataFrame()
+
+        folder_path = self._daily_mesure_qs_folder(dsp=dsp, mesure_type=mesure_type)
+        if not dates or not os.path.exists(folder_path):
+            return pd.DataFrame()
+
+        logger.info(f"Reading mesure qs for {len(dates)} dates from: {folder_path}")
+        dataset = ds.dataset(folder_path, format="parquet", partitioning=MESURE_QS_PARTITIONING)
+        jours = [date_to_read.strftime('%Y-%m-%d') for date_to_read in dates]
+        return dataset.to_table(filter=ds.field(MESURE_QS_PARTITION_COLUMN).isin(jours), **kwargs).to_pandas()
+
+    def _partial_sums_folder(self, dsp: str, mesure_type: MesureType) -> str:
+        return os.path.join(self.data_path, self.output_path, dsp, PARTIAL_SUMS_FOLDER, self.output_format, mesure_type)
+
+    def _partial_sums_file_path(self, dsp: str, mesure_type: MesureType, name: str) -> str:
+        folder_path = self._partial_sums_folder(dsp=dsp, mesure_type=mesure_type)
+        return os.path.join(folder_path, *name.split("/")) + FileExtensions.json
+
+    def get_partial_sums(self, dsp: str, mesure_type: MesureType, name: str) -> Optional[dict]:
+        """Récupération d'un élément du stockage des sommes partielles d'agrégation.
+
+        Parameters
+        ----------
+        dsp : str
+            DSP des sommes partielles.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        name : str
+            Nom relatif de l'élément, par exemple 'by_month/2023_09'.
+
+        Returns
+        -------
+        partial_sums : Optional[dict]
+            Élément du stockage des sommes partielles, None s'il n'existe pas.
+        """
+        file_path = self._partial_sums_file_path(dsp=dsp, mesure_type=mesure_type, name=name)
+        if not os.path.exists(file_path):
+            return None
+
+        with open(file_path, encoding="utf-8") as partial_sums_file:
+            return json.load(partial_sums_file)
+
+    def save_partial_sums(self, partial_sums: dict, dsp: str, mesure_type: MesureType, name: str) -> None:
+        """Sauvegarde d'un élément du stockage des sommes partielles d'agrégation.
+
+        Comme le manifeste d'exécution, l'élément est écrit dans un fichier temporaire puis renommé.
+
+        Parameters
+        ----------
+        partial_sums : dict
+            Élément du stockage des sommes partielles.
+        dsp : str
+            DSP des sommes partielles.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        name : str
+            Nom relatif de l'élément, par exemple 'by_month/2023_09'.
+        """
+        file_path = self._partial_sums_file_path(dsp=dsp, mesure_type=mesure_type, name=name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        temporary_file_path = file_path + ".tmp"
+        with open(temporary_file_path, "w", encoding="utf-8") as partial_sums_file:
+            json.dump(partial_sums, partial_sums_file)
+        os.replace(temporary_file_path, file_path)
+
+    def delete_partial_sums(self, dsp: str, mesure_type: MesureType) -> None:
+        """Suppression de tous les éléments du stockage des sommes partielles d'agrégation d'un type de mesure.
+
+        Parameters
+        ----------
+        dsp : str
+            DSP des sommes partielles.
+        mesure_type : MesureType
+            Le type de mesure (ponctualite, regularite).
+        """
+        folder_path = self._partial_sums_folder(dsp=dsp, mesure_type=mesure_type)
+        if os.path.exists(folder_path):
+            shutil.rmtree(folder_path)
 
     def get_calendrier_scolaire(self, **kwargs) -> pd.DataFrame:
         """Récupération des données de calendrier scolaire.
@@ -0,0 +1,54 @@
+import resource
+import sys
+
+from offre_realisee.domain.port.process_memory_handler import ProcessMemoryHandler
+
+PROC_SELF_STATUS = "/proc/self/status"
+PROC_SELF_CLEAR_REFS = "/proc/self/clear_refs"
+
+# Écrire "5" dans clear_refs remet le pic de mémoire résidente (VmHWM) du processus à sa mémoire résidente courante
+RESET_PEAK_RSS = "5"
+
+
+class LocalProcessMemoryHandler(ProcessMemoryHandler):
+    def get_rss(self) -> tuple[int, int]:
+        """Mémoire résidente courante et pic de mémoire résidente du processus courant, en octets.
+
+        Sous Linux, les valeurs sont lues dans /proc/self/status (VmRSS et VmHWM). Sinon, seul le pic depuis le
+        démarrage du processus est disponible (getrusage) et est renvoyé pour les deux valeurs.
+
+        Returns
+        -------
+        rss, peak_rss : tuple[int, int]
+            Mémoire résidente courante et pic de mémoire résidente.
+        """
+        try:
+            values = {}
+            with open(PROC_SELF_STATUS) as status_file:
+                for line in status_file:
+                    if line.startswith(("VmRSS:", "VmHWM:")):
+                        name, value, _ = line.split()
+                        values[name] = int(value) * 1024
+            return values["VmRSS:"], values["VmHWM:"]
+        except (OSError, KeyError):
+            # ru_maxrss est en kilo-octets sous Linux et en octets sous macOS
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+            return peak_rss, peak_rss
+
+    def reset_peak_rss(self) -> bool:
+        """Remet le pic de mémoire résidente du processus courant à sa mémoire résidente courante.
+
+        Permet de mesurer le pic d'une seule tâche dans un processus qui en exécute plusieurs, voir get_rss. Le pic
+        est remis à zéro en écrivant dans /proc/self/clear_refs, disponible sous Linux uniquement.
+
+        Returns
+        -------
+        is_reset : bool
+            False si le système ne permet pas de remettre le pic à zéro : le pic mesuré est alors celui du processus.
+        """
+        try:
+            with open(PROC_SELF_CLEAR_REFS, "w") as clear_refs_file:
+                clear_refs_file.write(RESET_PEAK_RSS)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,174 @@
+import hashlib
+import os
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from offre_realisee.config.input_config import InputColumns
+
+
+class OffreRealiseeDataset:
+    """Lecteur du dataset parquet d'offre réalisée partitionné par jour ("JOUR=AAAA-MM-JJ").
+
+    La découverte des fragments et l'inférence du schéma ne sont faites qu'une seule fois, à la construction de
+    l'objet. Les tables journalières sont ensuite lues à la demande, en ne lisant que les fragments du jour demandé.
+    La date de modification du dossier de chaque partition journalière est relevée à la découverte, voir
+    is_up_to_date.
+
+    Parameters
+    ----------
+    file_path : str
+        Chemin vers le dossier (ou le fichier) parquet d'offre réalisée.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.dataset = ds.dataset(file_path, format="parquet", partitioning="hive")
+
+        self.fragments_by_jour: dict[Optional[str], list[ds.Fragment]] = defaultdict(list)
+        for fragment in self.dataset.get_fragments():
+            partition_keys = ds.get_partition_keys(fragment.partition_expression)
+            self.fragments_by_jour[partition_keys.get(InputColumns.jour)].append(fragment)
+
+        self.modification_times = {jour: self._get_modification_time(jour) for jour in self.fragments_by_jour}
+
+    @property
+    def is_partitioned_by_jour(self) -> bool:
+        """Indique si le dataset est partitionné par jour."""
+        return None not in self.fragments_by_jour
+
+    def _get_partition_path(self, jour: Optional[str]) -> str:
+        if jour is None or not self.is_partitioned_by_jour:
+            return self.file_path
+
+        fragments = self.fragments_by_jour.get(jour)
+        if fragments:
+            return os.path.dirname(fragments[0].path)
+        return os.path.join(self.file_path, f"{InputColumns.jour}={jour}")
+
+    def _get_modification_time(self, jour: Optional[str]) -> Optional[int]:
+        try:
+            return os.stat(self._get_partition_path(jour)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def is_up_to_date(self, date: date) -> bool:
+        """Indique si la partition d'une date n'a pas changé depuis la découverte du dataset.
+
+        Seul le dossier de la partition du jour est consulté : sa date de modification change dès qu'un fichier y est
+        ajouté, supprimé ou renommé, et il apparaît ou disparaît avec la partition. Si le dataset n'est pas partitionné
+        par jour, c'est le dossier (ou le fichier) du dataset qui est consulté.
+
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée.
+
+        Returns
+        -------
+        is_up_to_date : bool
+            False si la partition du jour a été ajoutée, supprimée ou modifiée depuis la découverte.
+        """
+        jour = date.strftime("%Y-%m-%d") if self.is_partitioned_by_jour else None
+        return self._get_modification_time(jour) == self.modification_times.get(jour)
+
+    def get_jours(self) -> list[str]:
+        """Liste les jours disponibles dans le dataset.
+
+        Returns
+        -------
+        jours : list[str]
+            Liste triée des jours au format "AAAA-MM-JJ".
+        """
+        return sorted(jour for jour in self.fragments_by_jour if jour is not None)
+
+    def get_daily_fingerprint(self, date: date) -> str:
+        """Empreinte des fichiers d'offre réalisée d'une date.
+
+        L'empreinte est calculée à partir du chemin, de la taille et de la date de modification des fichiers du jour.
+        Si le dataset n'est pas partitionné par jour, tous les fichiers du dataset sont pris en compte.
+
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée.
+
+        Returns
+        -------
+        fingerprint : str
+            Empreinte des fichiers du jour, identique pour tous les jours absents du dataset.
+        """
+        if self.is_partitioned_by_jour:
+            fragments = self.fragments_by_jour.get(date.strftime("%Y-%m-%d"), [])
+        else:
+            fragments = [fragment for fragments in self.fragments_by_jour.values() for fragment in fragments]
+
+        fingerprint = hashlib.sha256()
+        for path in sorted(fragment.path for fragment in fragments):
+            stat = os.stat(path)
+            fingerprint.update(f"{os.path.relpath(path, self.file_path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return fingerprint.hexdigest()
+
+    def get_daily_row_count(self, date: date) -> int:
+        """Nombre de passages d'une date, lu dans les métadonnées des fichiers parquet sans lire les données.
+
+        Parameters
+        ----------
+        date : date
+            Date des données d'offre réalisée.
+
+        Returns
+        -------
+        row_count : int
+            Nombre de passages du jour, 0 si le jour n'est pas présent dans le dataset.
+        """
+        if not self.is_partitioned_by_jour:
+            return self.dataset.count_rows(filter=pc.field(InputColumns.jour) == date.strftime("%Y-%m-%d"))
+
+        return sum(fragment.metadata.num_rows for fragment in self.fragments_by_jour.get(date.strftime("%Y-%m-%d"), []))
+
+    def get_daily_table(self, date: date, columns: list[str], dsp: str = "", ligne: str = "") -> pa.Table:
+        """Lecture de la table d'offre réalisée pour une date.
+
+        Parameters
+        ----------
+        date : date
+            Date pour laquelle nous voulons les données d'offre réalisée.
+        columns : list[str]
+            Colonnes à lire.
+        dsp : str
+            DSP à filtrer, par défaut à "" (pas de filtre).
+        ligne : str
+            Ligne à filtrer, par défaut à "" (pas de filtre).
+
+        Returns
+        -------
+        table : Table
+            Table Arrow d'offre réalisée, vide si le jour n'est pas présent dans le dataset.
+        """
+        jour = date.strftime("%Y-%m-%d")
+
+        filter_expression = None
+        if dsp:
+            filter_expression = pc.field(InputColumns.dsp) == dsp
+        if ligne:
+            ligne_expression = pc.field(InputColumns.ligne) == ligne
+            filter_expression = ligne_expression if filter_expression is None else filter_expression & ligne_expression
+
+        if not self.is_partitioned_by_jour:
+            jour_expression = pc.field(InputColumns.jour) == jour
+            filter_expression = jour_expression if filter_expression is None else filter_expression & jour_expression
+            return self.dataset.to_table(columns=columns, filter=filter_expression)
+
+        fragments = self.fragments_by_jour.get(jour, [])
+        if not fragments:
+            return self.dataset.schema.empty_table().select(columns)
+
+        return pa.concat_tables([
+            fragment.to_table(schema=self.dataset.schema, columns=columns, filter=filter_expression)
+            for fragment in fragments
+        ])
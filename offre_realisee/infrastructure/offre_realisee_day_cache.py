@@ -0,0 +1,141 @@
+import glob
+import hashlib
+import os
+from datetime import date
+from typing import Optional
+
+import pyarrow as pa
+
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.config.logger import logger
+from offre_realisee.infrastructure.arrow_ipc import read_arrow_ipc_file, write_arrow_ipc_file
+
+DAY_CACHE_MAX_SIZE: int = 10 * 1024 ** 3
+
+
+class OffreRealiseeDayCache:
+    """Cache local des tables journalières d'offre réalisée, au format Arrow IPC non compressé.
+
+    Chaque entrée contient la table d'un jour déjà filtrée (DSP, ligne) et projetée sur les colonnes lues, telle que
+    renvoyée par OffreRealiseeDataset.get_daily_table. Une entrée est lue par projection en mémoire, sans décompression
+    ni décodage du parquet.
+
+    Le nom du fichier d'une entrée contient l'empreinte des fichiers d'entrée du jour (voir
+    OffreRealiseeDataset.get_daily_fingerprint) : une entrée dont les fichiers d'entrée ont changé n'est plus lue et est
+    remplacée à l'écriture suivante. La taille totale du cache est limitée à max_size octets, en supprimant les entrées
+    les moins récemment lues.
+
+    Parameters
+    ----------
+    cache_path : str
+        Dossier du cache.
+    max_size : int
+        Taille maximale du cache, en octets, par défaut DAY_CACHE_MAX_SIZE.
+    """
+
+    def __init__(self, cache_path: str, max_size: int = DAY_CACHE_MAX_SIZE):
+        self.cache_path = cache_path
+        self.max_size = max_size
+
+    def _entry_prefix(self, date: date, columns: list[str], dsp: str, ligne: str) -> str:
+        key = hashlib.sha256(f"{columns}:{dsp}:{ligne}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_path, f"{date.strftime('%Y-%m-%d')}_{key}_")
+
+    def _entry_file_path(self, date: date, columns: list[str], dsp: str, ligne: str, fingerprint: str) -> str:
+        entry_prefix = self._entry_prefix(date=date, columns=columns, dsp=dsp, ligne=ligne)
+        return entry_prefix + fingerprint[:16] + FileExtensions.arrow
+
+    def get(self, date: date, columns: list[str], dsp: str, ligne: str, fingerprint: str) -> Optional[pa.Table]:
+        """Lecture d'une table journalière du cache.
+
+        Parameters
+        ----------
+        date : date
+            Date de la table.
+        columns : list[str]
+            Colonnes de la table.
+        dsp : str
+            DSP filtrée.
+        ligne : str
+            Ligne filtrée.
+        fingerprint : str
+            Empreinte des fichiers d'entrée du jour.
+
+        Returns
+        -------
+        table : Optional[Table]
+            Table projetée en mémoire, None si elle n'est pas dans le cache ou si les fichiers d'entrée ont changé.
+        """
+        file_path = self._entry_file_path(date=date, columns=columns, dsp=dsp, ligne=ligne, fingerprint=fingerprint)
+        try:
+            # La date de modification sert d'ordre de lecture pour la suppression des entrées les plus anciennes
+            os.utime(file_path)
+            return read_arrow_ipc_file(file_path)
+        except FileNotFoundError:
+            return None
+
+    def put(self, table: pa.Table, date: date, columns: list[str], dsp: str, ligne: str, fingerprint: str) -> None:
+        """Écriture d'une table journalière dans le cache.
+
+        Les entrées du même jour écrites pour d'autres fichiers d'entrée sont supprimées, puis les entrées les moins
+        récemment lues sont supprimées jusqu'à ce que le cache ne dépasse plus sa taille maximale.
+
+        Parameters
+        ----------
+        table : Table
+            Table Arrow à écrire.
+        date : date
+            Date de la table.
+        columns : list[str]
+            Colonnes de la table.
+        dsp : str
+            DSP filtrée.
+        ligne : str
+            Ligne filtrée.
+        fingerprint : str
+            Empreinte des fichiers d'entrée du jour.
+        """
+        os.makedirs(self.cache_path, exist_ok=True)
+        file_path = self._entry_file_path(date=date, columns=columns, dsp=dsp, ligne=ligne, fingerprint=fingerprint)
+
+        for stale_file_path in glob.glob(glob.escape(self._entry_prefix(
+                date=date, columns=columns, dsp=dsp, ligne=ligne)) + "*" + FileExtensions.arrow):
+            if stale_file_path != file_path:
+                self._remove(stale_file_path)
+
+        write_arrow_ipc_file(table, file_path)
+        self.evict(keep_file_path=file_path)
+
+    def evict(self, keep_file_path: Optional[str] = None) -> None:
+        """Supprime les entrées les moins récemment lues tant que le cache dépasse sa taille maximale.
+
+        Parameters
+        ----------
+        keep_file_path : Optional[str]
+            Entrée à conserver quelle que soit sa taille, par défaut aucune.
+        """
+        entries = []
+        for file_path in glob.glob(os.path.join(glob.escape(self.cache_path), "*" + FileExtensions.arrow)):
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, file_path))
+
+        cache_size = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries):
+            if cache_size <= self.max_size:
+                break
+            if file_path == keep_file_path:
+                continue
+            self._remove(file_path)
+            cache_size -= size
+
+    @staticmethod
+    def _remove(file_path: str) -> None:
+        # Un autre processus peut avoir supprimé l'entrée entre-temps
+        try:
+            os.remove(file_path)
+            logger.info(f"Removed day cache entry {file_path}")
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,114 @@
+import cProfile
+import glob
+import os
+import pstats
+import shutil
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.config.logger import logger
+
+PROFILE_FOLDER = "_profile"
+PROFILE_REPORT_FILE_NAME = "profile_report"
+PROFILE_TOP_N = 30
+# Profils de chaque tâche, regroupés par date puis fusionnés par write_profile_report
+TASK_PROFILES_FOLDER = "_tasks"
+# Attribut de FunctionProfile utilisé pour trier chaque tableau du rapport
+_REPORT_SORT_ATTRIBUTES = {pstats.SortKey.TIME: 'tottime', pstats.SortKey.CUMULATIVE: 'cumtime'}
+_REPORT_COLUMNS = "   ncalls  tottime  percall  cumtime  percall filename:lineno(function)\n"
+
+
+def _task_profile_file_path(profile_path: str, label: str) -> str:
+    return os.path.join(
+        profile_path, TASK_PROFILES_FOLDER, f"{label}__{os.getpid()}_{uuid.uuid4().hex}" + FileExtensions.pstats)
+
+
+@contextmanager
+def profile_block(profile_path: Optional[str], label: str) -> Iterator[None]:
+    """Exécute le bloc sous cProfile dans le processus courant, et écrit son profil comme celui d'une tâche.
+
+    Les tâches des processus du pool sont profilées de la même façon, voir l'argument task_profiler de WorkerPool.
+    Chaque bloc est écrit dans son propre fichier <profile_path>/_tasks/<label>__<pid>_<identifiant>.pstats, fusionné
+    par write_profile_report.
+
+    Parameters
+    ----------
+    profile_path : Optional[str]
+        Dossier des profils. Si None, le bloc n'est pas profilé.
+    label : str
+        Nom du profil fusionné qui contiendra ce bloc : date de la tâche (AAAA_MM_JJ) ou nom de l'étape, par exemple
+        'aggregation'.
+    """
+    if profile_path is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        file_path = _task_profile_file_path(profile_path, label)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        profiler.dump_stats(file_path)
+
+
+def write_profile_report(profile_path: str, top_n: int = PROFILE_TOP_N) -> Optional[str]:
+    """Fusionne les profils des tâches écrits par les processus du pool et produit un rapport des fonctions les plus
+    coûteuses.
+
+    1. Les profils des tâches d'une même date (ou d'une même étape, voir profile_block) sont fusionnés dans
+       <profile_path>/<AAAA_MM_JJ>.pstats, lisible avec pstats ou snakeviz.
+    2. Les profils de toutes les tâches, tous processus confondus, sont fusionnés dans le rapport
+       <profile_path>/profile_report.txt : les top_n fonctions par temps propre, puis par temps cumulé.
+    3. Les profils des tâches sont supprimés.
+
+    Parameters
+    ----------
+    profile_path : str
+        Dossier des profils, voir WorkerPool.
+    top_n : int
+        Nombre de fonctions du rapport, par défaut PROFILE_TOP_N.
+
+    Returns
+    -------
+    report_file_path : Optional[str]
+        Chemin du rapport, None si aucune tâche n'a été profilée.
+    """
+    task_profiles_path = os.path.join(profile_path, TASK_PROFILES_FOLDER)
+    file_paths = sorted(glob.glob(os.path.join(task_profiles_path, "*" + FileExtensions.pstats)))
+    if not file_paths:
+        return None
+
+    file_paths_by_label = defaultdict(list)
+    for file_path in file_paths:
+        file_paths_by_label[os.path.basename(file_path).split("__")[0]].append(file_path)
+
+    for label, label_file_paths in file_paths_by_label.items():
+        pstats.Stats(*label_file_paths).dump_stats(os.path.join(profile_path, label + FileExtensions.pstats))
+
+    # L'en-tête est écrit ici : pstats listerait les fichiers des tâches, supprimés ensuite
+    stats_profile = pstats.Stats(*file_paths).get_stats_profile()
+    total_calls = sum(int(profile.ncalls.split("/")[0]) for profile in stats_profile.func_profiles.values())
+    report_file_path = os.path.join(profile_path, PROFILE_REPORT_FILE_NAME + FileExtensions.txt)
+    with open(report_file_path, "w", encoding="utf-8") as report_file:
+        report_file.write(
+            f"Merged profile of {len(file_paths)} tasks ({', '.join(sorted(file_paths_by_label))})\n"
+            f"{total_calls} function calls in {stats_profile.total_tt:.3f} seconds\n")
+        for sort_key, sort_attribute in _REPORT_SORT_ATTRIBUTES.items():
+            report_file.write(f"\nOrdered by: {sort_key.value}, top {top_n}\n\n" + _REPORT_COLUMNS)
+            function_profiles = sorted(
+                stats_profile.func_profiles.items(), key=lambda item: getattr(item[1], sort_attribute), reverse=True)
+            for function_name, profile in function_profiles[:top_n]:
+                report_file.write(
+                    f"{profile.ncalls:>9} {profile.tottime:8.3f} {profile.percall_tottime:8.3f} "
+                    f"{profile.cumtime:8.3f} {profile.percall_cumtime:8.3f} "
+                    f"{profile.file_name}:{profile.line_number}({function_name})\n")
+
+    shutil.rmtree(task_profiles_path)
+    logger.info(f"Profile report of {len(file_paths)} tasks written in {report_file_path}")
+    return report_file_path
@@ -0,0 +1,97 @@
+import json
+import os
+import platform
+import time
+import warnings
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+BENCHMARK_PATH = os.path.dirname(__file__)
+# Temps de référence, versionnés, avec le temps de calibration de la machine qui les a mesurés
+BENCHMARK_BASELINE_PATH = os.path.join(BENCHMARK_PATH, 'benchmark_baseline.json')
+# Temps de la dernière exécution, non versionnés
+BENCHMARK_RESULTS_PATH = os.path.join(BENCHMARK_PATH, 'benchmark_results.json')
+# Les temps de référence sont remplacés par ceux de l'exécution si cette variable d'environnement vaut 1
+UPDATE_BASELINE_ENV_VARIABLE = 'BENCHMARK_UPDATE_BASELINE'
+# Un temps relatif qui dépasse sa référence de plus de REGRESSION_TOLERANCE fois est signalé, et fait échouer le
+# benchmark si cette variable d'environnement vaut 1
+STRICT_ENV_VARIABLE = 'BENCHMARK_STRICT'
+REGRESSION_TOLERANCE = 2.0
+CALIBRATION_SIZE = 1_000_000
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """Meilleur temps d'exécution de function, en secondes, sur repeat exécutions."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _calibration_workload() -> None:
+    # Tri, regroupement pandas et boucle Python : les mêmes opérations que les calculs mesurés
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'group': rng.integers(0, 1000, CALIBRATION_SIZE), 'value': rng.random(CALIBRATION_SIZE)})
+    df.sort_values(by=['group', 'value']).groupby('group')['value'].agg(['sum', 'max'])
+    sum(value * value for value in range(CALIBRATION_SIZE))
+
+
+def measure_calibration() -> float:
+    """Temps d'une charge fixe, qui sert d'unité aux temps des benchmarks d'une même session, en secondes."""
+    return measure(_calibration_workload, repeat=5)
+
+
+class BenchmarkRecorder:
+    """Collecte les temps des benchmarks d'une session et les compare aux temps de référence.
+
+    Les temps sont comparés relativement au temps de calibration de leur session (voir measure_calibration) : une
+    machine deux fois plus lente que la machine de référence ne fait pas échouer les benchmarks. Une régression est
+    signalée par un avertissement, et fait échouer le benchmark en mode strict.
+    """
+
+    def __init__(self, update_baseline: bool, strict: bool = False):
+        self.update_baseline = update_baseline
+        self.strict = strict
+        self.baseline = {}
+        self.baseline_calibration = None
+        if os.path.exists(BENCHMARK_BASELINE_PATH):
+            with open(BENCHMARK_BASELINE_PATH, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+            self.baseline = baseline['timings']
+            self.baseline_calibration = baseline.get('calibration')
+        self.calibration = measure_calibration()
+        self.timings = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.timings[name] = round(seconds, 6)
+        if self.update_baseline or name not in self.baseline or self.baseline_calibration is None:
+            return
+
+        relative_seconds = seconds / self.calibration
+        baseline_relative_seconds = self.baseline[name] / self.baseline_calibration
+        if relative_seconds <= baseline_relative_seconds * REGRESSION_TOLERANCE:
+            return
+
+        message = (f"{name}: {relative_seconds:.2f} x calibration ({seconds * 1000:.1f} ms), baseline "
+                   f"{baseline_relative_seconds:.2f} x calibration (tolerance x{REGRESSION_TOLERANCE})")
+        if self.strict:
+            raise AssertionError(message)
+        warnings.warn(message)
+
+    def save(self) -> None:
+        results = {
+            'machine': platform.machine(), 'python': platform.python_version(),
+            'calibration': round(self.calibration, 6), 'timings': self.timings
+        }
+        with open(BENCHMARK_RESULTS_PATH, 'w', encoding='utf-8') as results_file:
+            json.dump(results, results_file, indent=2, sort_keys=True)
+
+        if self.update_baseline:
+            # Les temps non mesurés dans cette session ne sont plus comparables à la nouvelle calibration
+            with open(BENCHMARK_BASELINE_PATH, 'w', encoding='utf-8') as baseline_file:
+                json.dump(results, baseline_file, indent=2, sort_keys=True)
+                baseline_file.write('\n')
@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+from tests.test_benchmark.benchmark_baseline import (
+    BenchmarkRecorder, STRICT_ENV_VARIABLE, UPDATE_BASELINE_ENV_VARIABLE)
+
+
+@pytest.fixture(scope='session')
+def benchmark_recorder():
+    recorder = BenchmarkRecorder(update_baseline=os.environ.get(UPDATE_BASELINE_ENV_VARIABLE) == '1',
+                                 strict=os.environ.get(STRICT_ENV_VARIABLE) == '1')
+    yield recorder
+    recorder.save()
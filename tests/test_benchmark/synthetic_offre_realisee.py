@@ -0,0 +1,80 @@
+import os
+from datetime import date, datetime, time, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from offre_realisee.config.input_config import InputColumns
+
+SERVICE_START = datetime(2023, 9, 27, 5, 0, tzinfo=timezone.utc)
+HAUTE_FREQUENCE_HEADWAY = timedelta(minutes=4)
+
+
+def generate_daily_offre_realisee(
+    n_lignes: int, n_arrets: int, n_passages: int, headway: timedelta = timedelta(minutes=8),
+    missing_rate: float = 0.05, seed: int = 0, service_start: datetime = SERVICE_START,
+    haute_frequence_rate: float = 0.0, delay_mean: float = 60, delay_std: float = 120, duplicate_rate: float = 0.0
+) -> pd.DataFrame:
+    """Génère une journée d'offre réalisée synthétique et déterministe.
+
+    Chaque ligne a deux sens, chaque sens dessert n_arrets arrêts, et chaque arrêt voit n_passages passages théoriques
+    espacés de headway, ou de HAUTE_FREQUENCE_HEADWAY pour une part haute_frequence_rate des lignes. Les heures réelles
+    suivent un retard normal (delay_mean +/- delay_std secondes) et une part missing_rate d'entre elles est manquante.
+    Une part duplicate_rate des passages est dupliquée avec une autre heure réelle.
+    """
+    rng = np.random.default_rng(seed)
+
+    n_stops = n_lignes * 2 * n_arrets
+    n_rows = n_stops * n_passages
+
+    stop_index = np.repeat(np.arange(n_stops), n_passages)
+    ligne = stop_index // (2 * n_arrets)
+    sens = (stop_index // n_arrets) % 2
+    arret = stop_index % n_arrets
+
+    n_lignes_haute_frequence = int(round(n_lignes * haute_frequence_rate))
+    ligne_headway = np.where(
+        np.arange(n_lignes) < n_lignes_haute_frequence, HAUTE_FREQUENCE_HEADWAY.total_seconds(),
+        headway.total_seconds())
+    passage_offset = np.tile(np.arange(n_passages), n_stops) * ligne_headway[ligne]
+    heure_theorique = pd.Timestamp(service_start) + pd.to_timedelta(passage_offset + arret * 90, unit='s')
+
+    delay = rng.normal(loc=delay_mean, scale=delay_std, size=n_rows)
+    heure_reelle = pd.Series(heure_theorique + pd.to_timedelta(delay.round(), unit='s'))
+    heure_reelle[rng.random(n_rows) < missing_rate] = pd.NaT
+
+    df_offre_realisee = pd.DataFrame({
+        InputColumns.ligne: pd.array(ligne.astype(str), dtype='string'),
+        InputColumns.arret: pd.array([f'{lig}_{arr}' for lig, arr in zip(ligne, arret)], dtype='string'),
+        InputColumns.sens: pd.array(sens.astype(str), dtype='string'),
+        InputColumns.heure_theorique: pd.Series(heure_theorique).astype('datetime64[us, UTC]'),
+        InputColumns.heure_reelle: heure_reelle.astype('datetime64[us, UTC]'),
+        InputColumns.is_terminus: pd.array(arret == n_arrets - 1, dtype='boolean'),
+    })
+
+    if duplicate_rate > 0:
+        df_duplicates = df_offre_realisee[rng.random(n_rows) < duplicate_rate].copy()
+        df_duplicates[InputColumns.heure_reelle] += pd.to_timedelta(
+            rng.normal(loc=0, scale=delay_std, size=len(df_duplicates)).round(), unit='s')
+        df_offre_realisee = pd.concat([df_offre_realisee, df_duplicates], ignore_index=True)
+
+    return df_offre_realisee
+
+
+def write_synthetic_offre_realisee(
+    file_path: str, dates: list[date], n_lignes: int, n_arrets: int, n_passages: int, seed: int = 0, **kwargs
+) -> None:
+    """Écrit un dataset d'offre réalisée synthétique partitionné par jour (JOUR=AAAA-MM-JJ).
+
+    Chaque jour est généré par generate_daily_offre_realisee, avec une graine propre au jour pour que les jours
+    diffèrent tout en restant déterministes. Les arguments supplémentaires sont transmis à
+    generate_daily_offre_realisee.
+    """
+    for day_number, day in enumerate(dates):
+        df_offre_realisee = generate_daily_offre_realisee(
+            n_lignes=n_lignes, n_arrets=n_arrets, n_passages=n_passages, seed=seed + day_number,
+            service_start=datetime.combine(day, time(5, 0), tzinfo=timezone.utc), **kwargs)
+
+        partition_path = os.path.join(file_path, f"{InputColumns.jour}={day.strftime('%Y-%m-%d')}")
+        os.makedirs(partition_path, exist_ok=True)
+        df_offre_realisee.to_parquet(os.path.join(partition_path, 'part-0.parquet'), index=False)
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.domain.entities.group_offre_realisee_by_stop import (
+    group_offre_realisee_by_stop, prepare_offre_realisee_by_stop)
+from offre_realisee.domain.entities.ponctualite.compute_ponctualite_stat_from_dataframe import (
+    compute_ponctualite_stat_from_stops)
+from offre_realisee.domain.entities.regularite.compute_regularite_stat_from_dataframe import (
+    compute_regularite_stat_from_prepared_dataframe)
+from tests.test_benchmark.synthetic_offre_realisee import generate_daily_offre_realisee
+
+N_ARRETS = 25
+N_PASSAGES = 12
+# Tolérance sur le temps par arrêt entre la petite et la grande journée
+MAX_TIME_BY_STOP_RATIO = 1.4
+
+
+def _compute_ponctualite(df_offre_realisee):
+    stops = group_offre_realisee_by_stop(df_offre_realisee)
+    return lambda: compute_ponctualite_stat_from_stops(stops=stops)
+
+
+def _compute_regularite(df_offre_realisee):
+    df_offre_realisee_by_stop = prepare_offre_realisee_by_stop(df_offre_realisee)
+    return lambda: compute_regularite_stat_from_prepared_dataframe(df_offre_realisee_by_stop=df_offre_realisee_by_stop)
+
+
+def _time_by_stop(prepare_compute_stat, n_lignes: int) -> float:
+    df_offre_realisee = generate_daily_offre_realisee(n_lignes=n_lignes, n_arrets=N_ARRETS, n_passages=N_PASSAGES)
+    n_stops = df_offre_realisee.groupby([InputColumns.ligne, InputColumns.sens, InputColumns.arret]).ngroups
+    compute_stat = prepare_compute_stat(df_offre_realisee)
+
+    start = time.perf_counter()
+    compute_stat()
+    return (time.perf_counter() - start) / n_stops
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('prepare_compute_stat', [_compute_ponctualite, _compute_regularite])
+def test_compute_stat_scales_linearly_with_number_of_stops(prepare_compute_stat):
+    # When
+    time_by_stop_small = _time_by_stop(prepare_compute_stat, n_lignes=8)
+    time_by_stop_large = _time_by_stop(prepare_compute_stat, n_lignes=96)
+
+    # Then
+    assert time_by_stop_large < time_by_stop_small * MAX_TIME_BY_STOP_RATIO, (
+        f"{prepare_compute_stat.__name__}: {time_by_stop_small * 1000:.3f} ms/stop on 400 stops, "
+        f"{time_by_stop_large * 1000:.3f} ms/stop on 4800 stops"
+    )
@@ -0,0 +1,186 @@
+import os
+import shutil
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from offre_realisee import compute_qs
+from offre_realisee.config.aggregation_config import AggregationLevel
+from offre_realisee.config.offre_realisee_config import MesurePonctualite, MesureType
+from offre_realisee.domain.entities.add_frequency import add_frequency_by_stop
+from offre_realisee.domain.entities.drop_duplicates_heure_theorique import drop_duplicates_heure_theorique
+from offre_realisee.domain.entities.group_offre_realisee_by_stop import (
+    prepare_offre_realisee_by_stop, group_prepared_offre_realisee_by_stop)
+from offre_realisee.domain.entities.ponctualite.compute_ponctualite_stat_from_dataframe import (
+    compute_ponctualite_stat_from_stops)
+from offre_realisee.domain.entities.ponctualite.pandas_datetime_series_to_unix_timestamp_seconds import (
+    pandas_datetime_series_to_unix_timestamp_seconds)
+from offre_realisee.domain.entities.ponctualite.process_stop_ponctualite import compute_cost_matrix
+from offre_realisee.domain.entities.ponctualite.solve_assignment import solve_assignment
+from offre_realisee.domain.entities.regularite.compute_regularite_stat_from_dataframe import (
+    compute_regularite_stat_from_prepared_dataframe)
+from offre_realisee.domain.entities.regularite.process_stop_regularite import process_stop_regularite
+from offre_realisee.domain.usecases.aggregate_mesure_qs import aggregate_mesure_qs_by_levels
+from offre_realisee.infrastructure.local_file_system_handler import LocalFileSystemHandler
+from tests.test_benchmark.benchmark_baseline import measure
+from tests.test_benchmark.synthetic_offre_realisee import (
+    generate_daily_offre_realisee, write_synthetic_offre_realisee)
+from tests.test_data import TEST_DATA_PATH
+
+# Journée type : 20 lignes dont la moitié en haute fréquence, 1000 arrêts, 40 000 passages
+SYNTHETIC_DAY = {
+    'n_lignes': 20, 'n_arrets': 25, 'n_passages': 40, 'haute_frequence_rate': 0.5, 'duplicate_rate': 0.02
+}
+AGGREGATION_DATES = [date(2023, 9, 1) + timedelta(days=day) for day in range(28)]
+
+
+@pytest.fixture(scope='module')
+def df_offre_realisee():
+    return generate_daily_offre_realisee(**SYNTHETIC_DAY)
+
+
+@pytest.fixture(scope='module')
+def df_offre_realisee_by_stop(df_offre_realisee):
+    return prepare_offre_realisee_by_stop(df_offre_realisee)
+
+
+@pytest.fixture(scope='module')
+def stops(df_offre_realisee_by_stop):
+    return group_prepared_offre_realisee_by_stop(df_offre_realisee_by_stop)
+
+
+@pytest.fixture(scope='module')
+def stops_ponctualite(stops):
+    # Mêmes entrées que compute_cost_matrix dans process_stop_ponctualite
+    stops_ponctualite = []
+    for _, df_by_stop in stops:
+        heure_reelle = df_by_stop[MesurePonctualite.heure_reelle].copy()
+        df_by_stop = (
+            df_by_stop.dropna(subset=[MesurePonctualite.heure_theorique])
+            .sort_values(by=[MesurePonctualite.heure_theorique]).reset_index(drop=True)
+        )
+        df_by_stop[MesurePonctualite.difference_theorique] = (
+            pandas_datetime_series_to_unix_timestamp_seconds(df_by_stop[MesurePonctualite.heure_theorique])
+            .diff(1).shift(-1)
+        )
+        stops_ponctualite.append((df_by_stop, heure_reelle))
+    return stops_ponctualite
+
+
+def _file_system_handler(data_path: str) -> LocalFileSystemHandler:
+    return LocalFileSystemHandler(
+        data_path=data_path, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet'
+    )
+
+
+def _copy_calendrier_scolaire(data_path: str) -> None:
+    os.makedirs(os.path.join(data_path, 'input'), exist_ok=True)
+    shutil.copy(os.path.join(TEST_DATA_PATH, 'input', 'calendrier_scolaire.parquet'), os.path.join(data_path, 'input'))
+
+
+@pytest.mark.benchmark
+def test_benchmark_add_frequency(benchmark_recorder, df_offre_realisee):
+    # Given
+    df_without_duplicates = drop_duplicates_heure_theorique(df_offre_realisee)
+
+    # When
+    seconds = measure(lambda: add_frequency_by_stop(df_without_duplicates))
+
+    # Then
+    benchmark_recorder.record('add_frequency_by_stop', seconds)
+
+
+@pytest.mark.benchmark
+def test_benchmark_compute_cost_matrix(benchmark_recorder, stops_ponctualite):
+    # When
+    seconds = measure(lambda: [
+        compute_cost_matrix(df_by_stop, heure_reelle) for df_by_stop, heure_reelle in stops_ponctualite])
+
+    # Then
+    benchmark_recorder.record('compute_cost_matrix', seconds)
+
+
+@pytest.mark.benchmark
+def test_benchmark_linear_sum_assignment(benchmark_recorder, stops_ponctualite):
+    # Given
+    cost_matrices = [compute_cost_matrix(df_by_stop, heure_reelle) for df_by_stop, heure_reelle in stops_ponctualite]
+
+    # When
+    seconds = measure(lambda: [solve_assignment(cost_matrix) for cost_matrix in cost_matrices])
+
+    # Then
+    benchmark_recorder.record('linear_sum_assignment', seconds)
+
+
+@pytest.mark.benchmark
+def test_benchmark_process_stop_regularite(benchmark_recorder, stops):
+    # When
+    seconds = measure(lambda: [process_stop_regularite(df_by_stop) for _, df_by_stop in stops])
+
+    # Then
+    benchmark_recorder.record('process_stop_regularite', seconds)
+
+
+@pytest.mark.benchmark
+def test_benchmark_compute_ponctualite_stat(benchmark_recorder, stops):
+    # When
+    seconds = measure(lambda: compute_ponctualite_stat_from_stops(stops=stops), repeat=1)
+
+    # Then
+    benchmark_recorder.record('compute_ponctualite_stat_from_stops', seconds)
+
+
+@pytest.mark.benchmark
+def test_benchmark_compute_regularite_stat(benchmark_recorder, df_offre_realisee_by_stop):
+    # When
+    seconds = measure(
+        lambda: compute_regularite_stat_from_prepared_dataframe(df_offre_realisee_by_stop=df_offre_realisee_by_stop))
+
+    # Then
+    benchmark_recorder.record('compute_regularite_stat_from_prepared_dataframe', seconds)
+
+
+@pytest.mark.benchmark
+def test_benchmark_aggregate_mesure_qs(benchmark_recorder, tmp_path, stops):
+    # Given
+    data_path = str(tmp_path)
+    _copy_calendrier_scolaire(data_path)
+    file_system_handler = _file_system_handler(data_path)
+    df_mesure_qs = compute_ponctualite_stat_from_stops(stops=stops)
+    for day in AGGREGATION_DATES:
+        file_system_handler.save_daily_mesure_qs(
+            df_mesure_qs=df_mesure_qs, date=day, dsp='', mesure_type=MesureType.ponctualite)
+
+    # When
+    seconds = measure(lambda: aggregate_mesure_qs_by_levels(
+        file_system_handler, (AGGREGATION_DATES[0], AGGREGATION_DATES[-1]), dsp='',
+        aggregation_levels=[AggregationLevel.by_period, AggregationLevel.by_period_weekdays],
+        mesure_type=MesureType.ponctualite, periode_ete=(date(2023, 7, 1), date(2023, 8, 31))))
+
+    # Then
+    benchmark_recorder.record('aggregate_mesure_qs_by_levels', seconds)
+
+
+@pytest.mark.benchmark
+def test_benchmark_compute_qs_day(benchmark_recorder, tmp_path):
+    # Given
+    data_path = str(tmp_path)
+    _copy_calendrier_scolaire(data_path)
+    day = date(2023, 9, 27)
+    write_synthetic_offre_realisee(
+        os.path.join(data_path, 'input', 'offre_realisee.parquet'), dates=[day], **SYNTHETIC_DAY)
+
+    # When
+    seconds = measure(lambda: compute_qs(
+        telecharge_calendrier_scolaire=False, mesure=True, aggregation=True, ponctualite=True, regularite=True,
+        data_path=data_path, start_date=day, end_date=day, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet',
+        periode_ete_start_date=date(2023, 7, 1), periode_ete_end_date=date(2023, 8, 31),
+        list_journees_exceptionnelles=None, n_thread=1), repeat=1)
+
+    # Then
+    assert not pd.read_csv(os.path.join(
+        data_path, 'output', MesureType.ponctualite, 'mesure_ponctualite_2023_09_27.csv')).empty
+    benchmark_recorder.record('compute_qs_day', seconds)
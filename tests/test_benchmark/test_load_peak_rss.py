@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import pytest
+
+from offre_realisee.infrastructure.local_file_system_handler import LocalFileSystemHandler
+from offre_realisee.infrastructure.local_process_memory_handler import LocalProcessMemoryHandler
+from tests.test_benchmark.synthetic_offre_realisee import write_synthetic_offre_realisee
+
+# Grosse journée : 100 lignes, 10 000 arrêts, 2 000 000 passages
+LARGE_DAY = {'n_lignes': 100, 'n_arrets': 50, 'n_passages': 200}
+DAY = date(2023, 9, 27)
+# Le chargement aux types compacts doit au moins diviser par deux le pic de mémoire du chargement
+MAX_PEAK_RSS_RATIO = 0.5
+
+
+def _load_peak_rss(data_path: str, compact: bool) -> tuple[int, int]:
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=data_path, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet'
+    )
+    local_process_memory_handler = LocalProcessMemoryHandler()
+    if not local_process_memory_handler.reset_peak_rss():
+        return 0, 0
+    rss_before, _ = local_process_memory_handler.get_rss()
+
+    if compact:
+        df_offre_realisee = local_file_system_handler.get_daily_offre_realisee(date=DAY)
+    else:
+        # Chargement sans conversion, avec une chaîne Python par identifiant et par passage
+        df_offre_realisee = local_file_system_handler.get_daily_offre_realisee_table(date=DAY).to_pandas()
+
+    _, peak_rss = local_process_memory_handler.get_rss()
+    return peak_rss - rss_before, len(df_offre_realisee)
+
+
+def _measure_load_peak_rss(data_path: str, compact: bool) -> tuple[int, int]:
+    # Chaque chargement est mesuré dans un nouveau processus, sans la mémoire conservée des chargements précédents
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_load_peak_rss, data_path, compact).result()
+
+
+@pytest.mark.benchmark
+def test_benchmark_load_peak_rss(tmp_path):
+    # Given
+    data_path = str(tmp_path)
+    write_synthetic_offre_realisee(os.path.join(data_path, 'input', 'offre_realisee.parquet'), dates=[DAY], **LARGE_DAY)
+
+    # When
+    plain_peak_rss, plain_n_passages = _measure_load_peak_rss(data_path, compact=False)
+    compact_peak_rss, compact_n_passages = _measure_load_peak_rss(data_path, compact=True)
+
+    # Then
+    if plain_n_passages == 0:
+        pytest.skip("The peak RSS of a process cannot be reset on this system")
+    assert compact_n_passages == plain_n_passages == 2_000_000
+    assert compact_peak_rss <= plain_peak_rss * MAX_PEAK_RSS_RATIO, (
+        f"peak RSS {compact_peak_rss / 1024 ** 2:.0f} MB, {plain_peak_rss / 1024 ** 2:.0f} MB without compact types")
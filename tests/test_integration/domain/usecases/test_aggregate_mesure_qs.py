@@ -6,8 +6,14 @@ from typing import Optional
 import pandas as pd
 import pytest
 
-from offre_realisee import AggregationLevel, MesureType, LocalFileSystemHandler, \
-    aggregate_mesure_qs, FileExtensions
+from offre_realisee import AggregationLevel, MesureType, LocalFileSystemHandler, aggregate_mesure_qs_by_levels, \
+    FileExtensions, compute_qs
+from offre_realisee.config.aggregation_config import PartialSums
+from offre_realisee.domain.usecases.aggregate_mesure_qs import aggregate_mesure_qs
+from offre_realisee.domain.entities.run_manifest import build_aggregation_manifest_entry
+from offre_realisee.domain.usecases.run_incremental_date_range import run_incremental_aggregation
+from offre_realisee.infrastructure.local_file_system_handler import PARTIAL_SUMS_FOLDER, RUN_MANIFEST_FILE_NAME
+from tests.test_benchmark.synthetic_offre_realisee import write_synthetic_offre_realisee
 from tests.test_data import TEST_DATA_PATH
 
 
@@ -156,3 +162,275 @@ def test_def_aggregate_mesure_qs_regularite_by_periode(file_system_rm_agg_by_per
 
     assert f"mesure_{mesure_type}_2023_ete" + FileExtensions.csv in result_clean
     assert f"mesure_{mesure_type}_2023_vacances_scolaires" + FileExtensions.csv in result_clean
+
+
+@pytest.fixture
+def file_system_rm_agg_by_year_and_month_fixture():
+    yield
+    shutil.rmtree(os.path.join(RESULT_PATH, AggregationLevel.by_year))
+    shutil.rmtree(os.path.join(RESULT_PATH, AggregationLevel.by_month))
+
+
+def test_aggregate_mesure_qs_by_levels_same_result_as_aggregate_mesure_qs(
+        file_system_rm_agg_by_year_and_month_fixture, monkeypatch):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path=TEST_DATA_PATH_CONFIG['input_path'],
+        output_path=TEST_DATA_PATH_CONFIG['output_path'],
+        input_file_name=TEST_DATA_PATH_CONFIG['input_file_name'],
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name']
+    )
+    date_range: tuple[date, date] = (date(2023, 9, 30), date(2023, 10, 1))
+    aggregation_levels = [AggregationLevel.by_year, AggregationLevel.by_month]
+    mesure_type: MesureType = MesureType.ponctualite
+    periode_ete: tuple[str] = (date(2023, 7, 1), date(2023, 8, 31))
+
+    def read_aggregations() -> dict[str, pd.DataFrame]:
+        return {
+            file_name: pd.read_csv(os.path.join(RESULT_PATH, aggregation_level, mesure_type, file_name))
+            for aggregation_level in aggregation_levels
+            for file_name in os.listdir(os.path.join(RESULT_PATH, aggregation_level, mesure_type))
+        }
+
+    for aggregation_level in aggregation_levels:
+        aggregate_mesure_qs(local_file_system_handler, date_range, '', aggregation_level, mesure_type, periode_ete)
+    expected_result = read_aggregations()
+
+    read_dates = []
+    get_daily_mesure_qs = local_file_system_handler.get_daily_mesure_qs
+
+    def spy_get_daily_mesure_qs(date, **kwargs):
+        read_dates.append(date)
+        return get_daily_mesure_qs(date=date, **kwargs)
+
+    monkeypatch.setattr(local_file_system_handler, 'get_daily_mesure_qs', spy_get_daily_mesure_qs)
+
+    # When
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete)
+
+    # Then
+    result = read_aggregations()
+    assert read_dates == [date(2023, 9, 30), date(2023, 10, 1)]
+    assert result.keys() == expected_result.keys() == {
+        f"mesure_{mesure_type}_2023" + FileExtensions.csv,
+        f"mesure_{mesure_type}_2023_09" + FileExtensions.csv,
+        f"mesure_{mesure_type}_2023_10" + FileExtensions.csv,
+    }
+    for file_name in expected_result:
+        pd.testing.assert_frame_equal(result[file_name], expected_result[file_name])
+
+
+
+@pytest.fixture
+def file_system_rm_agg_and_partial_sums_fixture():
+    yield
+    shutil.rmtree(os.path.join(RESULT_PATH, AggregationLevel.by_year))
+    shutil.rmtree(os.path.join(RESULT_PATH, AggregationLevel.by_month))
+    shutil.rmtree(os.path.join(RESULT_PATH, PARTIAL_SUMS_FOLDER))
+
+
+def test_aggregate_mesure_qs_by_levels_from_partial_sums(file_system_rm_agg_and_partial_sums_fixture, monkeypatch):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path=TEST_DATA_PATH_CONFIG['input_path'],
+        output_path=TEST_DATA_PATH_CONFIG['output_path'],
+        input_file_name=TEST_DATA_PATH_CONFIG['input_file_name'],
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name']
+    )
+    date_range: tuple[date, date] = (date(2023, 9, 30), date(2023, 10, 1))
+    aggregation_levels = [AggregationLevel.by_year, AggregationLevel.by_month]
+    mesure_type: MesureType = MesureType.ponctualite
+    periode_ete: tuple[str] = (date(2023, 7, 1), date(2023, 8, 31))
+    list_journees_exceptionnelles = [date(2023, 10, 1)]
+
+    def read_aggregations() -> dict[str, pd.DataFrame]:
+        return {
+            file_name: pd.read_csv(os.path.join(RESULT_PATH, aggregation_level, mesure_type, file_name))
+            for aggregation_level in aggregation_levels
+            for file_name in os.listdir(os.path.join(RESULT_PATH, aggregation_level, mesure_type))
+        }
+
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete)
+    expected_result = read_aggregations()
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete, list_journees_exceptionnelles)
+    expected_result_without_exceptionnelles = read_aggregations()
+
+    read_dates = []
+    get_mesure_qs_by_dates = local_file_system_handler.get_mesure_qs_by_dates
+
+    def spy_get_mesure_qs_by_dates(dates, **kwargs):
+        read_dates.append(dates)
+        return get_mesure_qs_by_dates(dates=dates, **kwargs)
+
+    monkeypatch.setattr(local_file_system_handler, 'get_mesure_qs_by_dates', spy_get_mesure_qs_by_dates)
+
+    # When
+    # Construction des sommes partielles
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete, updated_dates=[])
+    result = read_aggregations()
+    # Mise à jour d'un jour
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete, updated_dates=[date(2023, 10, 1)])
+    updated_result = read_aggregations()
+    # Exclusion d'une journée exceptionnelle, sans relecture
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete, list_journees_exceptionnelles, updated_dates=[])
+    result_without_exceptionnelles = read_aggregations()
+    # Une agrégation complète invalide l'index des jours, chaque jour est relu à la mise à jour suivante
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete)
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete, updated_dates=[])
+
+    # Then
+    assert read_dates == [
+        [date(2023, 9, 30), date(2023, 10, 1)], [date(2023, 10, 1)],
+        [date(2023, 9, 30), date(2023, 10, 1)], [date(2023, 9, 30), date(2023, 10, 1)]]
+    # Les scores des mesures journalières de test sont entiers, les sommes partielles produisent des scores décimaux
+    for file_name in expected_result:
+        pd.testing.assert_frame_equal(result[file_name], expected_result[file_name], check_dtype=False)
+        pd.testing.assert_frame_equal(updated_result[file_name], expected_result[file_name], check_dtype=False)
+        pd.testing.assert_frame_equal(
+            result_without_exceptionnelles[file_name], expected_result_without_exceptionnelles[file_name],
+            check_dtype=False)
+
+
+@pytest.fixture
+def file_system_rm_agg_partial_sums_and_manifest_fixture():
+    yield
+    shutil.rmtree(os.path.join(RESULT_PATH, AggregationLevel.by_year))
+    shutil.rmtree(os.path.join(RESULT_PATH, AggregationLevel.by_month))
+    shutil.rmtree(os.path.join(RESULT_PATH, PARTIAL_SUMS_FOLDER))
+    for file_name in os.listdir(RESULT_PATH):
+        if file_name.startswith(RUN_MANIFEST_FILE_NAME):
+            os.remove(os.path.join(RESULT_PATH, file_name))
+
+
+def test_run_incremental_aggregation_excludes_journee_exceptionnelle_by_subtraction(
+        file_system_rm_agg_partial_sums_and_manifest_fixture, monkeypatch):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path=TEST_DATA_PATH_CONFIG['input_path'],
+        output_path=TEST_DATA_PATH_CONFIG['output_path'],
+        input_file_name=TEST_DATA_PATH_CONFIG['input_file_name'],
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name']
+    )
+    date_range = (date(2023, 9, 30), date(2023, 10, 1))
+    periode_ete = (date(2023, 7, 1), date(2023, 8, 31))
+    aggregation_levels = [AggregationLevel.by_year, AggregationLevel.by_month]
+    mesure_type = MesureType.ponctualite
+    entry = build_aggregation_manifest_entry(aggregation_levels)
+    year_file_path = os.path.join(
+        RESULT_PATH, AggregationLevel.by_year, mesure_type, f"mesure_{mesure_type}_2023" + FileExtensions.csv)
+
+    aggregate_mesure_qs_by_levels(local_file_system_handler, date_range, '', aggregation_levels, mesure_type,
+                                  periode_ete, [date(2023, 10, 1)])
+    expected_year_result = pd.read_csv(year_file_path)
+
+    def run(list_journees_exceptionnelles: Optional[list[date]]) -> None:
+        run_incremental_aggregation(
+            local_file_system_handler, dsp='', mesure_type=mesure_type, entry=entry,
+            aggregate=lambda dates: aggregate_mesure_qs_by_levels(
+                local_file_system_handler, date_range, '', aggregation_levels, mesure_type, periode_ete,
+                list_journees_exceptionnelles, updated_dates=dates),
+            updated_dates=[])
+
+    # Sans manifeste, les sommes partielles sont construites à partir de toutes les mesures journalières
+    run(None)
+
+    read_dates, read_partial_sums, saved_suffixes = [], [], []
+    get_mesure_qs_by_dates = local_file_system_handler.get_mesure_qs_by_dates
+    get_partial_sums = local_file_system_handler.get_partial_sums
+    save_mesure_qs_by_aggregation = local_file_system_handler.save_mesure_qs_by_aggregation
+
+    def spy_get_mesure_qs_by_dates(dates, **kwargs):
+        read_dates.append(dates)
+        return get_mesure_qs_by_dates(dates=dates, **kwargs)
+
+    def spy_get_partial_sums(name, **kwargs):
+        read_partial_sums.append(name)
+        return get_partial_sums(name=name, **kwargs)
+
+    def spy_save_mesure_qs_by_aggregation(suffix, **kwargs):
+        saved_suffixes.append(suffix)
+        return save_mesure_qs_by_aggregation(suffix=suffix, **kwargs)
+
+    monkeypatch.setattr(local_file_system_handler, 'get_mesure_qs_by_dates', spy_get_mesure_qs_by_dates)
+    monkeypatch.setattr(local_file_system_handler, 'get_partial_sums', spy_get_partial_sums)
+    monkeypatch.setattr(local_file_system_handler, 'save_mesure_qs_by_aggregation', spy_save_mesure_qs_by_aggregation)
+
+    # When
+    run([date(2023, 10, 1)])
+
+    # Then
+    # Aucune mesure journalière n'est relue : seule la contribution de la journée exclue est retirée, des agrégations
+    # qui la contenaient
+    assert read_dates == []
+    daily_partial_sums_read = [name for name in read_partial_sums if name.startswith(f"{PartialSums.jours}/2023-")]
+    assert len(daily_partial_sums_read) == 1
+    assert daily_partial_sums_read[0].startswith(f"{PartialSums.jours}/2023-10-01_")
+    assert saved_suffixes == ['2023']
+    # Les scores des mesures journalières de test sont entiers, les sommes partielles produisent des scores décimaux
+    pd.testing.assert_frame_equal(pd.read_csv(year_file_path), expected_year_result, check_dtype=False)
+
+
+def _compute_qs_window(data_path: str, start_date: date, end_date: date, incremental: bool) -> None:
+    compute_qs(
+        telecharge_calendrier_scolaire=False, mesure=True, aggregation=True, ponctualite=True, regularite=True,
+        data_path=data_path, start_date=start_date, end_date=end_date, input_path='input', output_path='output',
+        input_file_name=TEST_DATA_PATH_CONFIG['input_file_name'],
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name'],
+        periode_ete_start_date=date(2023, 7, 1), periode_ete_end_date=date(2023, 8, 31),
+        list_journees_exceptionnelles=None, n_thread=1, incremental=incremental)
+
+
+def _write_synthetic_input(data_path: str, dates: list[date]) -> None:
+    write_synthetic_offre_realisee(
+        os.path.join(data_path, 'input', TEST_DATA_PATH_CONFIG['input_file_name']), dates=dates, n_lignes=2,
+        n_arrets=4, n_passages=20, haute_frequence_rate=0.5)
+    shutil.copy(os.path.join(TEST_DATA_PATH, 'input', TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name']),
+                os.path.join(data_path, 'input'))
+
+
+def test_compute_qs_incremental_rolling_window_reads_only_new_days(tmp_path, monkeypatch):
+    # Given
+    dates = [date(2023, 9, 25), date(2023, 9, 26), date(2023, 9, 27), date(2023, 9, 28)]
+    incremental_data_path, full_data_path = str(tmp_path / 'incremental'), str(tmp_path / 'full')
+    for data_path in [incremental_data_path, full_data_path]:
+        _write_synthetic_input(data_path, dates)
+    _compute_qs_window(full_data_path, dates[1], dates[3], incremental=False)
+    _compute_qs_window(incremental_data_path, dates[0], dates[2], incremental=True)
+
+    read_dates = []
+    get_mesure_qs_by_dates = LocalFileSystemHandler.get_mesure_qs_by_dates
+
+    def spy_get_mesure_qs_by_dates(self, dates, **kwargs):
+        read_dates.append(dates)
+        return get_mesure_qs_by_dates(self, dates=dates, **kwargs)
+
+    monkeypatch.setattr(LocalFileSystemHandler, 'get_mesure_qs_by_dates', spy_get_mesure_qs_by_dates)
+
+    # When
+    # Fenêtre glissante : la fenêtre avance d'un jour
+    _compute_qs_window(incremental_data_path, dates[1], dates[3], incremental=True)
+
+    # Then
+    # Seul le nouveau jour est lu, pour chaque type de mesure : le jour sorti de la fenêtre est retiré des sommes
+    # partielles
+    assert read_dates == [[dates[3]], [dates[3]]]
+    for aggregation_level in [AggregationLevel.by_period, AggregationLevel.by_period_weekdays]:
+        for mesure_type in [MesureType.ponctualite, MesureType.regularite]:
+            folder_path = os.path.join(aggregation_level, mesure_type)
+            file_names = os.listdir(os.path.join(full_data_path, 'output', folder_path))
+            assert file_names
+            for file_name in file_names:
+                pd.testing.assert_frame_equal(
+                    pd.read_csv(os.path.join(incremental_data_path, 'output', folder_path, file_name)),
+                    pd.read_csv(os.path.join(full_data_path, 'output', folder_path, file_name)), check_dtype=False)
@@ -0,0 +1,247 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.config.metrics_config import MetricName
+from offre_realisee.config.offre_realisee_config import MesureType
+from offre_realisee.domain.usecases.create_mesure_qs_by_ligne import plan_mesure_qs_by_ligne
+from offre_realisee.domain.usecases.create_mesure_qs_ponctualite_regularite import (
+    create_mesure_qs_ponctualite_regularite, create_mesure_qs_ponctualite_regularite_date_range)
+from offre_realisee.domain.usecases.worker_pool import WorkerPool
+from offre_realisee.infrastructure.local_file_system_handler import LocalFileSystemHandler, METRICS_FOLDER
+from tests.test_benchmark.synthetic_offre_realisee import write_synthetic_offre_realisee
+from tests.test_data import TEST_DATA_PATH
+
+START_DATE = datetime(2023, 9, 27)
+END_DATE = datetime(2023, 9, 28)
+
+
+def _mesure_file_name(mesure_type: MesureType, date: datetime) -> str:
+    return f"mesure_{mesure_type}_{date.strftime('%Y_%m_%d')}" + FileExtensions.csv
+
+
+@pytest.fixture
+def multi_ligne_data_path(tmp_path):
+    # Trois lignes qui partagent leurs arrêts : la ligne 151 n'a aucune heure réelle à un arrêt desservi en temps
+    # réel par les autres lignes, et la ligne 152 dessert un arrêt qui n'a d'heure réelle sur aucune ligne.
+    df_offre_realisee = pd.read_parquet(os.path.join(TEST_DATA_PATH, 'input', 'offre_realisee.parquet'))
+    first_arret = df_offre_realisee[InputColumns.arret].iloc[0]
+
+    df_ligne_151 = df_offre_realisee.copy()
+    df_ligne_151[InputColumns.ligne] = '151'
+    df_ligne_151[InputColumns.heure_reelle] = df_ligne_151[InputColumns.heure_reelle] + pd.Timedelta(minutes=2)
+    df_ligne_151.loc[df_ligne_151[InputColumns.arret] == first_arret, InputColumns.heure_reelle] = pd.NaT
+
+    df_ligne_152 = df_offre_realisee.iloc[::3].copy()
+    df_ligne_152[InputColumns.ligne] = '152'
+    df_ligne_152.loc[df_ligne_152[InputColumns.arret] == first_arret, InputColumns.arret] = 'ARRET_SANS_TEMPS_REEL'
+    df_ligne_152.loc[df_ligne_152[InputColumns.arret] == 'ARRET_SANS_TEMPS_REEL', InputColumns.heure_reelle] = pd.NaT
+
+    os.makedirs(tmp_path / 'input')
+    pd.concat([df_ligne_152, df_offre_realisee, df_ligne_151], ignore_index=True).to_parquet(
+        tmp_path / 'input' / 'offre_realisee.parquet')
+    shutil.copy(os.path.join(TEST_DATA_PATH, 'input', 'calendrier_scolaire.parquet'), tmp_path / 'input')
+    os.makedirs(tmp_path / 'shared')
+
+    yield str(tmp_path)
+
+
+def _file_system_handler(data_path: str, output_path: str) -> LocalFileSystemHandler:
+    return LocalFileSystemHandler(
+        data_path=data_path, input_path='input', output_path=output_path,
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet',
+        shared_memory_path=os.path.join(data_path, 'shared')
+    )
+
+
+def test_plan_mesure_qs_by_ligne(multi_ligne_data_path):
+    # Given
+    local_file_system_handler = _file_system_handler(multi_ligne_data_path, 'output')
+
+    # When
+    plan = plan_mesure_qs_by_ligne(file_system_handler=local_file_system_handler, date=START_DATE)
+
+    # Then
+    assert set(plan['slices_by_ligne']) == {'150', '151', '152'}
+    assert sum(length for _, length in plan['slices_by_ligne'].values()) == plan['n_passages']
+    assert plan['arrets_without_real_time'] == ['ARRET_SANS_TEMPS_REEL']
+
+    offset, length = plan['slices_by_ligne']['151']
+    df_shared_ligne = local_file_system_handler.get_shared_offre_realisee(
+        shared_offre_realisee=plan['shared_offre_realisee'], offset=offset, length=length)
+    pd.testing.assert_frame_equal(
+        df_shared_ligne, local_file_system_handler.get_daily_offre_realisee(date=START_DATE, ligne='151'))
+
+    local_file_system_handler.release_shared_offre_realisee(plan['shared_offre_realisee'])
+    assert not os.path.exists(plan['shared_offre_realisee'])
+
+
+def test_create_mesure_qs_by_ligne_same_result_as_full_day(multi_ligne_data_path):
+    # Given
+    by_ligne_file_system_handler = _file_system_handler(multi_ligne_data_path, 'output_by_ligne')
+    full_day_file_system_handler = _file_system_handler(multi_ligne_data_path, 'output_full_day')
+
+    # When
+    create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=by_ligne_file_system_handler, date_range=(START_DATE, END_DATE), n_thread=2)
+    for date in [START_DATE, END_DATE]:
+        create_mesure_qs_ponctualite_regularite(file_system_handler=full_day_file_system_handler, date=date)
+
+    # Then
+    # Les journées partagées sont libérées
+    assert os.listdir(os.path.join(multi_ligne_data_path, 'shared')) == []
+    for mesure_type in [MesureType.ponctualite, MesureType.regularite]:
+        for date in [START_DATE, END_DATE]:
+            result = pd.read_csv(os.path.join(
+                multi_ligne_data_path, 'output_by_ligne', mesure_type, _mesure_file_name(mesure_type, date)))
+            expected_result = pd.read_csv(os.path.join(
+                multi_ligne_data_path, 'output_full_day', mesure_type, _mesure_file_name(mesure_type, date)))
+
+            assert set(result[InputColumns.ligne].astype(str)) == {'150', '151', '152'}
+            pd.testing.assert_frame_equal(result, expected_result)
+
+
+def test_create_mesure_qs_by_ligne_with_metrics(multi_ligne_data_path):
+    # Given
+    metrics_file_system_handler = _file_system_handler(multi_ligne_data_path, 'output_metrics')
+    full_day_file_system_handler = _file_system_handler(multi_ligne_data_path, 'output_full_day')
+    n_passages = plan_mesure_qs_by_ligne(file_system_handler=full_day_file_system_handler, date=START_DATE)['n_passages']
+
+    # When
+    create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=metrics_file_system_handler, date_range=(START_DATE, START_DATE), n_thread=2,
+        metrics=True)
+    create_mesure_qs_ponctualite_regularite(file_system_handler=full_day_file_system_handler, date=START_DATE)
+
+    # Then
+    # Les mesures sont inchangées
+    for mesure_type in [MesureType.ponctualite, MesureType.regularite]:
+        pd.testing.assert_frame_equal(
+            pd.read_csv(os.path.join(
+                multi_ligne_data_path, 'output_metrics', mesure_type, _mesure_file_name(mesure_type, START_DATE))),
+            pd.read_csv(os.path.join(
+                multi_ligne_data_path, 'output_full_day', mesure_type, _mesure_file_name(mesure_type, START_DATE))))
+
+    with open(os.path.join(multi_ligne_data_path, 'output_metrics', METRICS_FOLDER,
+                           f"metrics_{START_DATE.strftime('%Y_%m_%d')}" + FileExtensions.jsonl)) as metrics_file:
+        metrics_lines = metrics_file.readlines()
+    assert len(metrics_lines) == 1
+
+    metrics = json.loads(metrics_lines[0])
+    assert metrics['jour'] == START_DATE.strftime('%Y-%m-%d')
+    assert metrics['units'] == 3
+    assert metrics['counters'][MetricName.rows_read] == n_passages
+    assert metrics['counters'][MetricName.stops_processed] > 0
+    assert metrics['counters'][MetricName.matrix_cells_scored] >= metrics['counters'][MetricName.assigned_pairs]
+    assert metrics['maxima'][MetricName.assignment_max_size] > 0
+    # Une lecture de la journée pour le découpage, puis une lecture de la tranche partagée par ligne
+    assert metrics['timings'][MetricName.read]['calls'] == 4
+    # Une écriture par type de mesure
+    assert metrics['timings'][MetricName.write]['calls'] == 2
+    for name in [MetricName.drop_duplicates_heure_theorique, MetricName.add_frequency, MetricName.cost_matrix,
+                 MetricName.assignment, MetricName.stat_ponctualite, MetricName.process_day_regularite]:
+        assert metrics['timings'][name]['seconds'] >= 0
+
+
+class _RecordingWorkerPool(WorkerPool):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recorded_tasks = []
+
+    def map(self, function, tasks, costs=None, task_kind="", on_result=None):
+        self.recorded_tasks.append((task_kind, tasks, costs))
+        return super().map(function, tasks, costs=costs, task_kind=task_kind, on_result=on_result)
+
+
+def test_create_mesure_qs_by_ligne_largest_first(tmp_path):
+    # Given
+    # Le deuxième jour a le plus de passages, le premier le moins
+    n_passages_by_date = {datetime(2023, 9, 25): 10, datetime(2023, 9, 26): 30, datetime(2023, 9, 27): 20}
+    for date, n_passages in n_passages_by_date.items():
+        write_synthetic_offre_realisee(
+            str(tmp_path / 'input' / 'offre_realisee.parquet'), dates=[date.date()], n_lignes=3, n_arrets=4,
+            n_passages=n_passages)
+    os.makedirs(tmp_path / 'shared')
+    local_file_system_handler = _file_system_handler(str(tmp_path), 'output')
+
+    # When
+    with _RecordingWorkerPool(file_system_handler=local_file_system_handler, n_thread=2) as worker_pool:
+        create_mesure_qs_ponctualite_regularite_date_range(
+            file_system_handler=local_file_system_handler, date_range=(datetime(2023, 9, 25), datetime(2023, 9, 27)),
+            worker_pool=worker_pool)
+
+    # Then
+    (_, plan_tasks, plan_costs), (_, unit_tasks, unit_costs) = worker_pool.recorded_tasks
+    assert [task['date'] for task in plan_tasks] == [
+        datetime(2023, 9, 26), datetime(2023, 9, 27), datetime(2023, 9, 25)]
+    assert plan_costs == sorted(plan_costs, reverse=True)
+    assert unit_costs == sorted(unit_costs, reverse=True)
+    assert len(unit_tasks) == 9
+    for date in n_passages_by_date:
+        assert os.path.exists(os.path.join(
+            tmp_path, 'output', MesureType.ponctualite, _mesure_file_name(MesureType.ponctualite, date)))
+
+
+class _SharedFilesWorkerPool(WorkerPool):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shared_files_after_unit = []
+
+    def map(self, function, tasks, costs=None, task_kind="", on_result=None):
+        if task_kind != 'unit':
+            return super().map(function, tasks, costs=costs, task_kind=task_kind, on_result=on_result)
+
+        def record_shared_files(position, result):
+            on_result(position, result)
+            self.shared_files_after_unit.append(len(os.listdir(self.file_system_handler.shared_memory_path)))
+        return super().map(function, tasks, costs=costs, task_kind=task_kind, on_result=record_shared_files)
+
+
+def test_create_mesure_qs_by_ligne_releases_each_day_once_computed(multi_ligne_data_path):
+    # Given
+    local_file_system_handler = _file_system_handler(multi_ligne_data_path, 'output')
+
+    # When
+    with _SharedFilesWorkerPool(file_system_handler=local_file_system_handler, n_thread=2) as worker_pool:
+        create_mesure_qs_ponctualite_regularite_date_range(
+            file_system_handler=local_file_system_handler, date_range=(START_DATE, END_DATE),
+            worker_pool=worker_pool)
+
+    # Then
+    # Chaque journée est libérée à la fin de sa dernière unité, sans attendre les unités des autres journées
+    assert worker_pool.shared_files_after_unit[0] == 2
+    assert worker_pool.shared_files_after_unit == sorted(worker_pool.shared_files_after_unit, reverse=True)
+    assert worker_pool.shared_files_after_unit[-1] == 0
+
+
+class _FailingPlanFileSystemHandler(LocalFileSystemHandler):
+
+    def get_daily_offre_realisee_table(self, date, dsp="", ligne=""):
+        if date == END_DATE:
+            raise ValueError("Unreadable day")
+        return super().get_daily_offre_realisee_table(date=date, dsp=dsp, ligne=ligne)
+
+
+def test_create_mesure_qs_by_ligne_releases_shared_days_on_plan_failure(multi_ligne_data_path):
+    # Given
+    failing_file_system_handler = _FailingPlanFileSystemHandler(
+        data_path=multi_ligne_data_path, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet',
+        shared_memory_path=os.path.join(multi_ligne_data_path, 'shared')
+    )
+
+    # When
+    with pytest.raises(ValueError):
+        create_mesure_qs_ponctualite_regularite_date_range(
+            file_system_handler=failing_file_system_handler, date_range=(START_DATE, END_DATE), n_thread=1)
+
+    # Then
+    assert os.listdir(os.path.join(multi_ligne_data_path, 'shared')) == []
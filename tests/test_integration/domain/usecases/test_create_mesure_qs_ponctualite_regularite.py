@@ -0,0 +1,149 @@
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.config.offre_realisee_config import MesureType, AssignmentSolver
+from offre_realisee.domain.usecases.create_mesure_qs_ponctualite_regularite import (
+    create_mesure_qs_ponctualite_regularite, create_mesure_qs_ponctualite_regularite_date_range)
+from tests.test_data import TEST_DATA_PATH
+from offre_realisee.infrastructure.local_file_system_handler import LocalFileSystemHandler
+
+TEST_DATA_PATH_CONFIG = {
+    'input_path': 'input',
+    'output_path': 'output',
+    'input_file_name': f'offre_realisee{FileExtensions.parquet}',
+    'duplicated_input_file_name': f'offre_realisee_dupliquee{FileExtensions.parquet}',
+    'calendrier_scolaire_file_name': f'calendrier_scolaire{FileExtensions.parquet}'
+}
+
+START_DATE = datetime(2023, 9, 27)
+END_DATE = datetime(2023, 9, 28)
+
+OUTPUT_PATH = os.path.join(TEST_DATA_PATH, TEST_DATA_PATH_CONFIG['output_path'])
+
+
+def _mesure_file_name(mesure_type: MesureType, date: datetime) -> str:
+    return f"mesure_{mesure_type}_{date.strftime('%Y_%m_%d')}" + FileExtensions.csv
+
+
+@pytest.fixture
+def file_system_fixture():
+    yield
+    shutil.rmtree(OUTPUT_PATH)
+
+
+@pytest.mark.parametrize('input_file_name', [
+    TEST_DATA_PATH_CONFIG['input_file_name'], TEST_DATA_PATH_CONFIG['duplicated_input_file_name']
+])
+def test_create_mesure_qs_ponctualite_regularite(file_system_fixture, input_file_name):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path=TEST_DATA_PATH_CONFIG['input_path'],
+        output_path=TEST_DATA_PATH_CONFIG['output_path'],
+        input_file_name=input_file_name,
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name'],
+    )
+
+    date = START_DATE
+
+    # When
+    create_mesure_qs_ponctualite_regularite(file_system_handler=local_file_system_handler, date=date)
+
+    # Assert
+    for mesure_type in [MesureType.ponctualite, MesureType.regularite]:
+        expected_result = pd.read_csv(
+            os.path.join(TEST_DATA_PATH, 'expected_data', _mesure_file_name(mesure_type, date)))
+        result = pd.read_csv(os.path.join(OUTPUT_PATH, mesure_type, _mesure_file_name(mesure_type, date)))
+
+        pd.testing.assert_frame_equal(result, expected_result)
+
+
+def test_create_mesure_qs_ponctualite_regularite_date_range(file_system_fixture):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path=TEST_DATA_PATH_CONFIG['input_path'],
+        output_path=TEST_DATA_PATH_CONFIG['output_path'],
+        input_file_name=TEST_DATA_PATH_CONFIG['input_file_name'],
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name'],
+    )
+
+    date_range = (START_DATE, END_DATE)
+
+    # When
+    create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2)
+
+    # Assert
+    for mesure_type in [MesureType.ponctualite, MesureType.regularite]:
+        result_clean = os.listdir(os.path.join(OUTPUT_PATH, mesure_type))
+
+        assert _mesure_file_name(mesure_type, START_DATE) in result_clean
+        assert _mesure_file_name(mesure_type, END_DATE) in result_clean
+
+
+def test_create_mesure_qs_ponctualite_regularite_date_range_incremental(file_system_fixture):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path=TEST_DATA_PATH_CONFIG['input_path'],
+        output_path=TEST_DATA_PATH_CONFIG['output_path'],
+        input_file_name=TEST_DATA_PATH_CONFIG['input_file_name'],
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name'],
+    )
+
+    date_range = (START_DATE, END_DATE)
+
+    # When
+    first_computed_dates = create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2, incremental=True)
+    second_computed_dates = create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2, incremental=True)
+    third_computed_dates = create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2, incremental=True,
+        solver=AssignmentSolver.sparse)
+
+    # Assert
+    assert first_computed_dates == [START_DATE, END_DATE]
+    assert second_computed_dates == []
+    # Un changement de paramètres entraîne le recalcul de toutes les dates
+    assert third_computed_dates == [START_DATE, END_DATE]
+    assert os.path.exists(local_file_system_handler.run_manifest_file_path)
+
+
+def test_create_mesure_qs_ponctualite_regularite_date_range_incremental_after_full_run(file_system_fixture):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path=TEST_DATA_PATH_CONFIG['input_path'],
+        output_path=TEST_DATA_PATH_CONFIG['output_path'],
+        input_file_name=TEST_DATA_PATH_CONFIG['input_file_name'],
+        calendrier_scolaire_file_name=TEST_DATA_PATH_CONFIG['calendrier_scolaire_file_name'],
+    )
+
+    date_range = (START_DATE, END_DATE)
+
+    # When
+    create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2, incremental=True)
+    # Une exécution complète avec d'autres paramètres remplace les mesures journalières
+    create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2,
+        solver=AssignmentSolver.sparse)
+    computed_dates_after_full_run = create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2, incremental=True)
+    os.remove(os.path.join(OUTPUT_PATH, MesureType.regularite, _mesure_file_name(MesureType.regularite, END_DATE)))
+    computed_dates_after_deletion = create_mesure_qs_ponctualite_regularite_date_range(
+        file_system_handler=local_file_system_handler, date_range=date_range, n_thread=2, incremental=True)
+
+    # Assert
+    assert computed_dates_after_full_run == [START_DATE, END_DATE]
+    # Seule la date dont une mesure journalière a été supprimée est recalculée
+    assert computed_dates_after_deletion == [END_DATE]
+    assert _mesure_file_name(MesureType.regularite, END_DATE) in os.listdir(
+        os.path.join(OUTPUT_PATH, MesureType.regularite))
@@ -36,7 +36,8 @@ RESULT_PATH = os.path.join(
 @pytest.fixture
 def file_system_fixture():
     yield
-    shutil.rmtree(RESULT_PATH)
+    # Le manifeste d'exécution est écrit à la racine du dossier de sortie
+    shutil.rmtree(os.path.dirname(RESULT_PATH))
 
 
 def test_create_mesure_qs_regularite(file_system_fixture):
@@ -0,0 +1,143 @@
+import os
+import pstats
+import time
+from datetime import date
+from functools import partial
+
+import pytest
+
+from offre_realisee.domain.port.process_memory_handler import ProcessMemoryHandler
+from offre_realisee.domain.usecases.worker_pool import (
+    DEFAULT_BYTES_PER_ROW, MIN_ROWS_FOR_BYTES_PER_ROW, WorkerPool, run_tasks)
+from offre_realisee.infrastructure.local_file_system_handler import LocalFileSystemHandler
+from offre_realisee.infrastructure.local_process_memory_handler import LocalProcessMemoryHandler
+from offre_realisee.infrastructure.profiling import profile_block, write_profile_report
+from tests.test_data import TEST_DATA_PATH
+
+
+def _get_worker_info(file_system_handler: LocalFileSystemHandler, value: int, **kwargs) -> tuple[int, str, int]:
+    return os.getpid(), file_system_handler.data_path, value
+
+
+def test_worker_pool_reuses_processes():
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet'
+    )
+
+    # When
+    with WorkerPool(file_system_handler=local_file_system_handler, n_thread=2) as worker_pool:
+        first_results = worker_pool.map(_get_worker_info, [{'value': value} for value in range(4)])
+        empty_results = worker_pool.map(_get_worker_info, [])
+        second_results = worker_pool.map(_get_worker_info, [{'value': value} for value in range(4, 8)])
+
+    # Then
+    results = first_results + second_results
+    assert empty_results == []
+    assert [value for _, _, value in results] == list(range(8))
+    assert {data_path for _, data_path, _ in results} == {TEST_DATA_PATH}
+    # Les mêmes processus sont utilisés pour toutes les tâches
+    assert len({pid for pid, _, _ in results}) <= 2
+    assert os.getpid() not in {pid for pid, _, _ in results}
+
+
+def test_run_tasks_with_another_file_system_handler():
+    # Given
+    def file_system_handler() -> LocalFileSystemHandler:
+        return LocalFileSystemHandler(
+            data_path=TEST_DATA_PATH, input_path='input', output_path='output',
+            input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet'
+        )
+    worker_pool = WorkerPool(file_system_handler=file_system_handler(), n_thread=1)
+
+    # When / Then
+    with pytest.raises(ValueError):
+        run_tasks(_get_worker_info, [{'value': 0}], file_system_handler=file_system_handler(), n_thread=1,
+                  worker_pool=worker_pool)
+
+
+def test_worker_pool_with_profile(tmp_path):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet'
+    )
+    profile_path = str(tmp_path)
+
+    # When
+    with WorkerPool(file_system_handler=local_file_system_handler, n_thread=2,
+                    task_profiler=partial(profile_block, profile_path)) as worker_pool:
+        results = worker_pool.map(_get_worker_info, [
+            {'value': value, 'date': date(2023, 9, 27 + value % 2)} for value in range(4)])
+    with profile_block(profile_path, label='aggregation'):
+        _get_worker_info(local_file_system_handler, value=4)
+    report_file_path = write_profile_report(profile_path)
+
+    # Then
+    assert [value for _, _, value in results] == list(range(4))
+    assert sorted(os.listdir(profile_path)) == [
+        '2023_09_27.pstats', '2023_09_28.pstats', 'aggregation.pstats', 'profile_report.txt']
+    assert pstats.Stats(os.path.join(profile_path, '2023_09_27.pstats')).total_calls > 0
+    with open(report_file_path) as report_file:
+        report = report_file.read()
+    assert '_get_worker_info' in report
+    # Les profils des tâches, supprimés, ne sont pas cités dans le rapport
+    assert '_tasks' not in report
+
+
+def _get_task_interval(file_system_handler: LocalFileSystemHandler, value: int) -> tuple[int, float, float]:
+    start = time.perf_counter()
+    time.sleep(0.05)
+    return value, start, time.perf_counter()
+
+
+def test_worker_pool_with_memory_budget():
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet'
+    )
+    costs = [MIN_ROWS_FOR_BYTES_PER_ROW, 1, 1, 1]
+
+    # When
+    # Le budget ne permet de lancer qu'une tâche à la fois
+    with WorkerPool(file_system_handler=local_file_system_handler, n_thread=2, memory_budget=1,
+                    process_memory_handler=LocalProcessMemoryHandler()) as worker_pool:
+        results = worker_pool.map(
+            _get_task_interval, [{'value': value} for value in range(4)], costs=costs, task_kind='sleep')
+
+    # Then
+    assert [value for value, _, _ in results] == list(range(4))
+    intervals = sorted((start, end) for _, start, end in results)
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(intervals, intervals[1:]))
+    assert set(worker_pool.measured_bytes_per_row) == {'sleep'}
+    assert worker_pool.bytes_per_row('other') == DEFAULT_BYTES_PER_ROW
+
+
+class _NoResetProcessMemoryHandler(ProcessMemoryHandler):
+    def get_rss(self) -> tuple[int, int]:
+        return 1024 ** 3, 1024 ** 3
+
+    def reset_peak_rss(self) -> bool:
+        return False
+
+
+def test_worker_pool_without_peak_rss_reset():
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH, input_path='input', output_path='output',
+        input_file_name='offre_realisee.parquet', calendrier_scolaire_file_name='calendrier_scolaire.parquet'
+    )
+
+    # When
+    with WorkerPool(file_system_handler=local_file_system_handler, n_thread=1, memory_budget=1,
+                    process_memory_handler=_NoResetProcessMemoryHandler()) as worker_pool:
+        results = worker_pool.map(
+            _get_task_interval, [{'value': 0}], costs=[MIN_ROWS_FOR_BYTES_PER_ROW], task_kind='sleep')
+
+    # Then
+    # Le pic du processus, qui n'a pas pu être remis à zéro, n'est pas celui de la tâche
+    assert [value for value, _, _ in results] == [0]
+    assert worker_pool.measured_bytes_per_row == {}
+    assert worker_pool.bytes_per_row('sleep') == DEFAULT_BYTES_PER_ROW
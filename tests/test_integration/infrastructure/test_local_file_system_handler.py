@@ -0,0 +1,62 @@
+import os
+import shutil
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.config.offre_realisee_config import MesureType, OutputFormat, MesurePonctualite
+from offre_realisee.infrastructure.local_file_system_handler import LocalFileSystemHandler
+from tests.test_data import TEST_DATA_PATH
+
+OUTPUT_PATH = 'parquet_output'
+EXPECTED_FILE_PATH = os.path.join(TEST_DATA_PATH, 'expected_data', f"mesure_ponctualite_2023_09_27{FileExtensions.csv}")
+
+
+@pytest.fixture
+def parquet_file_system_handler():
+    yield LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH,
+        input_path='input',
+        output_path=OUTPUT_PATH,
+        input_file_name=f'offre_realisee{FileExtensions.parquet}',
+        calendrier_scolaire_file_name=f'calendrier_scolaire{FileExtensions.parquet}',
+        output_format=OutputFormat.parquet
+    )
+    shutil.rmtree(os.path.join(TEST_DATA_PATH, OUTPUT_PATH))
+
+
+def test_save_daily_mesure_qs_parquet_partitioned_by_jour(parquet_file_system_handler):
+    # Given
+    df_mesure_qs = pd.read_csv(EXPECTED_FILE_PATH, index_col=0, dtype={MesurePonctualite.ligne: str})
+
+    # When
+    parquet_file_system_handler.save_daily_mesure_qs(
+        df_mesure_qs=df_mesure_qs, date=date(2023, 9, 27), dsp='', mesure_type=MesureType.ponctualite)
+    result = parquet_file_system_handler.get_daily_mesure_qs(
+        date=date(2023, 9, 27), dsp='', mesure_type=MesureType.ponctualite)
+
+    # Then
+    assert os.listdir(os.path.join(TEST_DATA_PATH, OUTPUT_PATH, MesureType.ponctualite)) == ['JOUR=2023-09-27']
+    assert isinstance(result[MesurePonctualite.ligne].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        result.astype({MesurePonctualite.ligne: object}), df_mesure_qs.reset_index(drop=True))
+
+
+def test_get_mesure_qs_by_dates_parquet(parquet_file_system_handler):
+    # Given
+    df_mesure_qs = pd.read_csv(EXPECTED_FILE_PATH, index_col=0, dtype={MesurePonctualite.ligne: str})
+    for day in [27, 28, 29]:
+        parquet_file_system_handler.save_daily_mesure_qs(
+            df_mesure_qs=df_mesure_qs, date=date(2023, 9, day), dsp='', mesure_type=MesureType.ponctualite)
+    parquet_file_system_handler.save_error_mesure_qs(
+        df_mesure_qs=df_mesure_qs, date=date(2023, 9, 27), mesure_type=MesureType.ponctualite, dsp='', ligne='1')
+
+    # When
+    result = parquet_file_system_handler.get_mesure_qs_by_dates(
+        dates=[date(2023, 9, 27), date(2023, 9, 29), date(2023, 9, 30)], dsp='', mesure_type=MesureType.ponctualite)
+
+    # Then
+    assert len(result) == 2 * len(df_mesure_qs)
+    assert sorted(result['JOUR'].unique()) == ['2023-09-27', '2023-09-29']
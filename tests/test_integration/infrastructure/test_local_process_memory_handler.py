@@ -0,0 +1,25 @@
+import numpy as np
+
+from offre_realisee.infrastructure.local_process_memory_handler import LocalProcessMemoryHandler
+
+
+def test_get_rss_and_reset_peak_rss():
+    # Given
+    local_process_memory_handler = LocalProcessMemoryHandler()
+    rss_before, _ = local_process_memory_handler.get_rss()
+    # 80 Mo écrits puis libérés : le pic dépasse la mémoire résidente courante
+    array = np.ones(10_000_000)
+    del array
+
+    # When
+    rss, peak_rss = local_process_memory_handler.get_rss()
+    is_reset = local_process_memory_handler.reset_peak_rss()
+    _, peak_rss_after_reset = local_process_memory_handler.get_rss()
+
+    # Then
+    assert 0 < rss <= peak_rss
+    assert peak_rss >= rss_before + 70 * 1024 ** 2
+    if is_reset:
+        assert peak_rss_after_reset < peak_rss
+    else:
+        assert peak_rss_after_reset == peak_rss
@@ -0,0 +1,136 @@
+import os
+from datetime import date
+
+import pandas as pd
+
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.infrastructure.local_file_system_handler import (
+    DAILY_OFFRE_REALISEE_COLUMNS, LocalFileSystemHandler)
+from offre_realisee.infrastructure.offre_realisee_dataset import OffreRealiseeDataset
+from tests.test_data import TEST_DATA_PATH
+
+INPUT_FILE_PATH = os.path.join(TEST_DATA_PATH, 'input', f'offre_realisee{FileExtensions.parquet}')
+
+
+def _local_file_system_handler(data_path: str) -> LocalFileSystemHandler:
+    return LocalFileSystemHandler(
+        data_path=data_path, input_path='input', output_path='output',
+        input_file_name=f'offre_realisee{FileExtensions.parquet}',
+        calendrier_scolaire_file_name=f'calendrier_scolaire{FileExtensions.parquet}'
+    )
+
+
+def test_offre_realisee_dataset_get_jours():
+    # When
+    dataset = OffreRealiseeDataset(INPUT_FILE_PATH)
+
+    # Then
+    assert dataset.is_partitioned_by_jour
+    assert dataset.get_jours() == ['2023-09-27', '2023-09-28']
+
+
+def test_offre_realisee_dataset_get_daily_table():
+    # Given
+    dataset = OffreRealiseeDataset(INPUT_FILE_PATH)
+    expected_result = pd.read_parquet(
+        INPUT_FILE_PATH, columns=DAILY_OFFRE_REALISEE_COLUMNS,
+        filters=[[(InputColumns.jour, 'in', {'2023-09-27'})]]
+    )
+
+    # When
+    result = dataset.get_daily_table(date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS).to_pandas()
+
+    # Then
+    pd.testing.assert_frame_equal(result, expected_result)
+
+
+def test_offre_realisee_dataset_get_daily_table_ligne_and_missing_jour():
+    # Given
+    dataset = OffreRealiseeDataset(INPUT_FILE_PATH)
+
+    # When
+    result_ligne = dataset.get_daily_table(
+        date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS, ligne='150').to_pandas()
+    result_autre_ligne = dataset.get_daily_table(
+        date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS, ligne='999')
+    result_missing = dataset.get_daily_table(date=date(2023, 9, 29), columns=DAILY_OFFRE_REALISEE_COLUMNS)
+
+    # Then
+    assert len(result_ligne) == 3133
+    assert (result_ligne[InputColumns.ligne] == '150').all()
+    assert result_autre_ligne.num_rows == 0
+    assert result_missing.num_rows == 0
+    assert result_missing.column_names == DAILY_OFFRE_REALISEE_COLUMNS
+
+
+def test_offre_realisee_dataset_get_daily_row_count(tmp_path):
+    # Given
+    dataset = OffreRealiseeDataset(INPUT_FILE_PATH)
+    not_partitioned_file_path = str(tmp_path / 'offre_realisee.parquet')
+    pd.read_parquet(INPUT_FILE_PATH).to_parquet(not_partitioned_file_path)
+    not_partitioned_dataset = OffreRealiseeDataset(not_partitioned_file_path)
+
+    # When
+    result = dataset.get_daily_row_count(date=date(2023, 9, 27))
+    result_not_partitioned = not_partitioned_dataset.get_daily_row_count(date=date(2023, 9, 27))
+    result_missing = dataset.get_daily_row_count(date=date(2023, 9, 29))
+
+    # Then
+    assert result == dataset.get_daily_table(date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS).num_rows
+    assert result_not_partitioned == result
+    assert result_missing == 0
+
+
+def test_get_offre_realisee_dataset_is_kept_by_handler():
+    # Given
+    local_file_system_handler = _local_file_system_handler(data_path=TEST_DATA_PATH)
+
+    # When
+    first_dataset = local_file_system_handler.get_offre_realisee_dataset(date=date(2023, 9, 27))
+    second_dataset = local_file_system_handler.get_offre_realisee_dataset(date=date(2023, 9, 28))
+
+    # Then
+    assert first_dataset is second_dataset
+
+
+def test_get_offre_realisee_dataset_file_renamed_in_partition(tmp_path):
+    # Given
+    os.makedirs(tmp_path / 'input')
+    file_path = str(tmp_path / 'input' / f'offre_realisee{FileExtensions.parquet}')
+    pd.read_parquet(INPUT_FILE_PATH).to_parquet(file_path, partition_cols=[InputColumns.jour])
+    partition_path = os.path.join(file_path, f'{InputColumns.jour}=2023-09-27')
+    local_file_system_handler = _local_file_system_handler(data_path=str(tmp_path))
+    first_dataset = local_file_system_handler.get_offre_realisee_dataset(date=date(2023, 9, 27))
+
+    # When
+    # Le fichier est renommé dans une partition existante, le dossier racine n'est pas modifié
+    part_file_name, = os.listdir(partition_path)
+    os.rename(os.path.join(partition_path, part_file_name), os.path.join(partition_path, 'renamed-0.parquet'))
+    # La date de modification est avancée explicitement, la résolution du système de fichiers pouvant être grossière
+    os.utime(partition_path, ns=(0, os.stat(partition_path).st_mtime_ns + 1))
+    other_day_dataset = local_file_system_handler.get_offre_realisee_dataset(date=date(2023, 9, 28))
+    second_dataset = local_file_system_handler.get_offre_realisee_dataset(date=date(2023, 9, 27))
+
+    # Then
+    # Seule la partition du jour demandé est consultée : la lecture d'un autre jour réutilise le dataset
+    assert other_day_dataset is first_dataset
+    assert second_dataset is not first_dataset
+    assert second_dataset.get_daily_fingerprint(date=date(2023, 9, 27))
+    assert second_dataset.get_daily_row_count(date=date(2023, 9, 27)) == 3133
+
+
+def test_offre_realisee_dataset_is_up_to_date_new_partition(tmp_path):
+    # Given
+    file_path = str(tmp_path / f'offre_realisee{FileExtensions.parquet}')
+    df_offre_realisee = pd.read_parquet(INPUT_FILE_PATH)
+    df_offre_realisee[df_offre_realisee[InputColumns.jour] == '2023-09-27'].to_parquet(
+        file_path, partition_cols=[InputColumns.jour])
+    dataset = OffreRealiseeDataset(file_path)
+
+    # When
+    df_offre_realisee.to_parquet(file_path, partition_cols=[InputColumns.jour], existing_data_behavior='overwrite_or_ignore')
+
+    # Then
+    assert dataset.is_up_to_date(date=date(2023, 9, 29))
+    assert not dataset.is_up_to_date(date=date(2023, 9, 28))
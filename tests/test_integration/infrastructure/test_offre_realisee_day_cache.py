@@ -0,0 +1,64 @@
+import os
+from datetime import date
+
+import pandas as pd
+
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.domain.entities.offre_realisee_table_to_pandas import offre_realisee_table_to_pandas
+from offre_realisee.infrastructure.local_file_system_handler import (
+    DAILY_OFFRE_REALISEE_COLUMNS, LocalFileSystemHandler)
+from offre_realisee.infrastructure.offre_realisee_dataset import OffreRealiseeDataset
+from offre_realisee.infrastructure.offre_realisee_day_cache import OffreRealiseeDayCache
+from tests.test_data import TEST_DATA_PATH
+
+INPUT_FILE_PATH = os.path.join(TEST_DATA_PATH, 'input', f'offre_realisee{FileExtensions.parquet}')
+
+
+def test_get_daily_offre_realisee_with_day_cache(tmp_path):
+    # Given
+    local_file_system_handler = LocalFileSystemHandler(
+        data_path=TEST_DATA_PATH, input_path='input', output_path='output',
+        input_file_name=f'offre_realisee{FileExtensions.parquet}',
+        calendrier_scolaire_file_name=f'calendrier_scolaire{FileExtensions.parquet}',
+        day_cache_path=str(tmp_path)
+    )
+    expected_result = offre_realisee_table_to_pandas(OffreRealiseeDataset(INPUT_FILE_PATH).get_daily_table(
+        date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS, ligne='150'))
+
+    # When
+    first_result = local_file_system_handler.get_daily_offre_realisee(date=date(2023, 9, 27), ligne='150')
+    second_result = local_file_system_handler.get_daily_offre_realisee(date=date(2023, 9, 27), ligne='150')
+
+    # Then
+    assert len(os.listdir(tmp_path)) == 1
+    pd.testing.assert_frame_equal(first_result, expected_result)
+    pd.testing.assert_frame_equal(second_result, expected_result)
+
+
+def test_day_cache_invalidation_and_size_cap(tmp_path):
+    # Given
+    table = OffreRealiseeDataset(INPUT_FILE_PATH).get_daily_table(
+        date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS)
+    day_cache = OffreRealiseeDayCache(cache_path=str(tmp_path))
+    day_cache.put(table, date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp='', ligne='',
+                  fingerprint='old')
+
+    # When
+    day_cache.put(table, date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp='', ligne='',
+                  fingerprint='new')
+    old_result = day_cache.get(date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp='', ligne='',
+                               fingerprint='old')
+    entry_size = sum(os.path.getsize(tmp_path / file_name) for file_name in os.listdir(tmp_path))
+
+    day_cache.max_size = entry_size
+    day_cache.put(table, date=date(2023, 9, 28), columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp='', ligne='',
+                  fingerprint='new')
+
+    # Then
+    # L'entrée écrite pour d'autres fichiers d'entrée est remplacée
+    assert old_result is None
+    # Au-delà de la taille maximale, l'entrée la moins récemment lue est supprimée
+    assert day_cache.get(date=date(2023, 9, 27), columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp='', ligne='',
+                         fingerprint='new') is None
+    assert day_cache.get(date=date(2023, 9, 28), columns=DAILY_OFFRE_REALISEE_COLUMNS, dsp='', ligne='',
+                         fingerprint='new').equals(table)
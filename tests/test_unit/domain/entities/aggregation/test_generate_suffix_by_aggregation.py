@@ -1,9 +1,13 @@
-from datetime import datetime, date
+import os
+from datetime import datetime, date, timedelta
 
 import pandas as pd
 
-from offre_realisee.config.aggregation_config import PeriodeName
-from offre_realisee.domain.entities.aggregation.generate_suffix_by_aggregation import IDF_TIMEZONE, get_period_name
+from offre_realisee.config.aggregation_config import AggregationLevel, DayType, PeriodeName
+from offre_realisee.config.file_extensions import FileExtensions
+from offre_realisee.domain.entities.aggregation.generate_suffix_by_aggregation import (
+    IDF_TIMEZONE, CalendarIndex, generate_suffix_by_aggregation, get_period_name)
+from tests.test_data import TEST_DATA_PATH
 
 
 TEST_PERIODE_ETE = (date(2023, 7, 1), date(2023, 8, 31))
@@ -61,3 +65,47 @@ def test_get_period_name_ete():
 
     # Then
     assert result == expected_result
+
+
+def test_generate_suffix_by_aggregation_with_calendar_index_same_as_without():
+    # Given
+    df_calendrier_scolaire = pd.read_parquet(
+        os.path.join(TEST_DATA_PATH, 'input', f'calendrier_scolaire{FileExtensions.parquet}'))
+    date_range = (date(2023, 1, 1), date(2024, 12, 31))
+    dates = [date_range[0] + timedelta(days=i) for i in range((date_range[1] - date_range[0]).days + 1)]
+    # Dates hors de la plage de l'index
+    dates += [date(2022, 12, 25), date(2025, 1, 1)]
+
+    expected_result = generate_suffix_by_aggregation(
+        df_calendrier_scolaire, periode_ete=TEST_PERIODE_ETE, window_name="window_")
+
+    # When
+    result = generate_suffix_by_aggregation(
+        df_calendrier_scolaire, periode_ete=TEST_PERIODE_ETE, window_name="window_", date_range=date_range)
+
+    # Then
+    for aggregation_level in [AggregationLevel.by_period, AggregationLevel.by_period_weekdays,
+                              AggregationLevel.by_period_weekdays_window]:
+        assert [result[aggregation_level](x) for x in dates] == [expected_result[aggregation_level](x) for x in dates]
+
+
+def test_calendar_index():
+    # Given
+    df_calendrier_scolaire = pd.DataFrame({
+        'description': ['Vacances'],
+        'start_date': [datetime(2023, 4, 29, tzinfo=IDF_TIMEZONE)],
+        'end_date': [datetime(2023, 5, 2, tzinfo=IDF_TIMEZONE)]
+    })
+
+    # When
+    calendar_index = CalendarIndex((date(2023, 4, 28), date(2023, 5, 2)), df_calendrier_scolaire, TEST_PERIODE_ETE)
+
+    # Then
+    assert calendar_index.period_names.tolist() == [
+        PeriodeName.plein_trafic, PeriodeName.vacances_scolaires, PeriodeName.vacances_scolaires,
+        PeriodeName.vacances_scolaires, PeriodeName.plein_trafic]
+    assert calendar_index.day_types.tolist() == [
+        DayType.week, DayType.saturday, DayType.sunday_or_holiday, DayType.sunday_or_holiday, DayType.week]
+    assert calendar_index.is_holiday.tolist() == [False, False, False, True, False]
+    assert calendar_index.period_name(date(2023, 7, 14)) == PeriodeName.ete
+    assert calendar_index.day_type(date(2023, 7, 14)) == DayType.sunday_or_holiday
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.config.offre_realisee_config import MesurePonctualite
+from offre_realisee.domain.entities.aggregation.partial_sums import (
+    add_partial_sums, compute_daily_partial_sums, empty_partial_sums, partial_sums_from_records,
+    partial_sums_to_mesure, partial_sums_to_records)
+from offre_realisee.domain.usecases.aggregate_mesure_qs import aggregate_df
+
+
+def _daily_mesure(jour: str, lignes: list[str], scores: list[float]) -> pd.DataFrame:
+    return pd.DataFrame({
+        InputColumns.jour: jour,
+        MesurePonctualite.ligne: lignes,
+        MesurePonctualite.nombre_theorique: 3,
+        MesurePonctualite.nombre_reel: 2,
+        MesurePonctualite.score_de_conformite: scores,
+        MesurePonctualite.situation_inacceptable_retard: 0,
+        MesurePonctualite.situation_inacceptable_avance: 0,
+        MesurePonctualite.situation_inacceptable_sans_horaire_reel_attribue: 1,
+        MesurePonctualite.situation_inacceptable_total: 1,
+    })
+
+
+def test_partial_sums_same_result_as_aggregate_df():
+    # Given
+    df_all_mesure = pd.concat([
+        _daily_mesure('2023-09-30', ['150', '151'], [1.9999999, 0.75]),
+        _daily_mesure('2023-10-01', ['150'], [0.65]),
+    ], ignore_index=True)
+    daily_partial_sums = compute_daily_partial_sums(df_all_mesure, MesurePonctualite)
+
+    # When
+    df_partial_sums = add_partial_sums(empty_partial_sums(MesurePonctualite), list(daily_partial_sums.values()))
+    result = partial_sums_to_mesure(df_partial_sums, MesurePonctualite)
+
+    # Then
+    pd.testing.assert_frame_equal(result, aggregate_df(df_all_mesure, MesurePonctualite))
+
+
+def test_add_partial_sums_removing_a_day_is_exact():
+    # Given
+    df_all_mesure = pd.concat([
+        _daily_mesure('2023-09-30', ['150', '151'], [0.1, 0.9999999]),
+        _daily_mesure('2023-10-01', ['150'], [0.2]),
+    ], ignore_index=True)
+    daily_partial_sums = compute_daily_partial_sums(df_all_mesure, MesurePonctualite)
+    df_partial_sums = add_partial_sums(empty_partial_sums(MesurePonctualite), list(daily_partial_sums.values()))
+
+    # When
+    result = add_partial_sums(df_partial_sums, [daily_partial_sums['2023-09-30']], sign=-1)
+
+    # Then
+    # La ligne 151, qui n'est présente que le jour retiré, est supprimée
+    pd.testing.assert_frame_equal(result, daily_partial_sums['2023-10-01'])
+
+
+def test_partial_sums_records_round_trip():
+    # Given
+    df_partial_sums = compute_daily_partial_sums(
+        _daily_mesure('2023-09-30', ['150', '151'], [1.5, 0.25]), MesurePonctualite)['2023-09-30']
+
+    # When
+    result = partial_sums_from_records(partial_sums_to_records(df_partial_sums), MesurePonctualite)
+
+    # Then
+    pd.testing.assert_frame_equal(result, df_partial_sums)
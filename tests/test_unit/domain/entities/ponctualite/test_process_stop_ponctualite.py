@@ -1,13 +1,18 @@
+from collections import Counter
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
+import pytest
 
-from offre_realisee.config.offre_realisee_config import MesurePonctualite, FrequenceType, ComplianceType
-from offre_realisee.domain.entities.ponctualite.process_stop_ponctualite import process_stop_ponctualite
+from offre_realisee.config.offre_realisee_config import (
+    MesurePonctualite, MesureType, FrequenceType, ComplianceType, AssignmentSolver)
+from offre_realisee.domain.entities.ponctualite.process_stop_ponctualite import (
+    process_stop_ponctualite, block_size_histogram)
 
 
-def test_process_stop_ponctualite():
+@pytest.mark.parametrize("solver", [AssignmentSolver.dense, AssignmentSolver.sparse, AssignmentSolver.time_window])
+def test_process_stop_ponctualite(solver):
     df_by_stop = pd.DataFrame(
         {
             MesurePonctualite.frequence: [
@@ -67,7 +72,7 @@ def test_process_stop_ponctualite():
     )
 
     # When
-    result = process_stop_ponctualite(df_by_stop)
+    result = process_stop_ponctualite(df_by_stop, solver=solver)
 
     # Then
     pd.testing.assert_frame_equal(result, expected_result)
@@ -360,3 +365,63 @@ def test_process_stop_ponctualite_one_hour_late():
 
     # Then
     pd.testing.assert_frame_equal(result, expected_result)
+
+
+def test_process_stop_ponctualite_time_window_blocks():
+    df_by_stop = pd.DataFrame(
+        {
+            MesurePonctualite.frequence: [FrequenceType.basse_frequence] * 4,
+            MesurePonctualite.heure_theorique: [
+                datetime.fromisoformat("2023-01-01 06:00:00+00:00"),
+                datetime.fromisoformat("2023-01-01 06:20:00+00:00"),
+                datetime.fromisoformat("2023-01-01 09:00:00+00:00"),
+                datetime.fromisoformat("2023-01-01 12:00:00+00:00")],
+            MesurePonctualite.heure_reelle: [
+                datetime.fromisoformat("2023-01-01 06:02:00+00:00"),
+                datetime.fromisoformat("2023-01-01 06:19:30+00:00"),
+                datetime.fromisoformat("2023-01-01 09:07:00+00:00"),
+                pd.NaT],
+            MesurePonctualite.is_terminus: [False, False, False, False],
+        }
+    )
+
+    expected_result = pd.DataFrame(
+        {
+            MesurePonctualite.frequence: [FrequenceType.basse_frequence] * 4,
+            MesurePonctualite.heure_theorique: [
+                datetime.fromisoformat("2023-01-01 06:00:00+00:00"),
+                datetime.fromisoformat("2023-01-01 06:20:00+00:00"),
+                datetime.fromisoformat("2023-01-01 09:00:00+00:00"),
+                datetime.fromisoformat("2023-01-01 12:00:00+00:00")],
+            MesurePonctualite.heure_reelle: [
+                datetime.fromisoformat("2023-01-01 06:02:00+00:00"),
+                datetime.fromisoformat("2023-01-01 06:19:30+00:00"),
+                datetime.fromisoformat("2023-01-01 09:07:00+00:00"),
+                pd.NaT],
+            MesurePonctualite.is_terminus: [False, False, False, False],
+            MesurePonctualite.resultat: [
+                ComplianceType.compliant_delay, ComplianceType.compliant_advance,
+                ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.basse_frequence],
+                ComplianceType.situation_inacceptable_absence],
+        }
+    )
+    block_sizes = Counter()
+
+    # When
+    result = process_stop_ponctualite(df_by_stop, solver=AssignmentSolver.time_window, block_sizes=block_sizes)
+
+    # Then
+    pd.testing.assert_frame_equal(result, expected_result)
+    # 06:00 et 06:20 forment un bloc, 09:00 un autre, 12:00 n'a aucune heure réelle dans sa fenêtre
+    assert block_sizes == Counter({2: 1, 1: 1})
+
+
+def test_block_size_histogram():
+    # Given
+    block_sizes = Counter({1: 5, 2: 3, 3: 1, 9: 2})
+
+    # When
+    result = block_size_histogram(block_sizes)
+
+    # Then
+    assert result == {'1': 5, '2-3': 4, '8-15': 2}
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from offre_realisee.config.offre_realisee_config import AssignmentSolver, ComplianceType, FrequenceType, MesureType
+from offre_realisee.domain.entities.ponctualite.solve_assignment import solve_assignment, solve_sparse_assignment
+
+
+ABSENCE = ComplianceType.situation_inacceptable_absence
+SEMI_COMPLIANT = ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.haute_frequence]
+NOT_COMPLIANT = ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.haute_frequence]
+
+
+def test_solve_sparse_assignment_independent_blocks():
+    # Given
+    # Deux blocs indépendants: réelles {0, 1} / théoriques {0, 1} et réelle {3} / théorique {2}.
+    # La réelle 2 n'est assignable à aucune théorique.
+    cost_matrix = np.array([
+        [ComplianceType.compliant_advance, SEMI_COMPLIANT, ABSENCE],
+        [ComplianceType.compliant_delay, ComplianceType.compliant_advance, ABSENCE],
+        [ABSENCE, ABSENCE, ABSENCE],
+        [ABSENCE, ABSENCE, ComplianceType.compliant_delay],
+    ])
+
+    # When
+    reelle_indices, theorique_indices = solve_sparse_assignment(cost_matrix)
+
+    # Then
+    np.testing.assert_array_equal(reelle_indices, [0, 1, 3])
+    np.testing.assert_array_equal(theorique_indices, [0, 1, 2])
+
+
+def test_solve_sparse_assignment_unassigned_are_paired_in_absence():
+    # Given
+    cost_matrix = np.array([
+        [ABSENCE, ComplianceType.compliant_advance],
+        [ABSENCE, ABSENCE],
+        [ABSENCE, ABSENCE],
+    ])
+
+    # When
+    reelle_indices, theorique_indices = solve_sparse_assignment(cost_matrix)
+
+    # Then
+    np.testing.assert_array_equal(reelle_indices, [0, 1])
+    np.testing.assert_array_equal(theorique_indices, [1, 0])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_solve_assignment_sparse_same_total_score_as_dense(seed):
+    # Given
+    rng = np.random.default_rng(seed)
+    n_theorique = 40
+    n_reelle = n_theorique + 5
+    scores = rng.choice(
+        [ComplianceType.compliant_advance, ComplianceType.compliant_delay, SEMI_COMPLIANT, NOT_COMPLIANT],
+        size=(n_reelle, n_theorique))
+    # Structure en bande, comme pour des heures réelles et théoriques triées
+    band = np.abs(np.arange(n_reelle)[:, None] - np.arange(n_theorique)[None, :]) <= 2
+    cost_matrix = np.where(band, scores, ABSENCE)
+
+    # When
+    dense_reelle, dense_theorique = solve_assignment(cost_matrix, solver=AssignmentSolver.dense)
+    sparse_reelle, sparse_theorique = solve_assignment(cost_matrix, solver=AssignmentSolver.sparse)
+
+    # Then
+    assert len(sparse_reelle) == len(dense_reelle) == n_theorique
+    assert len(set(sparse_reelle)) == len(set(sparse_theorique)) == n_theorique
+    assert cost_matrix[sparse_reelle, sparse_theorique].sum() == pytest.approx(
+        cost_matrix[dense_reelle, dense_theorique].sum())
@@ -161,3 +161,54 @@ def test_stat_situation_inacceptable_add_si_sens():
 
     # Then
     pd.testing.assert_frame_equal(result, expected_result)
+
+
+def test_stat_compliance_score_ponctualite_with_metadata_and_missing_result():
+    # Given
+    df = pd.DataFrame({
+        MesurePonctualite.ligne: [1, 1, 1, 2],
+        MesurePonctualite.arret: [1, 1, 2, 1],
+        MesurePonctualite.sens: [1, 1, 1, 1],
+        MesurePonctualite.resultat: [
+            ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+            None,
+            ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+            ComplianceType.situation_inacceptable_avance],
+        'dsp': ['A', 'A', 'A', 'B'],
+    })
+
+    # When
+    result = stat_compliance_score_ponctualite(df, metadata_cols=['dsp'])
+
+    # Then
+    assert result[[MesurePonctualite.ligne, 'dsp']].values.tolist() == [[1, 'A'], [2, 'B']]
+    assert result[MesurePonctualite.nombre_theorique].tolist() == [2, 1]
+    assert result[MesurePonctualite.nombre_reel].tolist() == [2, 1]
+    assert result[MesurePonctualite.score_de_conformite].tolist() == [1.0, 0.0]
+    assert result[MesurePonctualite.semi_conforme].tolist() == [1, 0]
+    assert result[MesurePonctualite.non_conforme].tolist() == [1, 0]
+    assert result[MesurePonctualite.situation_inacceptable_avance].tolist() == [0, 1]
+
+
+def test_stat_compliance_score_ponctualite_score_equals_per_group_sum():
+    # Given
+    scores = [
+        ComplianceType.compliant_delay,
+        ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+        ComplianceType.semi_compliant[MesureType.ponctualite][FrequenceType.basse_frequence],
+        ComplianceType.not_compliant[MesureType.ponctualite][FrequenceType.haute_frequence],
+    ]
+    df = pd.DataFrame({
+        MesurePonctualite.ligne: [position % 3 for position in range(300)],
+        MesurePonctualite.arret: [1] * 300,
+        MesurePonctualite.sens: [1] * 300,
+        MesurePonctualite.resultat: [scores[(position * 7) % len(scores)] for position in range(300)],
+    })
+
+    # When
+    result = stat_compliance_score_ponctualite(df)
+
+    # Then
+    expected_scores = [
+        df[MesurePonctualite.resultat][df[MesurePonctualite.ligne] == ligne].sum() for ligne in range(3)]
+    assert result[MesurePonctualite.score_de_conformite].tolist() == expected_scores
@@ -1,10 +1,11 @@
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 
 from offre_realisee.config.offre_realisee_config import MesureRegularite
 from offre_realisee.domain.entities.regularite.matching_heure_theorique_reelle_regularite import \
-    matching_heure_theorique_reelle_regularite
+    matching_heure_theorique_reelle_regularite, matching_heure_theorique_reelle_regularite_by_stop
 
 
 def test_matching_heure_theorique_reelle():
@@ -177,3 +178,52 @@ def test_matching_heure_theorique_reelle_first_two_reel_before_theorique():
 
     # Then
     pd.testing.assert_frame_equal(result, expected_result)
+
+
+def test_matching_heure_theorique_reelle_by_stop():
+    # Given
+    # Les passages des deux arrêts sont mélangés, l'arrêt 1 a des heures réelles avant la première heure théorique
+    df_by_stop_0 = pd.DataFrame(
+        {
+            MesureRegularite.heure_reelle: [
+                datetime.fromisoformat("2023-01-01 10:05:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:00:00+00:00"),
+                pd.NaT],
+            MesureRegularite.heure_theorique: [
+                datetime.fromisoformat("2023-01-01 10:02:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:00:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:04:00+00:00")],
+        }
+    )
+    df_by_stop_1 = pd.DataFrame(
+        {
+            MesureRegularite.heure_reelle: [
+                datetime.fromisoformat("2023-01-01 10:00:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:05:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:15:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:09:00+00:00")],
+            MesureRegularite.heure_theorique: [
+                datetime.fromisoformat("2023-01-01 10:06:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:09:00+00:00"),
+                datetime.fromisoformat("2023-01-01 10:12:00+00:00"),
+                pd.NaT],
+        }
+    )
+    df_day = pd.concat([df_by_stop_1, df_by_stop_0], keys=[1, 0]).sample(frac=1, random_state=0)
+    stop_codes = df_day.index.get_level_values(0).to_numpy()
+
+    expected_result = pd.concat([
+        matching_heure_theorique_reelle_regularite(df_by_stop_0),
+        matching_heure_theorique_reelle_regularite(df_by_stop_1),
+    ], ignore_index=True)
+
+    # When
+    result, reelle_stop_codes = matching_heure_theorique_reelle_regularite_by_stop(
+        stop_codes=stop_codes,
+        heure_theorique=df_day[MesureRegularite.heure_theorique].dt.tz_localize(None).to_numpy(),
+        heure_reelle=df_day[MesureRegularite.heure_reelle].dt.tz_localize(None).to_numpy(),
+    )
+
+    # Then
+    pd.testing.assert_frame_equal(result, expected_result)
+    np.testing.assert_array_equal(reelle_stop_codes, [0, 0, 1, 1, 1, 1])
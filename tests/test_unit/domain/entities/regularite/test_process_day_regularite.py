@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pandas as pd
+
+from offre_realisee.config.offre_realisee_config import MesureRegularite, FrequenceType
+from offre_realisee.domain.entities.regularite.process_day_regularite import process_day_regularite
+from offre_realisee.domain.entities.regularite.process_stop_regularite import process_stop_regularite
+
+
+def _passages(ligne: str, arret: str, heures_theoriques: list[str], heures_reelles: list[str]) -> pd.DataFrame:
+    return pd.DataFrame({
+        MesureRegularite.ligne: ligne,
+        MesureRegularite.sens: 'ALLER',
+        MesureRegularite.arret: arret,
+        MesureRegularite.heure_theorique: [
+            datetime.fromisoformat(f"2023-01-01 {heure}+00:00") if heure else pd.NaT for heure in heures_theoriques],
+        MesureRegularite.heure_reelle: [
+            datetime.fromisoformat(f"2023-01-01 {heure}+00:00") if heure else pd.NaT for heure in heures_reelles],
+        MesureRegularite.frequence: FrequenceType.haute_frequence,
+    })
+
+
+def test_process_day_regularite_same_result_as_process_stop_regularite():
+    # Given
+    df_offre_realisee = pd.concat([
+        _passages('L1', 'A',
+                  ['10:00:00', '10:02:00', '10:06:00', '10:12:00', '10:22:00', '10:29:00', '12:00:00', None],
+                  ['09:55:00', '09:58:00', '10:00:00', '10:05:00', '10:10:00', '10:15:00', '10:20:00', '14:30:00']),
+        # Une seule heure réelle : aucun intervalle réel, l'arrêt n'a pas de score
+        _passages('L1', 'B', ['10:00:00', '10:10:00'], ['10:01:00', None]),
+        # Une seule heure théorique : l'arrêt n'a pas de score
+        _passages('L1', 'C', ['10:00:00', None], ['10:01:00', '10:03:00']),
+        # Train de bus et heures réelles avant la première heure théorique
+        _passages('L2', 'A', ['10:06:00', '10:09:00', '10:12:00', '10:20:00'],
+                  ['10:00:00', '10:00:30', '10:15:00', None]),
+    ], ignore_index=True).sample(frac=1, random_state=0)
+    metadata_cols = [MesureRegularite.ligne, MesureRegularite.sens, MesureRegularite.arret]
+
+    expected_result = pd.concat([
+        process_stop_regularite(df_by_stop, metadata_cols=metadata_cols)
+        for _, df_by_stop in df_offre_realisee.groupby(by=metadata_cols)
+    ], ignore_index=True)
+
+    # When
+    result = process_day_regularite(df_offre_realisee, metadata_cols=metadata_cols)
+
+    # Then
+    pd.testing.assert_frame_equal(result, expected_result)
+    assert result[MesureRegularite.ligne].tolist() == ['L1'] * 8 + ['L2'] * 3
+
+
+def test_process_day_regularite_without_score():
+    # Given
+    df_offre_realisee = _passages('L1', 'A', ['10:00:00'], ['10:01:00'])
+
+    # When
+    result = process_day_regularite(df_offre_realisee)
+
+    # Then
+    assert result.empty
@@ -3,8 +3,9 @@ import numpy as np
 
 import pandas as pd
 
+from offre_realisee.config.input_config import InputColumns
 from offre_realisee.config.offre_realisee_config import MesurePonctualite, FrequenceType
-from offre_realisee.domain.entities.add_frequency import add_frequency
+from offre_realisee.domain.entities.add_frequency import add_frequency, add_frequency_by_stop
 
 
 def test_add_frequency():
@@ -60,3 +61,35 @@ def test_add_frequency():
     # Then
     pd.testing.assert_frame_equal(result, expected_result)
     pd.testing.assert_frame_equal(result_2, expected_result_2)
+
+
+def test_add_frequency_by_stop():
+    # Given
+    # L'arrêt A n'a que 3 passages : son cinquième passage suivant dans la journée appartient à l'arrêt B et ne doit pas
+    # être pris en compte. L'arrêt B a 6 passages en moins d'une heure, son premier passage est en haute fréquence.
+    df_offre_realisee = pd.DataFrame({
+        InputColumns.ligne: ['L1'] * 10,
+        InputColumns.sens: ['ALLER'] * 10,
+        InputColumns.arret: ['B', 'A', 'B', 'B', 'A', 'B', 'A', 'B', 'B', 'B'],
+        MesurePonctualite.heure_theorique: [datetime(2023, 1, 1, 10, 10, 0), datetime(2023, 1, 1, 10, 5, 0),
+                                            datetime(2023, 1, 1, 10, 0, 0), datetime(2023, 1, 1, 10, 20, 0),
+                                            datetime(2023, 1, 1, 10, 0, 0), pd.NaT,
+                                            datetime(2023, 1, 1, 10, 10, 0), datetime(2023, 1, 1, 10, 5, 0),
+                                            datetime(2023, 1, 1, 10, 15, 0), datetime(2023, 1, 1, 10, 25, 0)]})
+
+    expected_result = pd.concat([
+        add_frequency(df_by_stop) for _, df_by_stop in df_offre_realisee.groupby(
+            by=[InputColumns.ligne, InputColumns.sens, InputColumns.arret])
+    ])
+
+    # When
+    result = add_frequency_by_stop(df_offre_realisee)
+
+    # Then
+    pd.testing.assert_frame_equal(result, expected_result)
+    assert result[MesurePonctualite.frequence].tolist() == [
+        FrequenceType.basse_frequence, FrequenceType.basse_frequence, FrequenceType.basse_frequence,
+        FrequenceType.haute_frequence, FrequenceType.basse_frequence, FrequenceType.basse_frequence,
+        FrequenceType.basse_frequence, FrequenceType.basse_frequence, FrequenceType.basse_frequence, np.nan]
+    assert result[MesurePonctualite.tag_frequence].tolist() == (
+        [FrequenceType.basse_frequence] * 3 + [FrequenceType.haute_frequence] * 7)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from offre_realisee.domain.entities.count_resultat_by_group import (
+    encode_groups, encode_resultat, count_resultat_by_group, sum_resultat_by_group)
+
+
+def test_encode_resultat():
+    # Given
+    resultat = pd.Series([0.5, 1., np.nan, -1., 0.3, 1.])
+    categories = (1., 0.5, -1.)
+
+    # When
+    result = encode_resultat(resultat, categories)
+
+    # Then
+    np.testing.assert_array_equal(result, [1, 0, 4, 2, 3, 0])
+
+
+def test_count_resultat_by_group():
+    # Given
+    df = pd.DataFrame({'LIGNE': ['B', 'A', 'B', None, 'A'], 'RESULTAT': [1., 0.5, np.nan, 1., 0.5]})
+    categories = (1., 0.5)
+
+    # When
+    group_index, group_codes = encode_groups(df, ['LIGNE'])
+    counts = count_resultat_by_group(
+        group_codes, encode_resultat(df['RESULTAT'], categories), len(group_index), len(categories))
+
+    # Then
+    assert group_index.tolist() == ['A', 'B']
+    np.testing.assert_array_equal(group_codes, [1, 0, 1, -1, 0])
+    np.testing.assert_array_equal(counts, [[0, 2, 0, 0], [1, 0, 0, 1]])
+
+
+def test_sum_resultat_by_group_same_as_pandas_sum():
+    # Given
+    rng = np.random.default_rng(0)
+    group_codes = rng.integers(0, 4, 1000)
+    resultat = rng.choice([1., 0.9999999, 0.75, 0.65, np.nan], 1000)
+
+    expected_result = pd.Series(resultat).groupby(group_codes).agg(lambda x: x.sum()).to_numpy()
+
+    # When
+    result = sum_resultat_by_group(group_codes, resultat, n_groups=5)
+
+    # Then
+    assert result.tolist() == expected_result.tolist() + [0.]
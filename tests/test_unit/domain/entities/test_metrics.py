@@ -0,0 +1,45 @@
+from offre_realisee.domain.entities.metrics import DISABLED_METRICS, MetricsRegistry, collect_metrics, get_metrics
+
+
+def test_metrics_registry():
+    # Given
+    metrics = MetricsRegistry()
+    other_metrics = MetricsRegistry()
+
+    # When
+    for _ in range(2):
+        with metrics.timer('step'):
+            pass
+    metrics.count('rows', 10)
+    metrics.count('stops')
+    metrics.maximum('size', 3)
+    metrics.maximum('size', 2)
+    other_metrics.count('rows', 5)
+    other_metrics.maximum('size', 7)
+    with other_metrics.timer('step'):
+        pass
+    metrics.merge(other_metrics.to_dict())
+
+    # Then
+    result = metrics.to_dict()
+    assert result['counters'] == {'rows': 15, 'stops': 1}
+    assert result['maxima'] == {'size': 7}
+    assert result['timings']['step']['calls'] == 3
+    assert result['timings']['step']['seconds'] >= 0
+
+
+def test_collect_metrics():
+    # When
+    with collect_metrics() as metrics:
+        get_metrics().count('rows', 10)
+        with collect_metrics(enabled=False) as disabled_metrics:
+            with get_metrics().timer('step'):
+                get_metrics().count('rows', 5)
+        active_metrics = get_metrics()
+
+    # Then
+    assert disabled_metrics is DISABLED_METRICS
+    assert active_metrics is metrics
+    assert metrics.to_dict() == {'timings': {}, 'counters': {'rows': 10}, 'maxima': {}}
+    assert DISABLED_METRICS.to_dict() == {'timings': {}, 'counters': {}, 'maxima': {}}
+    assert get_metrics() is DISABLED_METRICS
@@ -0,0 +1,26 @@
+import pyarrow as pa
+
+from offre_realisee.config.input_config import InputColumns
+from offre_realisee.domain.entities.offre_realisee_table_to_pandas import offre_realisee_table_to_pandas
+
+
+def test_offre_realisee_table_to_pandas():
+    # Given
+    table = pa.table({
+        InputColumns.ligne: ['2', '10', '2', None],
+        InputColumns.sens: ['A', 'R', 'A', 'R'],
+        InputColumns.arret: ['b', 'a', 'b', 'a'],
+        InputColumns.is_terminus: [True, False, False, True],
+    })
+
+    # When
+    result = offre_realisee_table_to_pandas(table)
+
+    # Then
+    assert list(result[InputColumns.ligne].cat.categories) == ['10', '2']
+    assert list(result[InputColumns.arret].cat.categories) == ['a', 'b']
+    assert result[InputColumns.ligne].isna().tolist() == [False, False, False, True]
+    assert result[InputColumns.is_terminus].dtype == bool
+    # Les catégories triées donnent le même ordre que les chaînes
+    expected_order = table.to_pandas()[InputColumns.ligne].sort_values().index
+    assert result[InputColumns.ligne].sort_values().index.tolist() == expected_order.tolist()
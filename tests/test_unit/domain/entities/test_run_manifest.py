@@ -0,0 +1,54 @@
+from datetime import date
+
+from offre_realisee.config.offre_realisee_config import MesureType
+from offre_realisee.config.run_manifest_config import RunManifestEntry
+from offre_realisee.domain.entities.run_manifest import build_manifest_entry, manifest_key, select_dates_to_compute
+
+
+def test_manifest_key():
+    # When
+    key = manifest_key(date(2023, 9, 27), dsp="DSP1", mesure_type=MesureType.ponctualite)
+
+    # Then
+    assert key == "2023-09-27/DSP1/ponctualite"
+
+
+def test_select_dates_to_compute():
+    # Given
+    unchanged_date, changed_date, new_date, partial_date, deleted_date, empty_date = (
+        date(2023, 9, 27), date(2023, 9, 28), date(2023, 9, 29), date(2023, 9, 30), date(2023, 10, 1),
+        date(2023, 10, 2))
+    mesure_types = [MesureType.ponctualite, MesureType.regularite]
+    entry = build_manifest_entry(input_fingerprint="abc", parameters={"solver": "dense"})
+    other_entry = build_manifest_entry(input_fingerprint="abc", parameters={"solver": "sparse"})
+    entry_with_output = {**entry, RunManifestEntry.has_output: True}
+    entry_without_output = {**entry, RunManifestEntry.has_output: False}
+
+    manifest = {
+        manifest_key(unchanged_date, "", MesureType.ponctualite): entry_with_output,
+        manifest_key(unchanged_date, "", MesureType.regularite): entry_with_output,
+        manifest_key(changed_date, "", MesureType.ponctualite): other_entry,
+        manifest_key(changed_date, "", MesureType.regularite): other_entry,
+        # Seule la ponctualité a été calculée lors de la dernière exécution
+        manifest_key(partial_date, "", MesureType.ponctualite): entry,
+        # La mesure de régularité a été supprimée depuis la dernière exécution
+        manifest_key(deleted_date, "", MesureType.ponctualite): entry_with_output,
+        manifest_key(deleted_date, "", MesureType.regularite): entry_with_output,
+        # Aucune mesure de régularité n'a été produite lors de la dernière exécution
+        manifest_key(empty_date, "", MesureType.ponctualite): entry_with_output,
+        manifest_key(empty_date, "", MesureType.regularite): entry_without_output,
+    }
+    entry_by_date = {
+        unchanged_date: entry, changed_date: entry, new_date: entry, partial_date: entry, deleted_date: entry,
+        empty_date: entry
+    }
+
+    def has_output(date_to_check: date, mesure_type: MesureType) -> bool:
+        return not (date_to_check in {deleted_date, empty_date} and mesure_type == MesureType.regularite)
+
+    # When
+    dates_to_compute = select_dates_to_compute(
+        manifest, entry_by_date, dsp="", mesure_types=mesure_types, has_output=has_output)
+
+    # Then
+    assert dates_to_compute == [changed_date, new_date, partial_date, deleted_date]